@@ -0,0 +1,235 @@
+#!/usr/bin/env python3
+
+"""Cached queries over the results of Not Alone simulations.
+
+ResultsIndex sums a games.csv file or columnar store up into a cube of
+aggregates indexed by PLAYERS, ARTEMIA_BOARD, BETTER_HUNTED, BETTER_CREATURE
+and WINNER, and saves it next to the results ("games.csv.index") with a
+watermark of how far the results were read: a byte offset in games.csv, a
+row count in a columnar store. Queries filter and group the cube on those
+columns without reading the results again; only the rows appended past the
+watermark are read and added in, so repeat queries on a growing file take
+milliseconds.
+"""
+
+import argparse
+import csv
+import io
+import math
+import os
+import time
+
+import checkpoint
+import columnar
+import notalone
+import onlinestats
+
+# columns the cube is indexed by, in key order
+KEY_COLUMNS = ('PLAYERS', 'ARTEMIA_BOARD', 'BETTER_HUNTED', 'BETTER_CREATURE', 'WINNER')
+
+# columns summed in every cell of the cube
+SUM_COLUMNS = ('TURNS',) + onlinestats.PLACE_COLUMNS + onlinestats.CATCH_COLUMNS
+
+# a cell is [games, sum of squared TURNS, sums of SUM_COLUMNS...]
+GAMES, TURNS_SQUARED, SUMS = 0, 1, 2
+
+# saved indexes of another version are rebuilt
+INDEX_VERSION = 1
+
+# rows read from the results at a time
+READ_ROWS = 100000
+
+
+def index_path(results_path):
+    return results_path + '.index'
+
+
+class ResultsIndex:
+    """Aggregates of a results file or store, grouped by KEY_COLUMNS, kept up to date as it grows"""
+
+    def __init__(self, path='games.csv', backend='csv', cache=True):
+        self.path = path
+        self.backend = backend
+        self.cache_path = index_path(path) if cache else None
+        self.identity = None
+        self.watermark = 0
+        # key column values, as text: cell
+        self.cells = {}
+        if self.cache_path is not None:
+            self.load()
+
+    def load(self):
+        """Loads the saved index, if any"""
+        try:
+            saved = checkpoint.load(self.cache_path)
+        except (FileNotFoundError, ValueError):
+            return
+        if saved.get('version') != INDEX_VERSION or saved.get('backend') != self.backend:
+            return
+        self.identity = saved['identity']
+        self.watermark = saved['watermark']
+        self.cells = {tuple(key): cell for key, cell in saved['cells']}
+
+    def save(self):
+        checkpoint.save(self.cache_path, {
+            'version': INDEX_VERSION,
+            'backend': self.backend,
+            'identity': self.identity,
+            'watermark': self.watermark,
+            'cells': [[list(key), cell] for key, cell in self.cells.items()]})
+
+    def file_identity(self):
+        """Returns the device and inode of the results, to notice a file replaced under the index"""
+        path = self.path if self.backend == 'csv' else columnar.column_path(self.path, 'GAME')
+        stat = os.stat(path)
+        return [stat.st_dev, stat.st_ino]
+
+    def update(self):
+        """Adds the rows appended to the results since the watermark, returns how many"""
+        identity = self.file_identity()
+        if self.backend == 'csv':
+            end = os.path.getsize(self.path)
+        else:
+            end = min(os.path.getsize(columnar.column_path(self.path, column))
+                      // columnar.array.array(typecode).itemsize
+                      for column, typecode in columnar.COLUMNS.items())
+        if identity != self.identity or end < self.watermark:
+            # a new or rewritten file, so start over
+            self.identity = identity
+            self.watermark = 0
+            self.cells = {}
+        elif end == self.watermark:
+            return 0
+        if self.backend == 'csv':
+            added = self.read_csv()
+        else:
+            added = self.read_columnar()
+        if self.cache_path is not None:
+            self.save()
+        return added
+
+    def read_csv(self):
+        added = 0
+        with open(self.path, 'rb') as f:
+            f.seek(self.watermark)
+            while True:
+                lines = f.readlines(1 << 20)
+                if lines and not lines[-1].endswith(b'\n'):
+                    # a row still being written, read it next time
+                    lines.pop()
+                if not lines:
+                    return added
+                self.watermark += sum(len(line) for line in lines)
+                text = io.StringIO(b''.join(lines).decode())
+                for values in csv.reader(text):
+                    if values and values[0] != 'GAME':  # skip headers
+                        self.add(dict(zip(notalone.FIELDNAMES, values)))
+                        added += 1
+
+    def read_columnar(self):
+        added = 0
+        while True:
+            rows = columnar.ColumnarWriter.rows_after(self.path, self.watermark, READ_ROWS)
+            if not rows:
+                return added
+            self.watermark += len(rows)
+            for row in rows:
+                self.add(row)
+            added += len(rows)
+
+    def add(self, row):
+        """Adds one row dict, int or str values; columns missing from old rows count as empty"""
+        key = tuple(str(row.get(column, '')) for column in KEY_COLUMNS)
+        cell = self.cells.get(key)
+        if cell is None:
+            cell = self.cells[key] = [0] * (SUMS + len(SUM_COLUMNS))
+        cell[GAMES] += 1
+        turns = int(row.get('TURNS') or 0)
+        cell[TURNS_SQUARED] += turns * turns
+        for i, column in enumerate(SUM_COLUMNS, SUMS):
+            cell[i] += int(row.get(column) or 0)
+
+    def query(self, by=(), **where):
+        """Returns {group: aggregates} of the games matching where, see aggregates().
+
+        by and the keywords of where are KEY_COLUMNS, e.g.
+        query(by=['PLAYERS'], BETTER_CREATURE=1, ARTEMIA_BOARD='B'). Groups are
+        tuples of the by columns' values, as text.
+        """
+        self.update()
+        group_by = [KEY_COLUMNS.index(column) for column in by]
+        filters = [(KEY_COLUMNS.index(column), str(value)) for column, value in where.items()]
+        winner = KEY_COLUMNS.index('WINNER')
+        totals = {}
+        for key, cell in self.cells.items():
+            if all(key[i] == value for i, value in filters):
+                group = tuple(key[i] for i in group_by)
+                total = totals.get(group)
+                if total is None:
+                    total = totals[group] = [[0] * len(cell), {}]
+                for i, value in enumerate(cell):
+                    total[0][i] += value
+                total[1][key[winner]] = total[1].get(key[winner], 0) + cell[GAMES]
+        return {group: aggregates(cell, wins) for group, (cell, wins) in sorted(totals.items())}
+
+
+def aggregates(cell, wins):
+    """Returns the win rates, means and standard deviation of TURNS of summed cells"""
+    games = cell[GAMES]
+    turns = cell[SUMS] / games
+    variance = (cell[TURNS_SQUARED] - games * turns * turns) / (games - 1) if games > 1 else 0.0
+    result = {'GAMES': games}
+    for winner in ('Creature', 'Hunted'):
+        result[winner.upper() + '_WIN_RATE'] = wins.get(winner, 0) / games
+        result[winner.upper() + '_WIN_RATE_CI'] = onlinestats.wilson_half_width(wins.get(winner, 0), games)
+    result['TURNS'] = turns
+    result['TURNS_STD'] = math.sqrt(max(variance, 0.0))
+    for i, column in enumerate(SUM_COLUMNS[1:], SUMS + 1):
+        result[column] = cell[i] / games
+    return result
+
+
+def query_table(by, groups, columns=()):
+    """Returns the lines of a table of query() results"""
+    lines = [' '.join('{:>15}'.format(column) for column in by)
+             + '   GAMES  CREATURE WIN RATE     TURNS'
+             + ''.join(' {:>9}'.format(column[:9]) for column in columns)]
+    for group, result in groups.items():
+        lines.append(' '.join('{:>15}'.format(value) for value in group)
+                     + '{:>8}  {:>8.4f} +/- {:.4f}  {:>6.2f}'.format(
+                         result['GAMES'], result['CREATURE_WIN_RATE'],
+                         result['CREATURE_WIN_RATE_CI'], result['TURNS'])
+                     + ''.join(' {:>9.3f}'.format(result[column]) for column in columns))
+    return lines
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Query the results of Not Alone simulations.')
+    parser.add_argument('--by', nargs='*', choices=KEY_COLUMNS, default=['PLAYERS'],
+                        help='columns to group by (default: PLAYERS)')
+    parser.add_argument('--where', nargs='*', default=[], metavar='COLUMN=VALUE',
+                        help='only count games with these values, e.g. ARTEMIA_BOARD=B')
+    parser.add_argument('--columns', nargs='*', choices=SUM_COLUMNS[1:], default=[],
+                        help='also show the mean procs or catches per game of these columns')
+    parser.add_argument('--backend', choices=('csv', 'columnar'), default='csv',
+                        help='results format (default: csv)')
+    parser.add_argument('--results',
+                        help='results to query (default: games.csv or games.cols)')
+    parser.add_argument('--no-cache', action='store_true',
+                        help='read every row instead of using and saving the index')
+    args = parser.parse_args()
+    if args.results is None:
+        args.results = 'games.cols' if args.backend == 'columnar' else 'games.csv'
+    where = {}
+    for condition in args.where:
+        column, _, value = condition.partition('=')
+        if column not in KEY_COLUMNS:
+            parser.error('can only filter on {}'.format(', '.join(KEY_COLUMNS)))
+        where[column] = value
+
+    start = time.perf_counter()
+    index = ResultsIndex(args.results, args.backend, cache=not args.no_cache)
+    added = index.update()
+    groups = index.query(args.by, **where)
+    print('\n'.join(query_table(args.by, groups, args.columns)))
+    print('{} new rows read, {:.1f} ms'.format(added, (time.perf_counter() - start) * 1e3))
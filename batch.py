@@ -0,0 +1,314 @@
+#!/usr/bin/env python3
+
+"""Runs many games of Not Alone across a pool of worker processes
+and merges the results into "games.csv" in game number order.
+
+Every setting is an argument, so runs can be scheduled, e.g.
+    ./batch.py 5 1000000 --better-creature 1 --seed 7 --backend columnar
+shows games/sec, the ETA and the running Creature win rate as it goes.
+"""
+
+import argparse
+import multiprocessing
+import os
+import random
+
+import checkpoint
+import columnar
+import notalone
+import onlinestats
+import profiling
+import sharedstats
+
+# game number allocator and results writer of each results backend
+BACKENDS = {
+    'csv': (notalone.GameNumberAllocator, notalone.ResultsWriter),
+    'columnar': (columnar.ColumnarNumberAllocator, columnar.ColumnarWriter)
+}
+
+# the Game a worker plays all its games on, see play_games()
+worker_game = None
+
+
+def play_games(task):
+    """Plays a chunk of games and returns their games.csv row dicts.
+
+    Also returns the chunk's profiling.Profiler stats, or None if the task
+    is not profiled (profile 0; 1 times sections, 2 also traces allocations).
+    If artemia is 'A' or 'B', every game is played on that side of the board.
+    search_budget is the notalone.SearchBudget of a searching Creature, or
+    None for the default.
+    If counter_index is not None, the games are added to that configuration
+    of the worker's sharedstats.SharedCounters instead and no rows are returned.
+    """
+    (first_game_number, seeds, players, better_hunted, better_creature,
+     verbose, trace, profile, artemia, search_budget, counter_index) = task
+    global worker_game
+    profiler = profiling.Profiler(allocations=profile > 1) if profile else None
+    rows = []
+    for game_number, seed in enumerate(seeds, first_game_number):
+        # each game owns an RNG seeded from the parent, so workers share no random state;
+        # games are set up on the worker's last Game rather than a new one, see Game.reset()
+        setup = dict(game_number=game_number, seed=seed, trace=trace, profiler=profiler,
+                     artemia=artemia, search_budget=search_budget)
+        if worker_game is None:
+            worker_game = notalone.Game(players, better_hunted, better_creature, **setup)
+        else:
+            worker_game.reset(players, better_hunted, better_creature, **setup)
+        rows.append(worker_game.play(verbose=verbose))
+    if counter_index is not None:
+        sharedstats.worker_counters.add(counter_index, rows)
+        rows = []
+    return rows, profiler.stats if profiler else None
+
+
+def make_tasks(first_game_number, no_of_games, chunksize, seeder, *config):
+    """Yields a run of game numbers and their seeds in chunks for the workers.
+
+    Game seeds are drawn in order from the seeder, one RNG for the whole
+    batch, so a batch can be reproduced whatever the number of processes.
+    Chunks are made as the pool takes them, so a batch of any size holds
+    only the chunks in flight.
+    """
+    for start in range(0, no_of_games, chunksize):
+        seeds = [seeder.getrandbits(64)
+                 for i in range(min(chunksize, no_of_games - start))]
+        yield (first_game_number + start, seeds) + config
+
+
+def run_batch(players, better_hunted, better_creature, no_of_games,
+              processes=None, chunksize=50, verbose=False, seed=None,
+              path='games.csv', flush_every=1000, flush_seconds=5.0,
+              backend='csv', trace=False, profiler=None, stats=None,
+              precision=None, check_every=500, checkpoint_path=None,
+              resume=False, search_budget=None, progress_line=None):
+    """Simulates no_of_games games over a process pool, appending to path.
+
+    Rows are buffered in game number order as each chunk comes back and
+    written in bulk to the csv or columnar backend, see notalone.ResultsWriter.
+    If trace, anomalous games save an event trace to "traces/".
+    If given a profiling.Profiler, the games' timings and the results writes
+    are added to it, and every row written is added to stats, an
+    onlinestats.RunningStats, if given.
+
+    If precision, games are played in rounds of check_every until the 95%
+    confidence interval of the Creature win rate is at most precision either
+    side, or no_of_games have been played. The games played are the same as
+    the first games of a fixed-size batch with the same seed.
+
+    If checkpoint_path, progress is saved there on every write (see
+    checkpoint) and removed once the batch is done. With resume, a batch
+    with the same arguments carries on from its checkpoint.
+    With better_creature 2, the Creature searches within search_budget, a
+    notalone.SearchBudget (default if None).
+    Games played are counted on progress_line, a notalone.ProgressLine, if given.
+    Returns the number of games played.
+    """
+    allocator, writer = BACKENDS[backend]
+    if precision is not None and stats is None:
+        stats = onlinestats.RunningStats()
+    profile = 0
+    if profiler is not None:
+        profile = 2 if profiler.allocations else 1
+    config = {'players': players, 'better_hunted': better_hunted,
+              'better_creature': better_creature, 'no_of_games': no_of_games,
+              'precision': precision, 'check_every': check_every,
+              'path': path, 'backend': backend,
+              'search_budget': list(search_budget) if search_budget is not None else None}
+    # games written in finished rounds, and the round being played: its game
+    # numbers, how many are written and the seeder state at its start
+    progress = {'games_played': 0, 'round': None}
+    seeder = random.Random(seed)
+    if resume:
+        saved = checkpoint.load(checkpoint_path)
+        if saved['kind'] != 'batch' or saved['config'] != config:
+            raise ValueError('{} is the checkpoint of a different run'.format(checkpoint_path))
+        progress['games_played'] = saved['games_played']
+        progress['round'] = saved['round']
+        seeder = checkpoint.restore_rng(saved['seeder_state'])
+        if stats is not None and saved['stats'] is not None:
+            vars(stats).update(vars(onlinestats.RunningStats.from_dict(saved['stats'])))
+        if progress_line is not None:
+            progress_line.resume(progress['games_played'] + (progress['round'] or {}).get('done', 0))
+
+    def record_written(rows):
+        """Counts the rows on disk and saves a checkpoint of them"""
+        progress['round']['done'] += len(rows)
+        if stats is not None:
+            for row in rows:
+                stats.add(row)
+        save_checkpoint()
+
+    def save_checkpoint():
+        if checkpoint_path is not None:
+            # the rows a checkpoint counts must reach the disk before it does
+            results.sync_output()
+            checkpoint.save(checkpoint_path, {
+                'kind': 'batch',
+                'config': config,
+                'games_played': progress['games_played'],
+                'round': progress['round'],
+                'seeder_state': checkpoint.rng_state(seeder),
+                'stats': stats.to_dict() if stats is not None else None,
+                'position': results.position()})
+
+    with multiprocessing.Pool(processes) as pool, \
+            writer(path, flush_every, flush_seconds, record_written) as results:
+        if resume and progress['round'] is not None:
+            # games written after the last checkpoint, before the batch stopped
+            batch_round = progress['round']
+            remaining = (batch_round['first_game_number'] + batch_round['done'],
+                         batch_round['games'] - batch_round['done'])
+            rows = checkpoint.written_since(writer, path, saved['position'], [remaining])
+            record_written(rows)
+        while True:
+            batch_round = progress['round']
+            if batch_round is None:
+                if progress['games_played'] >= no_of_games:
+                    break
+                if precision is not None and stats.win_rate_half_width() <= precision:
+                    break
+                if precision is None:
+                    round_games = no_of_games
+                else:
+                    round_games = min(check_every, no_of_games - progress['games_played'])
+                # reserve the whole round at once so concurrent runs cannot overlap
+                batch_round = progress['round'] = {
+                    'first_game_number': allocator(path).allocate(round_games),
+                    'games': round_games,
+                    'done': 0,
+                    'seeder_state': checkpoint.rng_state(seeder)}
+                save_checkpoint()
+            else:
+                # carry on with the seeds of a resumed round
+                seeder = checkpoint.restore_rng(batch_round['seeder_state'])
+                for i in range(batch_round['done']):
+                    seeder.getrandbits(64)
+            tasks = make_tasks(batch_round['first_game_number'] + batch_round['done'],
+                               batch_round['games'] - batch_round['done'], chunksize, seeder,
+                               players, better_hunted, better_creature, verbose,
+                               trace, profile, None, search_budget, None)
+            # imap hands results back in task order, so game numbers stay sorted;
+            # it draws tasks only as fast as the workers' pipe takes them
+            for rows, chunk_stats in pool.imap(play_games, tasks):
+                if profiler is None:
+                    results.writerows(rows)
+                else:
+                    profiler.merge(chunk_stats)
+                    mark = profiler.start()
+                    results.writerows(rows)
+                    profiler.stop('results', 'write', mark)
+                if progress_line is not None:
+                    progress_line.add(rows)
+            # the stats only count rows on disk, so the precision check needs them all written
+            results.flush()
+            progress['games_played'] += batch_round['games']
+            progress['round'] = None
+            save_checkpoint()
+    if checkpoint_path is not None:
+        checkpoint.remove(checkpoint_path)
+    return progress['games_played']
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Simulate games of Not Alone on several cores.')
+    parser.add_argument('players', type=int, nargs='?', choices=range(2, 8))
+    parser.add_argument('games', type=int, nargs='?',
+                        help='games to play, or the most to play with --precision')
+    parser.add_argument('--better-hunted', type=int, choices=(0, 1), default=0)
+    parser.add_argument('--better-creature', type=int, choices=(0, 1, 2), default=0,
+                        help='0 random, 1 better, 2 search (slow, see --search-rollouts)')
+    parser.add_argument('--processes', type=int, default=os.cpu_count(),
+                        help='number of worker processes (default: all cores)')
+    parser.add_argument('--chunksize', type=int, default=50,
+                        help='games handed to a worker at a time')
+    parser.add_argument('--backend', choices=BACKENDS, default='csv',
+                        help='results format (default: csv)')
+    parser.add_argument('--output',
+                        help='results to append to (default: games.csv or games.cols)')
+    parser.add_argument('--flush-every', type=int, default=1000,
+                        help='write buffered results every this many games')
+    parser.add_argument('--seed', type=int,
+                        help='seed for the game seeds, to reproduce a whole batch')
+    parser.add_argument('--verbose', action='store_true',
+                        help='log every game')
+    parser.add_argument('--quiet', action='store_true',
+                        help='do not show the progress line')
+    parser.add_argument('--trace', action='store_true',
+                        help='save event traces of anomalous games to traces/')
+    parser.add_argument('--precision', type=float,
+                        help='stop once the 95%% CI of the Creature win rate is this close, e.g. 0.01')
+    parser.add_argument('--check-every', type=int, default=500,
+                        help='games between precision checks (default 500)')
+    parser.add_argument('--resume', action='store_true',
+                        help='carry on with the interrupted batch checkpointed next to --output')
+    parser.add_argument('--no-checkpoint', action='store_true',
+                        help='do not save progress to resume from if the batch is interrupted')
+    parser.add_argument('--search-rollouts', type=int,
+                        help='rollouts per decision of a searching Creature (default 200)')
+    parser.add_argument('--search-seconds', type=float,
+                        help='think this long per decision instead; games can then not be replayed')
+    parser.add_argument('--profile', action='store_true',
+                        help='time game phases and card effects and print a report')
+    parser.add_argument('--profile-allocations', action='store_true',
+                        help='also trace memory allocated by each section (slower)')
+    args = parser.parse_args()
+    if args.output is None:
+        args.output = 'games.cols' if args.backend == 'columnar' else 'games.csv'
+    checkpoint_path = None if args.no_checkpoint else checkpoint.checkpoint_path(args.output)
+    if args.resume:
+        # the batch carries on with the arguments it was started with
+        try:
+            config = checkpoint.load(checkpoint.checkpoint_path(args.output))['config']
+        except FileNotFoundError:
+            parser.error('there is no interrupted batch to resume for {}'.format(args.output))
+        checkpoint_path = checkpoint.checkpoint_path(args.output)
+        args.players = config['players']
+        args.better_hunted = config['better_hunted']
+        args.better_creature = config['better_creature']
+        args.games = config['no_of_games']
+        args.precision = config['precision']
+        args.check_every = config['check_every']
+        args.backend = config['backend']
+        if config['search_budget'] is not None:
+            args.search_rollouts, args.search_seconds = config['search_budget'][:2]
+    elif args.players is None or args.games is None:
+        parser.error('players and games are required unless resuming')
+
+    profiler = None
+    if args.profile or args.profile_allocations:
+        profiler = profiling.Profiler(allocations=args.profile_allocations)
+
+    stats = onlinestats.RunningStats() if args.precision is not None else None
+
+    search_budget = None
+    if args.search_rollouts is not None or args.search_seconds is not None:
+        # batch workers cannot start processes of their own, so searches run in one process
+        search_budget = notalone.SearchBudget(
+            args.search_rollouts or notalone.SearchBudget().rollouts, args.search_seconds, 1)
+
+    progress_line = None
+    if not (args.quiet or args.verbose):
+        progress_line = notalone.ProgressLine(args.games)
+
+    games = run_batch(args.players, args.better_hunted, args.better_creature, args.games,
+                      processes=args.processes, chunksize=args.chunksize,
+                      verbose=args.verbose, seed=args.seed, path=args.output,
+                      flush_every=args.flush_every, backend=args.backend,
+                      trace=args.trace, profiler=profiler, stats=stats,
+                      precision=args.precision, check_every=args.check_every,
+                      checkpoint_path=checkpoint_path, resume=args.resume,
+                      search_budget=search_budget, progress_line=progress_line)
+    if progress_line is not None:
+        progress_line.close()
+
+    if stats is not None:
+        if stats.win_rate_half_width() <= args.precision:
+            print('Reached +/- {} after {} games'.format(args.precision, games))
+        else:
+            print('Stopped at the {} game limit before reaching +/- {}'
+                  .format(games, args.precision))
+        print('\n'.join(stats.summary()))
+
+    if profiler is not None:
+        print('\n'.join(profiler.report()))
@@ -0,0 +1,266 @@
+#!/usr/bin/env python3
+
+"""Measures how fast games of Not Alone are simulated.
+
+The suite benchmark plays fixed-seed games for every player count, mind
+combination and Artemia board, and can save its results as JSON and check
+them against a saved baseline:
+
+    python benchmark.py suite --save baseline.json
+    python benchmark.py suite --baseline baseline.json
+"""
+
+import argparse
+import gc
+import json
+import logging
+import platform
+import sys
+import time
+import tracemalloc
+
+import kernel
+import notalone
+
+
+class CountingHandler(logging.Handler):
+    """Counts the log records emitted, without formatting or saving them"""
+
+    def __init__(self):
+        super().__init__(logging.DEBUG)
+        self.count = 0
+
+    def emit(self, record):
+        self.count += 1
+
+
+def time_games(players, better_hunted, better_creature, no_of_games,
+               verbose=False, seed=0):
+    """Plays fixed-seed games without saving them, returning seconds per game"""
+    start = time.perf_counter()
+    for game_number in range(1, no_of_games + 1):
+        game = notalone.Game(players, better_hunted, better_creature,
+                             game_number=game_number, seed=seed + game_number)
+        game.play(verbose=verbose)
+    return (time.perf_counter() - start) / no_of_games
+
+
+def time_reset_games(players, better_hunted, better_creature, no_of_games, seed=0):
+    """Plays fixed-seed games on one Game set up by Game.reset(), returning seconds per game"""
+    start = time.perf_counter()
+    game = notalone.Game(players, better_hunted, better_creature,
+                         game_number=1, seed=seed + 1)
+    game.play()
+    for game_number in range(2, no_of_games + 1):
+        game.reset(players, better_hunted, better_creature,
+                   game_number=game_number, seed=seed + game_number)
+        game.play()
+    return (time.perf_counter() - start) / no_of_games
+
+
+def gc_collections():
+    """Returns the collections the garbage collector has run so far, by generation"""
+    return [generation['collections'] for generation in gc.get_stats()]
+
+
+def reset_benchmark(players, better_hunted, better_creature, no_of_games):
+    """Compares new Games with reset() ones, returning (us/game, collections by generation) of each"""
+    results = []
+    for timer in (time_games, time_reset_games):
+        before = gc_collections()
+        seconds = timer(players, better_hunted, better_creature, no_of_games)
+        collections = [after - start for start, after in zip(before, gc_collections())]
+        results.append((seconds * 1e6, collections))
+    return results
+
+
+def time_kernel_games(players, better_hunted, better_creature, no_of_games,
+                      seed=0, adapt_minds=False):
+    """Plays fixed-seed kernel.KernelGame games, returning seconds per game"""
+    start = time.perf_counter()
+    for game_number in range(1, no_of_games + 1):
+        game = kernel.KernelGame(players, better_hunted, better_creature,
+                                 game_number, seed=seed + game_number,
+                                 adapt_minds=adapt_minds)
+        game.play()
+    return (time.perf_counter() - start) / no_of_games
+
+
+def kernel_benchmark(players, better_hunted, better_creature, no_of_games):
+    """Returns games/sec of Game, KernelGame and KernelGame with adapted minds"""
+    config = (players, better_hunted, better_creature, no_of_games)
+    return (1 / time_games(*config),
+            1 / time_kernel_games(*config),
+            1 / time_kernel_games(*config, adapt_minds=True))
+
+
+def lockstep_benchmark(players, no_of_games, seed=0):
+    """Returns games/sec of random-mind KernelGame games and of lockstep.LockstepGames"""
+    import lockstep  # needs numpy
+
+    kernel_game = 1 / time_kernel_games(players, 0, 0, no_of_games, seed=seed)
+    start = time.perf_counter()
+    lockstep.LockstepGames(players, no_of_games, seed).play()
+    return kernel_game, no_of_games / (time.perf_counter() - start)
+
+
+def play_board_games(players, better_hunted, better_creature, board,
+                     no_of_games, seed=0):
+    """Plays fixed-seed games on one Artemia board, returning the turns played"""
+    turns = 0
+    for game_number in range(1, no_of_games + 1):
+        game = notalone.Game(players, better_hunted, better_creature,
+                             game_number=game_number, seed=seed + game_number,
+                             artemia=board)
+        game.play()
+        turns += game.counter['turn']
+    return turns
+
+
+def suite_benchmark(no_of_games, seed=0, memory_games=20):
+    """Benchmarks every configuration, returning the results as a JSON-able dict.
+
+    Peak memory is traced over a separate, shorter run, as tracing
+    allocations would slow down the timed games.
+    """
+    results = []
+    for players in range(2, 8):
+        for better_hunted in (0, 1):
+            for better_creature in (0, 1):
+                for board in ('A', 'B'):
+                    config = (players, better_hunted, better_creature, board)
+                    start = time.perf_counter()
+                    turns = play_board_games(*config, no_of_games, seed=seed)
+                    seconds = time.perf_counter() - start
+                    tracemalloc.start()
+                    play_board_games(*config, memory_games, seed=seed)
+                    peak = tracemalloc.get_traced_memory()[1]
+                    tracemalloc.stop()
+                    results.append({'players': players,
+                                    'better_hunted': better_hunted,
+                                    'better_creature': better_creature,
+                                    'artemia_board': board,
+                                    'games_per_sec': no_of_games / seconds,
+                                    'us_per_turn': seconds / turns * 1e6,
+                                    'peak_memory_kib': peak / 1024})
+    return {'games': no_of_games,
+            'seed': seed,
+            'python': platform.python_version(),
+            'time': time.strftime('%Y-%m-%d %H:%M:%S'),
+            'results': results}
+
+
+def suite_key(result):
+    return (result['players'], result['better_hunted'],
+            result['better_creature'], result['artemia_board'])
+
+
+def compare_to_baseline(suite, baseline, threshold=0.2):
+    """Returns a description of every configuration slower than the baseline by more than threshold"""
+    baseline_results = {suite_key(result): result for result in baseline['results']}
+    regressions = []
+    for result in suite['results']:
+        before = baseline_results.get(suite_key(result))
+        if before is None:
+            continue
+        change = result['games_per_sec'] / before['games_per_sec'] - 1
+        if change < -threshold:
+            regressions.append('{} players, minds {}/{}, board {}: {:.0f} games/sec, '
+                               'baseline {:.0f} games/sec ({:+.0%})'
+                               .format(*suite_key(result), result['games_per_sec'],
+                                       before['games_per_sec'], change))
+    return regressions
+
+
+def logging_benchmark(players, no_of_games):
+    """Compares non-verbose and verbose games, counting the log records of each"""
+    counter = CountingHandler()
+    # keep the verbose logs out of games2.log while benchmarking
+    handlers = notalone.logger.handlers
+    notalone.logger.handlers = [counter]
+    try:
+        results = {}
+        for verbose in (False, True):
+            counter.count = 0
+            seconds = time_games(players, 0, 0, no_of_games, verbose=verbose)
+            results[verbose] = (seconds, counter.count / no_of_games)
+    finally:
+        notalone.logger.handlers = handlers
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Benchmark Not Alone simulations.')
+    parser.add_argument('benchmark', nargs='?', choices=('logging', 'kernel', 'lockstep', 'reset', 'suite'),
+                        default='logging')
+    parser.add_argument('--games', type=int,
+                        help='games per configuration (default 200 for suite, 2000 otherwise)')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--save', metavar='JSON', help='save the suite results to this file')
+    parser.add_argument('--baseline', metavar='JSON',
+                        help='fail if the suite is slower than these saved results')
+    parser.add_argument('--threshold', type=float, default=0.2,
+                        help='allowed games/sec regression against the baseline (default 0.2)')
+    args = parser.parse_args()
+    if args.games is None:
+        args.games = 200 if args.benchmark == 'suite' else 2000
+
+    if args.benchmark == 'suite':
+        suite = suite_benchmark(args.games, seed=args.seed)
+        print('PLAYERS  MINDS  BOARD  GAMES/SEC  US/TURN  PEAK KIB')
+        for result in suite['results']:
+            print('{:>7}  {:>2}/{:<2}  {:>5}  {:>9.0f}  {:>7.0f}  {:>8.0f}'
+                  .format(result['players'], result['better_hunted'],
+                          result['better_creature'], result['artemia_board'],
+                          result['games_per_sec'], result['us_per_turn'],
+                          result['peak_memory_kib']))
+        if args.save:
+            with open(args.save, 'w') as f:
+                json.dump(suite, f, indent=2)
+        if args.baseline:
+            with open(args.baseline) as f:
+                regressions = compare_to_baseline(suite, json.load(f), args.threshold)
+            if regressions:
+                print('\nREGRESSIONS beyond {:.0%} of the baseline:'.format(args.threshold),
+                      file=sys.stderr)
+                for regression in regressions:
+                    print('  ' + regression, file=sys.stderr)
+                raise SystemExit(1)
+            print('\nNo regressions beyond {:.0%} of the baseline'.format(args.threshold))
+        raise SystemExit
+    if args.benchmark == 'kernel':
+        for players in range(2, 8):
+            for better_hunted, better_creature in ((0, 0), (1, 1)):
+                game, kernel_game, adapted = kernel_benchmark(
+                    players, better_hunted, better_creature, args.games)
+                print('{} players, minds {}/{}: Game {:.0f} games/sec, '
+                      'KernelGame {:.0f} games/sec ({:.2f}x), adapted minds {:.0f} games/sec'
+                      .format(players, better_hunted, better_creature, game,
+                              kernel_game, kernel_game / game, adapted))
+        raise SystemExit
+    if args.benchmark == 'reset':
+        for players in range(2, 8):
+            for better_hunted, better_creature in ((0, 0), (1, 1)):
+                (new, new_gc), (reset, reset_gc) = reset_benchmark(
+                    players, better_hunted, better_creature, args.games)
+                print('{} players, minds {}/{}: new Games {:.0f} us/game, {} collections '
+                      '(by generation), reset() {:.0f} us/game ({:+.1%}), {} collections'
+                      .format(players, better_hunted, better_creature, new,
+                              '/'.join(map(str, new_gc)), reset, reset / new - 1,
+                              '/'.join(map(str, reset_gc))))
+        raise SystemExit
+    if args.benchmark == 'lockstep':
+        for players in range(2, 8):
+            kernel_game, lockstep_games = lockstep_benchmark(players, args.games)
+            print('{} players, random minds: KernelGame {:.0f} games/sec, '
+                  'lockstep {:.0f} games/sec ({:.1f}x)'
+                  .format(players, kernel_game, lockstep_games, lockstep_games / kernel_game))
+        raise SystemExit
+
+    for players in range(2, 8):
+        results = logging_benchmark(players, args.games)
+        quiet, verbose = results[False], results[True]
+        print('{} players: {:.0f} us/game non-verbose ({:.1f} log records), '
+              '{:.0f} us/game verbose ({:.1f} log records), {:.1f}x faster'
+              .format(players, quiet[0] * 1e6, quiet[1], verbose[0] * 1e6,
+                      verbose[1], verbose[0] / quiet[0]))
@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+
+"""Checkpoints of long batch and sweep runs, so they can be resumed.
+
+A run saves its progress as JSON next to its results ("games.csv.checkpoint")
+every time its results writer writes to disk: the arguments of the run, the
+game number ranges allocated but not yet written, the state of its seed
+RNGs, its partial aggregates and how far the results file was written. The
+checkpoint is replaced atomically, so a crash leaves either the old one or
+the new one, and it is deleted once the run completes.
+
+Rows written after the checkpoint but before a crash are found again on
+resume with the results writer's rows_after(), so no game is played twice.
+"""
+
+import json
+import os
+import random
+
+
+def checkpoint_path(results_path):
+    return results_path + '.checkpoint'
+
+
+def save(path, state):
+    """Atomically replaces the checkpoint at path with state (a JSON-able dict)"""
+    temporary = path + '.tmp'
+    with open(temporary, 'w') as f:
+        json.dump(state, f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temporary, path)
+
+
+def load(path):
+    """Returns the state saved at path"""
+    with open(path) as f:
+        return json.load(f)
+
+
+def remove(path):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+def rng_state(rng):
+    """Returns the state of a random.Random as a JSON-able list"""
+    version, internal, gauss_next = rng.getstate()
+    return [version, list(internal), gauss_next]
+
+
+def restore_rng(state):
+    """Returns a random.Random in a state saved by rng_state()"""
+    rng = random.Random()
+    version, internal, gauss_next = state
+    rng.setstate((version, tuple(internal), gauss_next))
+    return rng
+
+
+def written_since(writer, path, position, ranges):
+    """Returns the rows of ranges of game numbers written after position.
+
+    ranges are (first game number, count) pairs in the order they are written;
+    the rows returned are the complete prefix of them found in the results.
+    """
+    written = {int(row['GAME']): row for row in writer.rows_after(path, position)}
+    rows = []
+    for first_game_number, count in ranges:
+        for game_number in range(first_game_number, first_game_number + count):
+            if game_number not in written:
+                return rows
+            rows.append(written[game_number])
+    return rows
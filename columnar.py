@@ -0,0 +1,221 @@
+#!/usr/bin/env python3
+
+"""A columnar results store for Not Alone simulations.
+
+Each games.csv column is kept as a raw fixed-width typed file in a
+directory (e.g. "games.cols/TURNS.bin"), so results can be opened with
+NumPy memmap and filtered or grouped without parsing any text.
+Text columns are stored as small integer codes, see CODES.
+"""
+
+import argparse
+import array
+import csv
+import os
+
+import notalone
+
+try:
+    import numpy as np
+except ImportError:  # only needed for reading, writing works without it
+    np = None
+
+# array typecode of each column, in games.csv order
+COLUMNS = {
+    'GAME': 'q',
+    'ARTEMIA_BOARD': 'B',
+    'PLAYERS': 'B',
+    'WINNER': 'B',
+    'TURNS': 'B',
+    'HUNTED': 'b',
+    'CREATURE': 'b',
+    'LAIR': 'H',
+    'JUNGLE': 'H',
+    'RIVER': 'H',
+    'BEACH': 'H',
+    'ROVER': 'H',
+    'SWAMP': 'H',
+    'SHELTER': 'H',
+    'WRECK': 'H',
+    'SOURCE': 'H',
+    'ARTEFACT': 'H',
+    'CREATURE_CATCH': 'H',
+    'ARTEMIA_CATCH': 'H',
+    'ADVANCES_FROM_CATCH': 'H',
+    'LAIR_CATCH': 'H',
+    'BETTER_HUNTED': 'B',
+    'BETTER_CREATURE': 'B',
+    'SEED': 'Q'
+}
+
+# text columns are stored as the index of their value in these tuples
+CODES = {
+    'ARTEMIA_BOARD': ('A', 'B'),
+    'WINNER': ('', 'Creature', 'Hunted')
+}
+
+
+def column_path(directory, column):
+    return os.path.join(directory, column + '.bin')
+
+
+def encode(column, value):
+    """Returns the integer stored for a games.csv value"""
+    if column in CODES:
+        return CODES[column].index(value or '')
+    if value in ('', None):  # e.g. games saved before seeds were recorded
+        return 0
+    return int(value)
+
+
+def last_game_number(directory):
+    """Returns the last game number in a columnar store, or 0"""
+    itemsize = array.array(COLUMNS['GAME']).itemsize
+    try:
+        with open(column_path(directory, 'GAME'), 'rb') as f:
+            f.seek(0, os.SEEK_END)
+            size = f.tell() - f.tell() % itemsize
+            if not size:
+                return 0
+            f.seek(size - itemsize)
+            return array.array(COLUMNS['GAME'], f.read(itemsize))[0]
+    except FileNotFoundError:
+        return 0
+
+
+class ColumnarNumberAllocator(notalone.GameNumberAllocator):
+    """Hands out ranges of unused game numbers for a columnar store"""
+
+    def last_game_number(self):
+        return last_game_number(self.path)
+
+
+class ColumnarWriter(notalone.ResultsWriter):
+    """Appends games.csv row dicts to a columnar store, writing them in bulk.
+
+    Every flush appends to all the column files under the store's lock
+    ("games.cols.next", see ResultsWriter.lock()), so the columns of runs
+    writing to one store at the same time still line up row for row.
+    """
+
+    def __init__(self, path='games.cols', flush_every=1000, flush_seconds=5.0,
+                 on_flush=None):
+        super().__init__(path, flush_every, flush_seconds, on_flush)
+
+    def open_output(self):
+        os.makedirs(self.path, exist_ok=True)
+        self.files = {column: open(column_path(self.path, column), 'ab')
+                      for column in COLUMNS}
+        # drop a row left half-written by a run that was killed mid-write; the
+        # rows of other runs writing to the store are whole while the lock is held
+        with self.lock():
+            rows = self.position()
+            for column, f in self.files.items():
+                f.truncate(rows * array.array(COLUMNS[column]).itemsize)
+
+    def write_output(self, rows):
+        for column, typecode in COLUMNS.items():
+            values = array.array(typecode, [encode(column, row[column])
+                                            for row in rows])
+            self.files[column].write(values.tobytes())
+            self.files[column].flush()
+
+    def close_output(self):
+        for f in self.files.values():
+            f.close()
+
+    def sync_output(self):
+        for f in self.files.values():
+            os.fsync(f.fileno())
+
+    def position(self):
+        """Returns the number of complete rows written, for rows_after()"""
+        return min(os.fstat(f.fileno()).st_size // array.array(COLUMNS[column]).itemsize
+                   for column, f in self.files.items())
+
+    @staticmethod
+    def rows_after(path, position, count=None):
+        """Returns the row dicts written after a position() of the store, at most count"""
+        columns = {}
+        for column, typecode in COLUMNS.items():
+            values = array.array(typecode)
+            with open(column_path(path, column), 'rb') as f:
+                f.seek(position * values.itemsize)
+                data = f.read(-1 if count is None else count * values.itemsize)
+            values.frombytes(data[:len(data) - len(data) % values.itemsize])
+            if column in CODES:
+                values = [CODES[column][value] for value in values]
+            columns[column] = values
+        count = min(len(values) for values in columns.values())
+        return [{column: values[i] for column, values in columns.items()}
+                for i in range(count)]
+
+
+class ColumnarResults:
+    """Read-only NumPy memmap views of every column in a columnar store.
+
+    Index it by column name to get an array, e.g.
+    results['WINNER'][results['PLAYERS'] == 5]. Columns are trimmed to the
+    same length, in case a write was interrupted between column files.
+    """
+
+    def __init__(self, path='games.cols'):
+        if np is None:
+            raise ImportError('reading a columnar store requires numpy')
+        self.path = path
+        lengths = {}
+        for column, typecode in COLUMNS.items():
+            size = os.path.getsize(column_path(path, column))
+            lengths[column] = size // np.dtype(typecode).itemsize
+        self.length = min(lengths.values())
+        self.columns = {}
+        for column, typecode in COLUMNS.items():
+            if self.length:
+                self.columns[column] = np.memmap(column_path(path, column),
+                                                 dtype=typecode, mode='r',
+                                                 shape=(self.length,))
+            else:  # numpy cannot memmap an empty file
+                self.columns[column] = np.empty(0, dtype=typecode)
+
+    def __len__(self):
+        return self.length
+
+    def __getitem__(self, column):
+        return self.columns[column]
+
+    def code(self, column, value):
+        """Returns the stored code of a text value, e.g. code('WINNER', 'Hunted')"""
+        return CODES[column].index(value)
+
+    def win_rate(self, winner='Creature', by='PLAYERS', mask=None):
+        """Returns {group value: winner's win rate} grouped by a column"""
+        groups = self.columns[by]
+        wins = self.columns['WINNER'] == self.code('WINNER', winner)
+        if mask is not None:
+            groups = groups[mask]
+            wins = wins[mask]
+        games = np.bincount(groups)
+        won = np.bincount(groups, weights=wins)
+        return {value: float(won[value] / games[value])
+                for value in np.flatnonzero(games).tolist()}
+
+
+def convert_csv(csv_path='games.csv', path='games.cols', chunk_rows=100000):
+    """Streams a games.csv file into a columnar store, returning the row count"""
+    count = 0
+    with open(csv_path, 'r', newline='') as f, \
+            ColumnarWriter(path, flush_every=chunk_rows,
+                           flush_seconds=float('inf')) as results:
+        for row in csv.DictReader(f):
+            results.write(row)
+            count += 1
+    return count
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Convert games.csv to a columnar store.')
+    parser.add_argument('csv', nargs='?', default='games.csv')
+    parser.add_argument('store', nargs='?', default='games.cols')
+    args = parser.parse_args()
+
+    print('Converted {} games'.format(convert_csv(args.csv, args.store)))
@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+
+"""Compact binary event traces of Not Alone games.
+
+A traced game records fixed-size events (turn, phase, actor, action, card id)
+into a ring buffer. The buffer is thrown away when a game ends normally and
+only saved to "traces/" when the game turns out to be anomalous, so every game
+can be traced and the rare bad ones investigated afterwards.
+"""
+
+import argparse
+import os
+import struct
+
+# one event: turn, phase, actor, action, card id
+EVENT = struct.Struct('<BBBBH')
+# saved trace header: magic, game number, seed, players, anomaly, events
+HEADER = struct.Struct('<4sqQBBI')
+MAGIC = b'NATR'
+
+# actors are 0 for the Creature and the Hunted's seat (1-6) otherwise
+CREATURE = 0
+
+# actions, with the card id meaning the card involved (0 if none)
+TURN_START = 1
+GIVE_UP = 2
+RESIST = 3
+PLAY_PLACE = 4
+PLAY_HUNT = 5
+PLACE_CREATURE_TOKEN = 6
+PLACE_ARTEMIA_TOKEN = 7
+PLACE_TARGET_TOKEN = 8
+CREATURE_CATCH = 9
+ARTEMIA_CATCH = 10
+TARGET_HIT = 11
+PROC = 12
+RESCUE_ADVANCE = 13
+GAME_END = 14
+
+ACTION_NAMES = {
+    TURN_START: 'turn starts',
+    GIVE_UP: 'gives up',
+    RESIST: 'resists',
+    PLAY_PLACE: 'plays',
+    PLAY_HUNT: 'plays hunt card',
+    PLACE_CREATURE_TOKEN: 'puts the Creature token on',
+    PLACE_ARTEMIA_TOKEN: 'puts the Artemia token on',
+    PLACE_TARGET_TOKEN: 'puts the Target token on',
+    CREATURE_CATCH: 'is caught by the Creature at',
+    ARTEMIA_CATCH: 'is caught by the Artemia token at',
+    TARGET_HIT: 'is hit by the Target token at',
+    PROC: 'uses',
+    RESCUE_ADVANCE: 'rescue counter moves forward',
+    GAME_END: 'game ends'
+}
+
+# actions of the game itself rather than of a player
+GAME_ACTIONS = {TURN_START, RESCUE_ADVANCE, GAME_END}
+
+# why a trace was saved
+FAILSAFE = 1
+BOTH_WON = 2
+PLAYED_AREA = 3
+
+ANOMALY_NAMES = {
+    FAILSAFE: 'stopped by the 20 turn failsafe',
+    BOTH_WON: 'both teams won',
+    PLAYED_AREA: 'too many cards in the played area'
+}
+
+
+class EventTrace:
+    """A ring buffer of the last capacity events of one game"""
+
+    def __init__(self, capacity=1024):
+        self.capacity = capacity
+        self.buffer = bytearray(capacity * EVENT.size)
+        self.count = 0
+
+    def emit(self, turn, phase, actor, action, card_id=0):
+        """Records one event, overwriting the oldest if the buffer is full"""
+        EVENT.pack_into(self.buffer, (self.count % self.capacity) * EVENT.size,
+                        turn, phase, actor, action, card_id)
+        self.count += 1
+
+    def events(self):
+        """Returns the recorded events as bytes, oldest first"""
+        if self.count <= self.capacity:
+            return bytes(self.buffer[:self.count * EVENT.size])
+        split = (self.count % self.capacity) * EVENT.size
+        return bytes(self.buffer[split:] + self.buffer[:split])
+
+    def save(self, game, anomaly, directory='traces'):
+        """Saves the trace of an anomalous game, returning the file path"""
+        os.makedirs(directory, exist_ok=True)
+        events = self.events()
+        path = os.path.join(directory, 'game_{}.trace'.format(game.game_number))
+        with open(path, 'wb') as f:
+            f.write(HEADER.pack(MAGIC, game.game_number, game.seed,
+                                len(game.hunted) + 1, anomaly,
+                                len(events) // EVENT.size))
+            f.write(events)
+        return path
+
+
+def decode(path, card_names):
+    """Returns the lines of a human-readable log of a saved trace.
+
+    card_names maps card ids to card names, see notalone.card_names.
+    """
+    with open(path, 'rb') as f:
+        data = f.read()
+    magic, game_number, seed, players, anomaly, count = HEADER.unpack_from(data)
+    if magic != MAGIC:
+        raise ValueError('{} is not a game trace'.format(path))
+    lines = ['GAME {} ({} players, seed {}): {}'.format(
+        game_number, players, seed, ANOMALY_NAMES.get(anomaly, 'unknown'))]
+    for turn, phase, actor, action, card_id in EVENT.iter_unpack(
+            data[HEADER.size:HEADER.size + count * EVENT.size]):
+        what = ACTION_NAMES.get(action, 'action {}'.format(action))
+        if action in GAME_ACTIONS:
+            line = 'Turn {} Phase {}: {}'.format(turn, phase, what)
+        else:
+            who = 'Creature' if actor == CREATURE else 'Hunted {}'.format(actor)
+            line = 'Turn {} Phase {}: {} {}'.format(turn, phase, who, what)
+        if card_id:
+            line += ' {}'.format(card_names[card_id])
+        lines.append(line)
+    return lines
+
+
+if __name__ == "__main__":
+    import notalone
+
+    parser = argparse.ArgumentParser(description='Decode saved game traces.')
+    parser.add_argument('traces', nargs='+')
+    args = parser.parse_args()
+
+    for path in args.traces:
+        print('\n'.join(decode(path, notalone.card_names)))
@@ -0,0 +1,827 @@
+#!/usr/bin/env python3
+
+"""An integer-indexed game state kernel for Not Alone simulations.
+
+KernelGame plays by the same rules as notalone.Game, but cards are small
+integer ids: hands and the reserve are count arrays, token positions are
+place indices, the active hunt cards are a bitmask and the game counter is
+a fixed-slot list. The played areas and discard piles stay short ordered
+lists of ids, because the order in which Game resolves them matters.
+
+The kernel's own minds speak place and card ids directly. The existing
+minds of notalone keep working through MindAdapter, which shows them the
+usual card objects and translates their answers back into ids.
+"""
+
+import collections
+import random
+
+import notalone
+
+# place index of every place card, which is its card number minus 1
+PLACES = ('The Lair', 'The Jungle', 'The River', 'The Beach', 'The Rover',
+          'The Swamp', 'The Shelter', 'The Wreck', 'The Source', 'The Artefact')
+LAIR, JUNGLE, RIVER, BEACH, ROVER, SWAMP, SHELTER, WRECK, SOURCE, ARTEFACT = range(10)
+STARTING_HAND = (LAIR, JUNGLE, RIVER, BEACH, ROVER)
+RESERVE_PLACES = (SWAMP, SHELTER, WRECK, SOURCE, ARTEFACT)
+NO_PLACE = -1
+
+# hunt card ids, in cards.csv order
+HUNT_CARDS = ('Forbidden Zone', 'Phobia', 'Ascendancy', 'Scream', 'Force Field',
+              'Toxin', 'Mutation', 'Virus', 'Persecution', 'Anticipation',
+              'Interference', 'Flashback', 'Detour', 'Stasis', 'Despair',
+              'Tracking', 'Fierceness', 'Mirage', 'Cataclysm', 'Clone')
+(FORBIDDEN_ZONE, PHOBIA, ASCENDANCY, SCREAM, FORCE_FIELD, TOXIN, MUTATION,
+ VIRUS, PERSECUTION, ANTICIPATION, INTERFERENCE, FLASHBACK, DETOUR, STASIS,
+ DESPAIR, TRACKING, FIERCENESS, MIRAGE, CATACLYSM, CLONE) = range(20)
+
+# slots of the game counter
+TURN = 0
+PROC = 1  # PROC + place index counts the procs of each place
+CREATURE_CATCH = 11
+ARTEMIA_CATCH = 12
+ADVANCES_FROM_CATCH = 13
+LAIR_CATCH = 14
+COUNTER_SLOTS = 15
+
+# card definitions in id order, built from notalone's catalogue on import
+place_card_list = []
+hunt_card_list = []
+survival_card_list = []
+hunt_phases = []
+player_names = []
+
+
+def load_tables():
+    """Builds the id-indexed card tables and player names from notalone's catalogue"""
+    if place_card_list:
+        return
+    place_card_list.extend(notalone.place_cards[name] for name in PLACES)
+    hunt_card_list.extend(notalone.hunt_cards[name] for name in HUNT_CARDS)
+    survival_card_list.extend(notalone.survival_cards.values())
+    hunt_phases.extend(int(card.phase) for card in hunt_card_list)
+    player_names.extend(notalone.player_names)
+
+
+load_tables()
+
+
+def pick(counts, total, rng):
+    """Returns an index of counts, weighted by the counts"""
+    r = rng.randrange(total)
+    for index, count in enumerate(counts):
+        r -= count
+        if r < 0:
+            return index
+
+
+class KernelGame:
+    """A session of Not Alone on integer-indexed state."""
+
+    def __init__(self, players, better_hunted, better_creature, game_number=0,
+                 seed=None, adapt_minds=False):
+        self.game_number = game_number
+        if seed is None:
+            seed = random.getrandbits(64)
+        self.seed = seed
+        self.rng = random.Random(seed)
+        self.better_hunted = better_hunted
+        self.better_creature = better_creature
+
+        names = self.rng.sample(player_names, int(players))
+        self.creature = KernelCreature(names[0], self)
+        self.hunted = []
+        for name in names[1:]:
+            self.hunted.append(KernelHunted(name, self))
+
+        # create reserve of place cards based on number of hunted
+        self.reserve = [0] * 10
+        for place in RESERVE_PLACES:
+            self.reserve[place] = notalone.Game.PLACE_CARD_COPIES[len(self.hunted)]
+        self.reserve_size = sum(self.reserve)
+
+        self.artemia = self.rng.choice(['A', 'B'])
+        self.artemia_spaces = notalone.Game.ARTEMIA_SPACES[self.artemia]
+
+        self.survival_deck = notalone.Deck(range(len(survival_card_list)), self.rng)
+        self.hunt_deck = notalone.Deck(range(len(HUNT_CARDS)), self.rng)
+
+        self.beach_marker_on = False
+        self.beach_proced_in_turn = False
+        self.wreck_proced_in_turn = False
+
+        # hunt cards played this turn, as a bitmask of hunt card ids
+        self.hunt_card_played = 0
+        self.hunt_card_artemia = False
+        self.hunt_card_target = False
+        self.anticipation_target = None
+
+        # token positions as place indices
+        self.c_token = NO_PLACE
+        self.a_token = NO_PLACE
+        self.t_token = NO_PLACE
+
+        self.creature_spaces_to_win, self.hunted_spaces_to_win = \
+            notalone.Game.GOAL_CREATURE_HUNTED[int(players)]
+        self.counter = [0] * COUNTER_SLOTS
+
+        # minds are created last, as the adapted minds look at the whole game
+        if adapt_minds:
+            self.view = GameView(self)
+            self.creature.mind = MindAdapter(
+                notalone.BetterCreatureMind if better_creature else notalone.RandomCreatureMind,
+                CreatureView(self.creature, self.view))
+            for hunted, view in zip(self.hunted, self.view.hunted):
+                hunted.mind = MindAdapter(
+                    notalone.BetterHuntedMind if better_hunted else notalone.RandomHuntedMind,
+                    view)
+        else:
+            self.creature.mind = (BetterCreatureMind if better_creature
+                                  else RandomCreatureMind)(self.creature)
+            for hunted in self.hunted:
+                hunted.mind = (BetterHuntedMind if better_hunted
+                               else RandomHuntedMind)(hunted)
+
+        self.creature.draw_hunt_card(3)
+
+    def game_over(self):
+        """Returns True if game is over"""
+        return self.creature_spaces_to_win < 1 or self.hunted_spaces_to_win < 1
+
+    def play_hunt_cards(self, phase):
+        creature = self.creature
+        for card in creature.to_play:
+            if hunt_phases[card] == phase:
+                creature.play_hunt_card(card)
+
+    def play(self):
+        """Plays a game by the rules of notalone.Game.play, returning its games.csv row dict"""
+        counter = self.counter
+        creature = self.creature
+        hunted_players = self.hunted
+        while counter[TURN] < 20:
+            # start of turn clean-up steps
+            counter[TURN] += 1
+            self.beach_proced_in_turn = False
+            self.wreck_proced_in_turn = False
+            self.hunt_card_artemia = False
+            self.hunt_card_target = False
+            self.hunt_card_played = 0
+            creature.to_play = []
+            self.anticipation_target = None
+            self.c_token = self.a_token = self.t_token = NO_PLACE
+
+            # PHASE 1
+            if creature.tracking_turn:
+                creature.mind.choose_cards_to_play_this_turn(2)
+                creature.tracking_turn = False
+            else:
+                creature.mind.choose_cards_to_play_this_turn(1)
+            self.play_hunt_cards(1)
+
+            for hunted in hunted_players:
+                mind = hunted.mind
+                if mind.decide_if_give_up():
+                    hunted.give_up()
+                will_lost = mind.decide_if_resist()
+                if will_lost:
+                    hunted.resist(will_lost)
+                hunted.play_card()
+                if self.game_over():
+                    break
+                # as in Game.play, the Artefact flag is cleared before it is checked
+                hunted.artefact_turn = False
+                if hunted.river_turn:
+                    hunted.play_card()
+
+            if self.game_over():
+                break
+
+            # PHASE 2
+            self.play_hunt_cards(2)
+            self.c_token = creature.mind.choose_place_to_put_token()
+            if self.hunted_spaces_to_win in self.artemia_spaces or self.hunt_card_artemia:
+                self.a_token = creature.mind.choose_place_to_put_token()
+            if self.hunt_card_target:
+                self.t_token = creature.mind.choose_place_to_put_token()
+
+            for hunted in hunted_players:
+                if hunted.river_turn:
+                    hunted.river_turn = False
+                    if len(hunted.played) == 2:
+                        hunted.return_card_to_hand(hunted.mind.choose_card_to_return())
+                if len(hunted.played) > 2:
+                    notalone.logger.error('Game {}: {} somehow has {} cards in the played area'
+                                          .format(self.game_number, hunted.name, len(hunted.played)))
+
+            # PHASE 3
+            caught_at_least_one = False
+            self.play_hunt_cards(3)
+            active = self.hunt_card_played
+            for hunted in hunted_players:
+                # iterating the live list skips cards moved out of it, as in Game.play
+                for played in hunted.played:
+                    if played == self.c_token:
+                        counter[CREATURE_CATCH] += 1
+                        if played == LAIR:
+                            counter[LAIR_CATCH] += 1
+                            hunted.will -= 3 if active & (1 << FIERCENESS) else 2
+                        else:
+                            hunted.will -= 2 if active & (1 << FIERCENESS) else 1
+                        if not caught_at_least_one:
+                            counter[ADVANCES_FROM_CATCH] += 1
+                            self.creature_spaces_to_win -= 1
+                            caught_at_least_one = True
+                    elif played == self.a_token:
+                        counter[ARTEMIA_CATCH] += 1
+                        if hunted.hand_size:
+                            hunted.discard_place(hunted.mind.choose_card_to_discard())
+                        if active & (1 << MUTATION):
+                            hunted.will -= 1
+                    elif played == self.t_token:
+                        if active & (1 << SCREAM):
+                            # Game.play never manages to discard for Scream, so only will is lost
+                            if hunted.mind.choose_lose_will_scream():
+                                hunted.will -= 1
+                            hunted.proc(played)
+                    else:
+                        hunted.proc(played)
+                    if self.game_over():
+                        break
+                if self.game_over():
+                    break
+            if self.game_over():
+                break
+
+            # PHASE 4
+            self.play_hunt_cards(4)
+            if not self.hunt_card_played & (1 << STASIS):
+                self.hunted_spaces_to_win -= 1
+                if self.game_over():
+                    break
+
+            # move played cards into discard piles, skipping like Game.play does
+            for hunted in hunted_players:
+                for card in hunted.played:
+                    hunted.played.remove(card)
+                    hunted.discard.append(card)
+
+            # creature draws hunt cards back up to 3
+            if not creature.draw_hunt_card(3 - len(creature.hhand)):
+                notalone.logger.error('Game {}: tried to draw hunt cards but failed. {} cards in hunt deck'
+                                      .format(self.game_number, len(self.hunt_deck)))
+
+        if self.creature_spaces_to_win < 1 and self.hunted_spaces_to_win < 1:
+            notalone.logger.warning('Game {}: Somehow, both teams won at the same time'
+                                    .format(self.game_number))
+        if self.creature_spaces_to_win < 1:
+            self.winner = 'Creature'
+        elif self.hunted_spaces_to_win < 1:
+            self.winner = 'Hunted'
+        else:
+            self.winner = ''
+            notalone.logger.warning('Game {}: stopped by the failsafe after {} turns with no winner'
+                                    .format(self.game_number, counter[TURN]))
+        return self.result_row()
+
+    def result_row(self):
+        """Returns the stats of a finished game as a games.csv row dict"""
+        counter = self.counter
+        return {'GAME': self.game_number,
+                'ARTEMIA_BOARD': self.artemia,
+                'PLAYERS': len(self.hunted) + 1,
+                'WINNER': self.winner,
+                'TURNS': counter[TURN],
+                'HUNTED': self.hunted_spaces_to_win,
+                'CREATURE': self.creature_spaces_to_win,
+                'LAIR': counter[PROC + LAIR],
+                'JUNGLE': counter[PROC + JUNGLE],
+                'RIVER': counter[PROC + RIVER],
+                'BEACH': counter[PROC + BEACH],
+                'ROVER': counter[PROC + ROVER],
+                'SWAMP': counter[PROC + SWAMP],
+                'SHELTER': counter[PROC + SHELTER],
+                'WRECK': counter[PROC + WRECK],
+                'SOURCE': counter[PROC + SOURCE],
+                'ARTEFACT': counter[PROC + ARTEFACT],
+                'CREATURE_CATCH': counter[CREATURE_CATCH],
+                'ARTEMIA_CATCH': counter[ARTEMIA_CATCH],
+                'ADVANCES_FROM_CATCH': counter[ADVANCES_FROM_CATCH],
+                'LAIR_CATCH': counter[LAIR_CATCH],
+                'BETTER_HUNTED': self.better_hunted,
+                'BETTER_CREATURE': self.better_creature,
+                'SEED': self.seed
+                }
+
+
+class KernelHunted:
+    """A Hunted player, with their hand as counts per place index."""
+
+    __slots__ = ('name', 'game', 'seat', 'will', 'hand', 'hand_size', 'played',
+                 'discard', 'shand', 'river_turn', 'artefact_turn', 'mind')
+
+    def __init__(self, name, game):
+        self.name = name
+        self.game = game
+        self.seat = len(game.hunted) + 1
+        self.will = 3
+        self.hand = [0] * 10
+        for place in STARTING_HAND:
+            self.hand[place] = 1
+        self.hand_size = len(STARTING_HAND)
+        self.played = []
+        self.discard = []
+        self.shand = []
+        self.river_turn = False
+        self.artefact_turn = False
+        self.mind = None
+
+    def __repr__(self):
+        return '{}({})'.format(self.name, self.mind)
+
+    def owns(self, place):
+        """Returns True if the place is in this Hunted's hand, played area or discard"""
+        return bool(self.hand[place]) or place in self.played or place in self.discard
+
+    def resist(self, will_lost):
+        """In phase 1, lose x will to take back 2x cards"""
+        self.will -= will_lost
+        for i in range(will_lost * 2):
+            self.take_back(self.mind.card_to_take_back())
+
+    def give_up(self):
+        """In phase 1, take back cards and will and advance creature 1 space"""
+        self.will = 3
+        # iterating the live discard takes back every other card, as in Game
+        discard = self.discard
+        for card in discard:
+            discard.remove(card)
+            self.hand[card] += 1
+            self.hand_size += 1
+        self.game.creature_spaces_to_win -= 1
+
+    def play_card(self):
+        """In phase 2, play a place card face down"""
+        if self.hand_size:
+            card = self.mind.choose_card_to_play()
+            self.hand[card] -= 1
+            self.hand_size -= 1
+            self.played.append(card)
+
+    def take_back(self, card):
+        """Take back a place card from discard pile to hand"""
+        if card is not None:
+            self.discard.remove(card)
+            self.hand[card] += 1
+            self.hand_size += 1
+
+    def take_from_reserve(self, card):
+        """Take a place card from reserve to hand using the Rover"""
+        self.game.reserve[card] -= 1
+        self.game.reserve_size -= 1
+        self.hand[card] += 1
+        self.hand_size += 1
+
+    def discard_place(self, card):
+        """Discard a place card"""
+        self.hand[card] -= 1
+        self.hand_size -= 1
+        self.discard.append(card)
+
+    def return_card_to_hand(self, card):
+        """Returns place card from played zone to hand"""
+        self.played.remove(card)
+        self.hand[card] += 1
+        self.hand_size += 1
+
+    def draw_survival(self):
+        """Draw a survival card, using the Shelter or the Source"""
+        card = self.game.survival_deck.draw()
+        if card is None:
+            notalone.logger.warning('Tried to draw a survival card when none were left')
+        else:
+            self.shand.append(card)
+
+    def return_to_hand(self, place):
+        """Returns this place card, or else the Lair, from the played area (Jungle, Swamp)"""
+        if place in self.played:
+            self.return_card_to_hand(place)
+        elif LAIR in self.played:
+            self.return_card_to_hand(LAIR)
+
+    def proc(self, place):
+        """Triggers the effect of the place card with this place index"""
+        game = self.game
+        game.counter[PROC + place] += 1
+        if place == LAIR:
+            if self.mind.lair_choose_takeback():
+                # iterating the live discard takes back every other card, as in Game
+                for card in self.discard:
+                    self.take_back(card)
+            else:
+                self.proc(game.c_token)
+        elif place == JUNGLE:
+            self.return_to_hand(JUNGLE)
+            self.take_back(self.mind.choose_take_back())
+        elif place == RIVER:
+            self.river_turn = True
+        elif place == BEACH:
+            if game.hunt_card_played & (1 << INTERFERENCE):
+                return
+            if not game.beach_proced_in_turn:
+                game.beach_proced_in_turn = True
+                if game.beach_marker_on:
+                    game.hunted_spaces_to_win -= 1
+                game.beach_marker_on = not game.beach_marker_on
+        elif place == ROVER:
+            card = self.mind.choose_card_from_reserve()
+            if card is not None:
+                self.take_from_reserve(card)
+        elif place == SWAMP:
+            self.return_to_hand(SWAMP)
+            self.take_back(self.mind.choose_take_back())
+            self.take_back(self.mind.choose_take_back())
+        elif place == SHELTER:
+            deck = game.survival_deck
+            cards = [deck.draw(), deck.draw()]
+            if cards[1] is None:
+                if cards[0] is not None:
+                    self.shand.append(cards[0])
+                notalone.logger.warning('{} visited the Shelter but there were not enough cards in the survival deck even after shuffling in the discard'.format(self.name))
+            else:
+                card_to_draw, card_to_discard = self.mind.choose_survival_card_at_shelter(cards)
+                self.shand.append(card_to_draw)
+                deck.discard(card_to_discard)
+        elif place == WRECK:
+            if game.hunt_card_played & (1 << INTERFERENCE):
+                return
+            if not game.wreck_proced_in_turn:
+                game.wreck_proced_in_turn = True
+                game.hunted_spaces_to_win -= 1
+        elif place == SOURCE:
+            if self.mind.source_choose_will():
+                self.mind.player_to_gain_will().will += 1
+            else:
+                self.draw_survival()
+        elif place == ARTEFACT:
+            self.artefact_turn = True
+
+
+class KernelCreature:
+    """The Creature player, with hunt cards as hunt card ids."""
+
+    __slots__ = ('name', 'game', 'hhand', 'tracking_turn', 'to_play', 'mind')
+
+    def __init__(self, name, game):
+        self.name = name
+        self.game = game
+        self.hhand = []
+        self.tracking_turn = False
+        self.to_play = []
+        self.mind = None
+
+    def draw_hunt_card(self, number_of_cards=1):
+        """Draws x hunt cards, returning False if the hunt deck ran out"""
+        deck = self.game.hunt_deck
+        for i in range(number_of_cards):
+            card = deck.draw()
+            if card is None:
+                return False
+            self.hhand.append(card)
+        return True
+
+    def play_hunt_card(self, card):
+        """Applies a hunt card by id and moves it to the hunt discard"""
+        game = self.game
+        if card == FORBIDDEN_ZONE:
+            for hunted in game.hunted:
+                if hunted.hand_size:
+                    hunted.discard_place(hunted.mind.choose_card_to_discard())
+        elif card == PHOBIA:
+            game.hunt_card_artemia = True
+            target = self.mind.choose_player_for_phobia()
+            for i in range(target.hand_size - 2):
+                target.mind.choose_card_to_reveal()
+        elif card == ASCENDANCY:
+            target = self.mind.choose_player_for_ascendancy()
+            for i in range(target.hand_size - 2):
+                target.discard_place(target.mind.choose_card_to_discard())
+        elif card in (SCREAM, TOXIN, CLONE):
+            game.hunt_card_target = True
+        elif card in (MUTATION, VIRUS, DESPAIR):
+            game.hunt_card_artemia = True
+        elif card == ANTICIPATION:
+            game.anticipation_target = self.mind.choose_player_for_anticipation()
+        elif card == TRACKING:
+            self.tracking_turn = True
+        game.hunt_card_played |= 1 << card
+        self.hhand.remove(card)
+        game.hunt_deck.discard(card)
+
+
+class RandomHuntedMind:
+    """notalone.RandomHuntedMind, deciding on place indices"""
+
+    def __init__(self, player):
+        self.player = player
+        self.rng = player.game.rng
+
+    def choose_card_to_play(self):
+        """Returns a random place index from the Hunted's hand"""
+        return pick(self.player.hand, self.player.hand_size, self.rng)
+
+    choose_card_to_discard = choose_card_to_play
+    choose_card_to_reveal = choose_card_to_play
+
+    def choose_take_back(self):
+        """Returns a random place index from Hunted's discard or None if discard is empty"""
+        return self.rng.choice(self.player.discard) if self.player.discard else None
+
+    card_to_take_back = choose_take_back
+
+    def decide_if_give_up(self):
+        return self.player.will == 1 and self.player.hand_size < 3
+
+    def decide_if_resist(self):
+        hand_size = self.player.hand_size
+        if hand_size < 2:
+            return 1
+        elif (self.player.river_turn or self.player.artefact_turn) and hand_size < 3:
+            return 1
+        return False
+
+    def lair_choose_takeback(self):
+        return len(self.player.discard) > 2
+
+    def reserve_candidates(self):
+        """Returns the reserve counts of the places this Hunted does not own"""
+        return [0 if self.player.owns(place) else count
+                for place, count in enumerate(self.player.game.reserve)]
+
+    def choose_card_from_reserve(self):
+        """Returns a random place index from the reserve that can be taken"""
+        candidates = self.reserve_candidates()
+        total = sum(candidates)
+        if not total:
+            return None
+        return pick(candidates, total, self.rng)
+
+    def choose_survival_card_at_shelter(self, cards):
+        if self.rng.randint(0, 1) > 0:
+            return cards[0], cards[1]
+        return cards[1], cards[0]
+
+    def choose_card_to_return(self):
+        return self.rng.choice(self.player.played)
+
+    def source_choose_will(self):
+        game = self.player.game
+        if game.survival_deck.empty():
+            return True
+        return self.rng.choice([True, False])
+
+    def player_to_gain_will(self):
+        return self.rng.choice(self.player.game.hunted)
+
+    def choose_lose_will_scream(self):
+        return self.player.hand_size <= 1
+
+
+class BetterHuntedMind(RandomHuntedMind):
+    """notalone.BetterHuntedMind, deciding on place indices"""
+
+    def choose_card_from_reserve(self):
+        """Always takes the Wreck before other places"""
+        if self.player.game.reserve[WRECK] and not self.player.owns(WRECK):
+            return WRECK
+        return super().choose_card_from_reserve()
+
+
+class RandomCreatureMind:
+    """notalone.RandomCreatureMind, deciding on place indices and hunt card ids"""
+
+    def __init__(self, player):
+        self.player = player
+        self.rng = player.game.rng
+
+    def choose_place_to_put_token(self):
+        """Returns a random place index out of those in the Hunteds' hands+played"""
+        seen = 0
+        for hunted in self.player.game.hunted:
+            for place in hunted.played:
+                seen |= 1 << place
+            for place, count in enumerate(hunted.hand):
+                if count:
+                    seen |= 1 << place
+        return self.rng.choice([place for place in range(10) if seen >> place & 1])
+
+    def choose_cards_to_play_this_turn(self, number=1):
+        try:
+            self.player.to_play = self.rng.sample(self.player.hhand, number)
+        except ValueError:
+            self.player.to_play = []
+            notalone.logger.error('Game {}: {} tried to sample {} hunt cards from his hand but only had {} card'
+                                  .format(self.player.game.game_number, self.player.name,
+                                          number, len(self.player.hhand)))
+
+    def choose_player_for_phobia(self):
+        candidates = [hunted for hunted in self.player.game.hunted
+                      if hunted.hand_size > 2]
+        return self.rng.choice(candidates or self.player.game.hunted)
+
+    choose_player_for_ascendancy = choose_player_for_phobia
+
+    def choose_player_for_anticipation(self):
+        hunted_players = self.player.game.hunted
+        fewest_place_cards = min(hunted.hand_size for hunted in hunted_players)
+        return self.rng.choice([hunted for hunted in hunted_players
+                                if hunted.hand_size == fewest_place_cards])
+
+
+class BetterCreatureMind(RandomCreatureMind):
+    """notalone.BetterCreatureMind, deciding on place indices"""
+
+    def choose_place_to_put_token(self):
+        """Returns a probability-weighted place index to place a token on"""
+        prob = [0.0] * 10
+        for hunted in self.player.game.hunted:
+            size = hunted.hand_size + len(hunted.played)
+            if not size:
+                continue
+            share = 1 / size
+            for place, count in enumerate(hunted.hand):
+                if count:
+                    prob[place] += count * share
+            for place in hunted.played:
+                prob[place] += share
+        return self.rng.choices(range(10), weights=prob)[0]
+
+
+class MindAdapter:
+    """Lets a notalone mind play a KernelGame.
+
+    The mind is created for a view of the kernel player, so it sees the usual
+    card objects, and the cards and players it chooses are translated back
+    into place indices and kernel players.
+    """
+
+    def __init__(self, mind_class, view):
+        self.mind = mind_class(view)
+        self.view = view
+
+    def __repr__(self):
+        return repr(self.mind)
+
+    def __getattr__(self, name):
+        # yes/no and will decisions need no translating
+        return getattr(self.mind, name)
+
+    def place(self, card):
+        return None if card is None else place_card_list.index(card)
+
+    def choose_card_to_play(self):
+        return self.place(self.mind.choose_card_to_play())
+
+    def choose_card_to_discard(self):
+        return self.place(self.mind.choose_card_to_discard())
+
+    def choose_card_to_reveal(self):
+        return self.place(self.mind.choose_card_to_reveal())
+
+    def choose_take_back(self):
+        return self.place(self.mind.choose_take_back())
+
+    def card_to_take_back(self):
+        return self.place(self.mind.card_to_take_back())
+
+    def choose_card_from_reserve(self):
+        return self.place(self.mind.choose_card_from_reserve())
+
+    def choose_card_to_return(self):
+        return self.place(self.mind.choose_card_to_return())
+
+    def choose_survival_card_at_shelter(self, cards):
+        chosen = self.mind.choose_survival_card_at_shelter(
+            [survival_card_list[card] for card in cards])
+        return tuple(survival_card_list.index(card) for card in chosen)
+
+    def player_to_gain_will(self):
+        return self.mind.player_to_gain_will().player
+
+    def choose_place_to_put_token(self):
+        return PLACES.index(self.mind.choose_place_name_to_put_token())
+
+    def choose_player_for_phobia(self):
+        return self.mind.choose_player_for_phobia().player
+
+    def choose_player_for_ascendancy(self):
+        return self.mind.choose_player_for_ascendancy().player
+
+    def choose_player_for_anticipation(self):
+        return self.mind.choose_player_for_anticipation().player
+
+
+class GameView:
+    """The parts of a KernelGame that notalone minds look at, as card objects"""
+
+    def __init__(self, game):
+        self.game = game
+        self.rng = game.rng
+        self.hunted = [HuntedView(hunted, self) for hunted in game.hunted]
+
+    @property
+    def game_number(self):
+        return self.game.game_number
+
+    @property
+    def creature_spaces_to_win(self):
+        return self.game.creature_spaces_to_win
+
+    @property
+    def reserve(self):
+        return [place_card_list[place] for place, count in enumerate(self.game.reserve)
+                for i in range(count)]
+
+    @property
+    def reserve_counts(self):
+        return collections.Counter({place_card_list[place].name: count
+                                    for place, count in enumerate(self.game.reserve) if count})
+
+    def place_probabilities(self):
+        """Returns notalone.Game.place_probabilities() of the kernel game"""
+        table = collections.Counter()
+        for hunted in self.game.hunted:
+            size = hunted.hand_size + len(hunted.played)
+            for place, count in enumerate(hunted.hand):
+                if count:
+                    table[PLACES[place]] += count / size
+            for place in hunted.played:
+                table[PLACES[place]] += 1 / size
+        return table
+
+    @property
+    def survival_deck(self):
+        # minds only ask whether it is empty(), which needs no card objects
+        return self.game.survival_deck
+
+
+class HuntedView:
+    """A KernelHunted as notalone minds see a Hunted"""
+
+    def __init__(self, player, game):
+        self.player = player
+        self.game = game
+        self.name = player.name
+
+    @property
+    def will(self):
+        return self.player.will
+
+    @property
+    def river_turn(self):
+        return self.player.river_turn
+
+    @property
+    def artefact_turn(self):
+        return self.player.artefact_turn
+
+    @property
+    def phand(self):
+        return [place_card_list[place] for place, count in enumerate(self.player.hand)
+                for i in range(count)]
+
+    @property
+    def owned(self):
+        return {name for place, name in enumerate(PLACES) if self.player.owns(place)}
+
+    def owns(self, place_name):
+        return self.player.owns(PLACES.index(place_name))
+
+    @property
+    def played(self):
+        return [place_card_list[place] for place in self.player.played]
+
+    @property
+    def discard(self):
+        return [place_card_list[place] for place in self.player.discard]
+
+
+class CreatureView:
+    """A KernelCreature as notalone minds see the Creature"""
+
+    def __init__(self, player, game):
+        self.player = player
+        self.game = game
+        self.name = player.name
+
+    @property
+    def hhand(self):
+        return [hunt_card_list[card] for card in self.player.hhand]
+
+    @property
+    def hunt_cards_to_play(self):
+        return [hunt_card_list[card] for card in self.player.to_play]
+
+    @hunt_cards_to_play.setter
+    def hunt_cards_to_play(self, cards):
+        self.player.to_play = [hunt_card_list.index(card) for card in cards]
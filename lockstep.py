@@ -0,0 +1,493 @@
+#!/usr/bin/env python3
+
+"""A NumPy engine that plays thousands of random-mind games of Not Alone at once.
+
+LockstepGames advances every game of one player count together through the
+phases of notalone.Game.play, for RandomHuntedMind against RandomCreatureMind.
+Hands, will, counters and token positions are arrays with one row per game
+and every random decision is drawn for all games in one call. Finished games
+are masked out and keep their final state.
+
+The state layout follows kernel.KernelGame: place indices, count arrays for
+hands and the reserve, and short ordered arrays for the played areas and
+discard piles, which resolve in the same order as Game's lists do.
+"""
+
+import argparse
+
+import numpy as np
+
+import kernel
+import notalone
+from kernel import (LAIR, JUNGLE, RIVER, BEACH, ROVER, SWAMP, SHELTER, WRECK,
+                    SOURCE, ARTEFACT, STARTING_HAND, RESERVE_PLACES, NO_PLACE,
+                    FORBIDDEN_ZONE, PHOBIA, ASCENDANCY, SCREAM, TOXIN, MUTATION,
+                    VIRUS, INTERFERENCE, STASIS, DESPAIR, TRACKING, FIERCENESS,
+                    CLONE, TURN, PROC, CREATURE_CATCH, ARTEMIA_CATCH,
+                    ADVANCES_FROM_CATCH, LAIR_CATCH, COUNTER_SLOTS)
+
+# widest played area and discard pile a game can need
+PLAYED_SLOTS = 4
+DISCARD_SLOTS = 12
+
+# where each hunt card is
+IN_DECK = 0
+IN_HAND = 1
+IN_DISCARD = 2
+
+
+class LockstepGames:
+    """no_of_games random-mind games with the same number of players"""
+
+    def __init__(self, players, no_of_games, seed=None):
+        self.players = int(players)
+        self.no_of_games = n = no_of_games
+        self.hunted = h = self.players - 1
+        self.rng = np.random.default_rng(seed)
+        self.seed = seed
+        self.hunt_phases = np.array(kernel.hunt_phases)
+
+        self.hand = np.zeros((n, h, 10), dtype=np.int16)
+        self.hand[:, :, list(STARTING_HAND)] = 1
+        self.hand_size = np.full((n, h), len(STARTING_HAND), dtype=np.int16)
+        self.played = np.full((n, h, PLAYED_SLOTS), NO_PLACE, dtype=np.int8)
+        self.played_len = np.zeros((n, h), dtype=np.int16)
+        self.discard = np.full((n, h, DISCARD_SLOTS), NO_PLACE, dtype=np.int8)
+        self.discard_len = np.zeros((n, h), dtype=np.int16)
+        self.will = np.full((n, h), 3, dtype=np.int16)
+        self.river_turn = np.zeros((n, h), dtype=bool)
+        self.artefact_turn = np.zeros((n, h), dtype=bool)
+
+        self.reserve = np.zeros((n, 10), dtype=np.int16)
+        self.reserve[:, list(RESERVE_PLACES)] = notalone.Game.PLACE_CARD_COPIES[h]
+        self.survival_deck = np.full(n, 15, dtype=np.int16)
+        self.survival_discard = np.zeros(n, dtype=np.int16)
+        self.hunt_cards = np.full((n, len(kernel.HUNT_CARDS)), IN_DECK, dtype=np.int8)
+        self.to_play = np.full((n, 2), -1, dtype=np.int8)
+        self.tracking_turn = np.zeros(n, dtype=bool)
+
+        # 0 for side A, 1 for side B, with a lookup of the spaces with artemia icons
+        self.artemia = self.rng.integers(0, 2, n)
+        self.artemia_spaces = np.zeros((2, 32), dtype=bool)
+        for side, spaces in enumerate(('A', 'B')):
+            self.artemia_spaces[side, list(notalone.Game.ARTEMIA_SPACES[spaces])] = True
+
+        creature, hunted = notalone.Game.GOAL_CREATURE_HUNTED[self.players]
+        self.creature_spaces_to_win = np.full(n, creature, dtype=np.int16)
+        self.hunted_spaces_to_win = np.full(n, hunted, dtype=np.int16)
+        self.beach_marker_on = np.zeros(n, dtype=bool)
+        self.beach_proced_in_turn = np.zeros(n, dtype=bool)
+        self.wreck_proced_in_turn = np.zeros(n, dtype=bool)
+        self.hunt_card_played = np.zeros(n, dtype=np.int32)
+        self.hunt_card_artemia = np.zeros(n, dtype=bool)
+        self.hunt_card_target = np.zeros(n, dtype=bool)
+        self.caught = np.zeros(n, dtype=bool)
+        self.c_token = np.full(n, NO_PLACE, dtype=np.int8)
+        self.a_token = np.full(n, NO_PLACE, dtype=np.int8)
+        self.t_token = np.full(n, NO_PLACE, dtype=np.int8)
+        self.counter = np.zeros((n, COUNTER_SLOTS), dtype=np.int16)
+        self.running = np.ones(n, dtype=bool)
+        # anomalies Game would log, counted instead of logged once per game
+        self.errors = 0
+
+        self.draw_hunt_cards(np.arange(n), np.full(n, 3))
+
+    # helpers on the rows (game indices) r of seat h
+
+    def pick(self, counts, total):
+        """Returns a column of each row of counts, weighted by the counts"""
+        target = (self.rng.random(len(total)) * total).astype(np.int64)
+        return (counts.cumsum(1) <= target[:, None]).sum(1)
+
+    def uniform(self, rows_valid):
+        """Returns a random True column of each row of a bool matrix"""
+        keys = np.where(rows_valid, self.rng.random(rows_valid.shape), -1.0)
+        return keys.argmax(1)
+
+    def to_hand(self, r, h, places):
+        self.hand[r, h, places] += 1
+        self.hand_size[r, h] += 1
+
+    def append(self, zone, length, r, h, values):
+        zone[r, h, length[r, h]] = values
+        length[r, h] += 1
+
+    def remove_at(self, zone, length, r, h, positions):
+        """Removes a card from an ordered zone, shifting later cards down"""
+        cards = zone[r, h]
+        shifted = np.concatenate([cards[:, 1:], np.full((len(r), 1), NO_PLACE, dtype=cards.dtype)], 1)
+        slots = np.arange(cards.shape[1])
+        zone[r, h] = np.where(slots >= positions[:, None], shifted, cards)
+        length[r, h] -= 1
+
+    def take_every_other(self, zone, length, r, h):
+        """Removes the cards a live-list loop of Game removes (1st, 3rd, ...).
+
+        Returns the removed cards, in order, padded with NO_PLACE.
+        """
+        cards = zone[r, h]
+        size = length[r, h]
+        slots = np.arange(cards.shape[1])
+        taken = np.where((slots % 2 == 0) & (slots < size[:, None]), cards, NO_PLACE)[:, 0::2]
+        kept = np.where(slots[1::2] < size[:, None], cards[:, 1::2], NO_PLACE)
+        zone[r, h] = NO_PLACE
+        zone[r, h, :kept.shape[1]] = kept
+        length[r, h] = size // 2
+        return taken
+
+    def discard_from_hand(self, r, h):
+        """Discards a random place card from the hand (rows must have cards)"""
+        places = self.pick(self.hand[r, h], self.hand_size[r, h])
+        self.hand[r, h, places] -= 1
+        self.hand_size[r, h] -= 1
+        self.append(self.discard, self.discard_len, r, h, places)
+
+    def take_back(self, r, h):
+        """Takes back a random card from the discard pile, if there is one"""
+        r = r[self.discard_len[r, h] > 0]
+        positions = (self.rng.random(len(r)) * self.discard_len[r, h]).astype(np.int64)
+        places = self.discard[r, h, positions]
+        self.remove_at(self.discard, self.discard_len, r, h, positions)
+        self.to_hand(r, h, places)
+
+    def take_back_every_other(self, r, h):
+        for places in self.take_every_other(self.discard, self.discard_len, r, h).T:
+            valid = places != NO_PLACE
+            self.to_hand(r[valid], h, places[valid])
+
+    def play_card(self, r, h):
+        r = r[self.hand_size[r, h] > 0]
+        places = self.pick(self.hand[r, h], self.hand_size[r, h])
+        self.hand[r, h, places] -= 1
+        self.hand_size[r, h] -= 1
+        self.append(self.played, self.played_len, r, h, places)
+
+    def return_to_hand(self, r, h, place):
+        """Returns this place card, or else the Lair, from the played area"""
+        for card in (place, LAIR):
+            here = self.played[r, h] == card
+            found = here.any(1)
+            rows = r[found]
+            self.remove_at(self.played, self.played_len, rows, h, here[found].argmax(1))
+            self.to_hand(rows, h, card)
+            r = r[~found]
+
+    def active(self, r, card):
+        return (self.hunt_card_played[r] & (1 << card)) != 0
+
+    def check_game_over(self):
+        self.running &= (self.creature_spaces_to_win >= 1) & (self.hunted_spaces_to_win >= 1)
+
+    # game steps
+
+    def draw_hunt_cards(self, r, number):
+        for i in range(int(number.max(initial=0))):
+            rows = r[number > i]
+            # an empty hunt deck takes its discard pile back, as notalone.Deck does
+            empty = rows[~(self.hunt_cards[rows] == IN_DECK).any(1)]
+            cards = self.hunt_cards[empty]
+            cards[cards == IN_DISCARD] = IN_DECK
+            self.hunt_cards[empty] = cards
+            in_deck = self.hunt_cards[rows] == IN_DECK
+            has_card = in_deck.any(1)
+            self.errors += int((~has_card).sum())
+            rows = rows[has_card]
+            self.hunt_cards[rows, self.uniform(in_deck[has_card])] = IN_HAND
+
+    def choose_hunt_cards(self, r):
+        number = np.where(self.tracking_turn[r], 2, 1)
+        self.tracking_turn[r] = False
+        in_hand = self.hunt_cards[r] == IN_HAND
+        keys = np.where(in_hand, self.rng.random(in_hand.shape), -1.0)
+        order = np.argsort(-keys, 1)[:, :2]
+        enough = in_hand.sum(1) >= number
+        self.errors += int((~enough).sum())
+        self.to_play[r, 0] = np.where(enough, order[:, 0], -1)
+        self.to_play[r, 1] = np.where(enough & (number == 2), order[:, 1], -1)
+
+    def play_hunt_cards(self, phase):
+        for slot in range(2):
+            r = np.flatnonzero(self.running)
+            card = self.to_play[r, slot]
+            playing = card >= 0
+            playing[playing] = self.hunt_phases[card[playing]] == phase
+            r, card = r[playing], card[playing]
+            if not len(r):
+                continue
+            self.hunt_card_played[r] |= (1 << card.astype(np.int32))
+            self.hunt_cards[r, card] = IN_DISCARD
+            self.hunt_card_artemia[r[np.isin(card, (PHOBIA, MUTATION, VIRUS, DESPAIR))]] = True
+            self.hunt_card_target[r[np.isin(card, (SCREAM, TOXIN, CLONE))]] = True
+            self.tracking_turn[r[card == TRACKING]] = True
+            rows = r[card == FORBIDDEN_ZONE]
+            for h in range(self.hunted):
+                self.discard_from_hand(rows[self.hand_size[rows, h] > 0], h)
+            rows = r[card == ASCENDANCY]
+            if len(rows):
+                sizes = self.hand_size[rows]
+                target = self.uniform(np.where((sizes > 2).any(1)[:, None], sizes > 2, True))
+                for h in range(self.hunted):
+                    seat = rows[target == h]
+                    while True:
+                        seat = seat[self.hand_size[seat, h] > 2]
+                        if not len(seat):
+                            break
+                        self.discard_from_hand(seat, h)
+
+    def place_token(self, r):
+        """Returns a random place out of those in the Hunteds' hands+played"""
+        present = (self.hand[r] > 0).any(1)
+        played = self.played[r]
+        for place in range(10):
+            present[:, place] |= (played == place).any((1, 2))
+        return self.uniform(present)
+
+    def proc(self, r, h, places):
+        """Triggers the effect of the place cards with these place indices"""
+        self.counter[r, PROC + places] += 1
+        for place in range(10):
+            rows = r[places == place]
+            if not len(rows):
+                continue
+            if place == LAIR:
+                takeback = self.discard_len[rows, h] > 2
+                self.take_back_every_other(rows[takeback], h)
+                copy = rows[~takeback]
+                if len(copy):
+                    self.proc(copy, h, self.c_token[copy].astype(np.int64))
+            elif place == JUNGLE:
+                self.return_to_hand(rows, h, JUNGLE)
+                self.take_back(rows, h)
+            elif place == RIVER:
+                self.river_turn[rows, h] = True
+            elif place == BEACH:
+                rows = rows[~self.active(rows, INTERFERENCE) & ~self.beach_proced_in_turn[rows]]
+                self.beach_proced_in_turn[rows] = True
+                self.hunted_spaces_to_win[rows] -= self.beach_marker_on[rows]
+                self.beach_marker_on[rows] = ~self.beach_marker_on[rows]
+            elif place == ROVER:
+                owned = self.hand[rows, h] > 0
+                for zone in (self.played, self.discard):
+                    cards = zone[rows, h]
+                    for card in range(10):
+                        owned[:, card] |= (cards == card).any(1)
+                candidates = np.where(owned, 0, self.reserve[rows])
+                total = candidates.sum(1)
+                rows, candidates, total = rows[total > 0], candidates[total > 0], total[total > 0]
+                cards = self.pick(candidates, total)
+                self.reserve[rows, cards] -= 1
+                self.to_hand(rows, h, cards)
+            elif place == SWAMP:
+                self.return_to_hand(rows, h, SWAMP)
+                self.take_back(rows, h)
+                self.take_back(rows, h)
+            elif place == SHELTER:
+                # draws two, keeps one; a deck of fewer takes its discard pile back first
+                short = rows[self.survival_deck[rows] < 2]
+                self.survival_deck[short] += self.survival_discard[short]
+                self.survival_discard[short] = 0
+                enough = self.survival_deck[rows] >= 2
+                self.errors += int((~enough).sum())
+                # a last single card is still kept
+                self.survival_deck[rows[~enough]] = 0
+                rows = rows[enough]
+                self.survival_deck[rows] -= 2
+                self.survival_discard[rows] += 1
+            elif place == WRECK:
+                rows = rows[~self.active(rows, INTERFERENCE) & ~self.wreck_proced_in_turn[rows]]
+                self.wreck_proced_in_turn[rows] = True
+                self.hunted_spaces_to_win[rows] -= 1
+            elif place == SOURCE:
+                no_cards = (self.survival_deck[rows] == 0) & (self.survival_discard[rows] == 0)
+                gain_will = no_cards | (self.rng.random(len(rows)) < 0.5)
+                benefactors = self.rng.integers(0, self.hunted, int(gain_will.sum()))
+                self.will[rows[gain_will], benefactors] += 1
+                rows = rows[~gain_will]
+                empty = rows[self.survival_deck[rows] == 0]
+                self.survival_deck[empty] += self.survival_discard[empty]
+                self.survival_discard[empty] = 0
+                self.survival_deck[rows] -= self.survival_deck[rows] > 0
+            elif place == ARTEFACT:
+                self.artefact_turn[rows, h] = True
+
+    def resolve(self, r, h, cards):
+        """Resolves one played card of seat h against the tokens (phase 3)"""
+        caught = cards == self.c_token[r]
+        rows = r[caught]
+        self.counter[rows, CREATURE_CATCH] += 1
+        fierce = self.active(rows, FIERCENESS)
+        at_lair = cards[caught] == LAIR
+        self.counter[rows[at_lair], LAIR_CATCH] += 1
+        self.will[rows, h] -= np.where(at_lair, 2, 1) + fierce
+        first = rows[~self.caught[rows]]
+        self.caught[first] = True
+        self.counter[first, ADVANCES_FROM_CATCH] += 1
+        self.creature_spaces_to_win[first] -= 1
+
+        artemia = ~caught & (cards == self.a_token[r])
+        rows = r[artemia]
+        self.counter[rows, ARTEMIA_CATCH] += 1
+        self.discard_from_hand(rows[self.hand_size[rows, h] > 0], h)
+        self.will[rows[self.active(rows, MUTATION)], h] -= 1
+
+        target = ~caught & ~artemia & (cards == self.t_token[r])
+        scream = np.zeros_like(target)
+        scream[target] = self.active(r[target], SCREAM)
+        rows = r[scream]
+        # Game.play never manages to discard for Scream, so only will is lost
+        self.will[rows[self.hand_size[rows, h] <= 1], h] -= 1
+
+        proc = (~caught & ~artemia & ~target) | scream
+        self.proc(r[proc], h, cards[proc].astype(np.int64))
+
+    def play_turn(self):
+        r = np.flatnonzero(self.running)
+        self.counter[r, TURN] += 1
+        for flags in (self.beach_proced_in_turn, self.wreck_proced_in_turn,
+                      self.hunt_card_artemia, self.hunt_card_target, self.caught):
+            flags[r] = False
+        self.hunt_card_played[r] = 0
+        self.c_token[r] = self.a_token[r] = self.t_token[r] = NO_PLACE
+
+        # PHASE 1
+        self.choose_hunt_cards(r)
+        self.play_hunt_cards(1)
+        for h in range(self.hunted):
+            r = np.flatnonzero(self.running)
+            give_up = r[(self.will[r, h] == 1) & (self.hand_size[r, h] < 3)]
+            self.will[give_up, h] = 3
+            self.take_back_every_other(give_up, h)
+            self.creature_spaces_to_win[give_up] -= 1
+            size = self.hand_size[r, h]
+            resist = r[(size < 2) | ((self.river_turn[r, h] | self.artefact_turn[r, h]) & (size < 3))]
+            self.will[resist, h] -= 1
+            self.take_back(resist, h)
+            self.take_back(resist, h)
+            self.play_card(r, h)
+            self.check_game_over()
+            r = np.flatnonzero(self.running)
+            # as in Game.play, the Artefact flag is cleared before it is checked
+            self.artefact_turn[r, h] = False
+            self.play_card(r[self.river_turn[r, h]], h)
+
+        # PHASE 2
+        self.play_hunt_cards(2)
+        r = np.flatnonzero(self.running)
+        self.c_token[r] = self.place_token(r)
+        spaces = np.clip(self.hunted_spaces_to_win[r], 0, 31)
+        rows = r[self.artemia_spaces[self.artemia[r], spaces] | self.hunt_card_artemia[r]]
+        self.a_token[rows] = self.place_token(rows)
+        rows = r[self.hunt_card_target[r]]
+        self.t_token[rows] = self.place_token(rows)
+        for h in range(self.hunted):
+            rows = r[self.river_turn[r, h]]
+            self.river_turn[rows, h] = False
+            rows = rows[self.played_len[rows, h] == 2]
+            positions = self.rng.integers(0, 2, len(rows))
+            cards = self.played[rows, h, positions]
+            self.remove_at(self.played, self.played_len, rows, h, positions)
+            self.to_hand(rows, h, cards)
+            self.errors += int((self.played_len[r, h] > 2).sum())
+
+        # PHASE 3
+        self.play_hunt_cards(3)
+        for h in range(self.hunted):
+            # walks the live played area like Game's for loop, skipping shifted cards
+            for slot in range(PLAYED_SLOTS):
+                r = np.flatnonzero(self.running)
+                r = r[slot < self.played_len[r, h]]
+                if len(r):
+                    self.resolve(r, h, self.played[r, h, slot])
+                self.check_game_over()
+
+        # PHASE 4
+        self.play_hunt_cards(4)
+        r = np.flatnonzero(self.running)
+        self.hunted_spaces_to_win[r[~self.active(r, STASIS)]] -= 1
+        self.check_game_over()
+        r = np.flatnonzero(self.running)
+        for h in range(self.hunted):
+            # moving the live played area skips every other card, as in Game.play
+            for cards in self.take_every_other(self.played, self.played_len, r, h).T:
+                valid = cards != NO_PLACE
+                self.append(self.discard, self.discard_len, r[valid], h, cards[valid])
+        in_hand = (self.hunt_cards[r] == IN_HAND).sum(1)
+        self.draw_hunt_cards(r, 3 - in_hand)
+
+    def play(self):
+        """Plays every game to the end, returning their result columns"""
+        while self.running.any() and self.counter[self.running, TURN].max() < 20:
+            self.play_turn()
+        return self.results()
+
+    def results(self):
+        """Returns the games.csv columns of the games as arrays, without GAME"""
+        winner = np.where(self.creature_spaces_to_win < 1, 'Creature',
+                          np.where(self.hunted_spaces_to_win < 1, 'Hunted', ''))
+        columns = {'ARTEMIA_BOARD': np.array(['A', 'B'])[self.artemia],
+                   'PLAYERS': np.full(self.no_of_games, self.players),
+                   'WINNER': winner,
+                   'TURNS': self.counter[:, TURN],
+                   'HUNTED': self.hunted_spaces_to_win,
+                   'CREATURE': self.creature_spaces_to_win}
+        for place, column in enumerate(('LAIR', 'JUNGLE', 'RIVER', 'BEACH', 'ROVER', 'SWAMP',
+                                        'SHELTER', 'WRECK', 'SOURCE', 'ARTEFACT')):
+            columns[column] = self.counter[:, PROC + place]
+        columns['CREATURE_CATCH'] = self.counter[:, CREATURE_CATCH]
+        columns['ARTEMIA_CATCH'] = self.counter[:, ARTEMIA_CATCH]
+        columns['ADVANCES_FROM_CATCH'] = self.counter[:, ADVANCES_FROM_CATCH]
+        columns['LAIR_CATCH'] = self.counter[:, LAIR_CATCH]
+        columns['BETTER_HUNTED'] = np.zeros(self.no_of_games, dtype=np.int8)
+        columns['BETTER_CREATURE'] = np.zeros(self.no_of_games, dtype=np.int8)
+        return columns
+
+
+def result_rows(columns, first_game_number):
+    """Returns games.csv row dicts of result columns, numbered from first_game_number.
+
+    Lockstep games cannot be replayed one by one, so their SEED is left empty.
+    """
+    lists = {column: values.tolist() for column, values in columns.items()}
+    rows = []
+    for i in range(len(lists['WINNER'])):
+        row = {column: values[i] for column, values in lists.items()}
+        row['GAME'] = first_game_number + i
+        row['SEED'] = ''
+        rows.append(row)
+    return rows
+
+
+def win_rate_table(no_of_games, seed=None):
+    """Returns {(players, artemia side): (games, Creature win rate, mean turns)}"""
+    rng = np.random.default_rng(seed)
+    table = {}
+    for players in range(2, 8):
+        columns = LockstepGames(players, no_of_games, rng.integers(2 ** 63)).play()
+        for side in ('A', 'B'):
+            on_side = columns['ARTEMIA_BOARD'] == side
+            table[players, side] = (int(on_side.sum()),
+                                    float((columns['WINNER'][on_side] == 'Creature').mean()),
+                                    float(columns['TURNS'][on_side].mean()))
+    return table
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Simulate random-mind games of Not Alone in lockstep.')
+    parser.add_argument('--games', type=int, default=100000,
+                        help='games per player count')
+    parser.add_argument('--seed', type=int)
+    parser.add_argument('--output', help='also append the games to this results file')
+    args = parser.parse_args()
+
+    if args.output:
+        rng = np.random.default_rng(args.seed)
+        with notalone.ResultsWriter(args.output) as results:
+            for players in range(2, 8):
+                columns = LockstepGames(players, args.games, rng.integers(2 ** 63)).play()
+                first = notalone.GameNumberAllocator(args.output).allocate(args.games)
+                results.writerows(result_rows(columns, first))
+    else:
+        print('PLAYERS  BOARD  GAMES  CREATURE WIN RATE  MEAN TURNS')
+        for (players, side), (games, win_rate, turns) in win_rate_table(args.games, args.seed).items():
+            print('{:>7}  {:>5}  {:>5}  {:>17.3f}  {:>10.2f}'.format(players, side, games,
+                                                                   win_rate, turns))
@@ -16,11 +16,23 @@ and logs the game stats in a "games.csv" for analysis.
 Verbose game logs are saved in "games.log".
 """
 
+import argparse
+import atexit
+import contextlib
 import csv
 import collections
+import fcntl
+import itertools
 import logging
+import math
+import multiprocessing
+import os
 import random
-import subprocess
+import sys
+import time
+import types
+
+import eventtrace
 
 __author__ = "Siow Yi Sheng"
 __version__ = "0.1.1"
@@ -32,8 +44,8 @@ logger.setLevel(logging.INFO)
 
 formatter = logging.Formatter('%(levelname)s:%(message)s')
 
-# save the full info logs to the file
-file_handler = logging.FileHandler('games2.log')
+# save the full info logs to the file, which is only opened once something is logged
+file_handler = logging.FileHandler('games2.log', delay=True)
 file_handler.setLevel(logging.INFO)
 file_handler.setFormatter(formatter)
 logger.addHandler(file_handler)
@@ -45,12 +57,440 @@ stream_handler.setFormatter(formatter)
 logger.addHandler(stream_handler)
 
 
+# cards.csv and player_names.csv ship next to this module
+DATA_DIR = os.path.dirname(os.path.abspath(__file__))
+CARDS_PATH = os.path.join(DATA_DIR, 'cards.csv')
+PLAYER_NAMES_PATH = os.path.join(DATA_DIR, 'player_names.csv')
+
+# the card catalogue, loaded once on import by load_cards() and shared by every game:
+# read-only card definitions keyed by card name
+hunt_cards = types.MappingProxyType({})
+survival_cards = types.MappingProxyType({})
+place_cards = types.MappingProxyType({})
+# cards, card names, effects and hunt flags indexed by card id, with 0 meaning no card
+cards_by_id = (None,)
+card_names = (None,)
+card_effects = (None,)
+card_flags = (0,)
+# player names, loaded once on import by load_player_names()
+player_names = ()
+
+# places every Hunted starts with, and the places of the reserve, in dealing order
+STARTING_PLACES = ('The Lair', 'The Jungle', 'The River', 'The Beach', 'The Rover')
+RESERVE_PLACES = ('The Swamp', 'The Shelter', 'The Wreck', 'The Source', 'The Artefact')
+BOARD_PLACES = STARTING_PLACES + RESERVE_PLACES
+
+# budget of each decision of a SearchCreatureMind: rollouts to play, or as many
+# as fit in seconds if given, shared between worker processes
+SearchBudget = collections.namedtuple('SearchBudget', ('rollouts', 'seconds', 'processes'),
+                                      defaults=(200, None, 1))
+
+# columns of the games.csv results file
+FIELDNAMES = ['GAME',
+              'ARTEMIA_BOARD',
+              'PLAYERS',
+              'WINNER',
+              'TURNS',
+              'HUNTED',
+              'CREATURE',
+              'LAIR',
+              'JUNGLE',
+              'RIVER',
+              'BEACH',
+              'ROVER',
+              'SWAMP',
+              'SHELTER',
+              'WRECK',
+              'SOURCE',
+              'ARTEFACT',
+              'CREATURE_CATCH',
+              'ARTEMIA_CATCH',
+              'ADVANCES_FROM_CATCH',
+              'LAIR_CATCH',
+              'BETTER_HUNTED',
+              'BETTER_CREATURE',
+              'SEED'
+              ]
+
+
+def load_cards(path=CARDS_PATH):
+    """Instantiate hunt, survival and place cards from the csv file"""
+    global hunt_cards, survival_cards, place_cards, cards_by_id, card_names, card_effects, card_flags
+    hunt, survival, place = {}, {}, {}
+    catalogue = [None]
+    with open(path, 'r', encoding='utf-8-sig', newline='') as f:
+        reader = csv.DictReader(f)
+        for row in reader:
+            # card ids follow the order of cards.csv, for compact event traces
+            card_id = len(catalogue)
+            if row['TYPE'] == 'Hunt':
+                card = hunt[row['CARDNAME']] = HuntCard(card_id,
+                                                        row['CARDNAME'],
+                                                        row['TEXT'],
+                                                        row['PHASE'],
+                                                        row['ARTEMIA'])
+            elif row['TYPE'] == 'Survival':
+                card = survival[row['CARDNAME']] = SurvivalCard(card_id,
+                                                                row['CARDNAME'],
+                                                                row['TEXT'],
+                                                                row['PHASE'])
+            else:
+                card = place[row['CARDNAME']] = PlaceCard(card_id,
+                                                          row['CARDNAME'],
+                                                          row['TEXT'],
+                                                          row['NUMBER'],
+                                                          row['ADJACENT'])
+            catalogue.append(card)
+    hunt_cards = types.MappingProxyType(hunt)
+    survival_cards = types.MappingProxyType(survival)
+    place_cards = types.MappingProxyType(place)
+    cards_by_id = tuple(catalogue)
+    card_names = (None,) + tuple(card.name for card in catalogue[1:])
+    # compile card effects into tables keyed by card id for the game loop
+    effects = dict(PLACE_EFFECTS, **HUNT_EFFECTS)
+    card_effects = (None,) + tuple(effects.get(card.name) for card in catalogue[1:])
+    card_flags = (0,) + tuple(HUNT_FLAGS.get(card.name, 0) for card in catalogue[1:])
+
+
+def load_player_names(path=PLAYER_NAMES_PATH):
+    """Load the names players are randomly given from the csv file"""
+    global player_names
+    with open(path, 'r', newline='') as f:
+        player_names = tuple(row[0] for row in csv.reader(f))
+
+
+def card_by_id(card_id):
+    """Returns the catalogue card with this id"""
+    return cards_by_id[card_id]
+
+
+def last_game_number(path='games.csv'):
+    """Returns the game number on the last row of a results file, or 0"""
+    # only the end of the file is read, however many games it holds
+    try:
+        with open(path, 'rb') as f:
+            f.seek(0, os.SEEK_END)
+            f.seek(max(0, f.tell() - 4096))
+            lines = f.read().splitlines()
+    except FileNotFoundError:
+        return 0
+    for line in reversed(lines):
+        if line.strip():
+            try:
+                return int(line.split(b',')[0])
+            except ValueError:
+                return 0
+    return 0
+
+
+class GameNumberAllocator:
+    """Hands out ranges of unused game numbers for a results file.
+
+    The next free number is kept in a sidecar index file that is locked while
+    it is read and bumped, so batch runs appending to the same results file
+    at the same time never get the same game numbers.
+    """
+
+    def __init__(self, path='games.csv'):
+        self.path = path
+        self.index_path = path + '.next'
+
+    def last_game_number(self):
+        return last_game_number(self.path)
+
+    def allocate(self, count=1):
+        """Reserves count consecutive game numbers and returns the first"""
+        with open(self.index_path, 'a+') as index:
+            fcntl.flock(index, fcntl.LOCK_EX)
+            index.seek(0)
+            try:
+                first = int(index.read())
+            except ValueError:
+                first = 1
+            # rows may have been saved without the index, so never go below them
+            first = max(first, self.last_game_number() + 1)
+            index.truncate(0)
+            index.write(str(first + count))
+        return first
+
+
+class ResultsWriter:
+    """Appends games.csv rows through one open file, writing them in bulk.
+
+    Rows are buffered and written every flush_every games or flush_seconds
+    seconds, whichever comes first. Use it as a context manager so the
+    buffered rows are still written if the run is interrupted.
+    on_flush, if given, is called with the rows after every write, e.g. to
+    update aggregates of the rows on disk and save a checkpoint.
+    Other results backends subclass it and override the *_output methods
+    and rows_after().
+    """
+
+    def __init__(self, path='games.csv', flush_every=1000, flush_seconds=5.0,
+                 on_flush=None):
+        self.path = path
+        self.flush_every = flush_every
+        self.flush_seconds = flush_seconds
+        self.on_flush = on_flush
+        self.rows = []
+        self.last_flush = time.monotonic()
+        self.closed = False
+        self.open_output()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    @contextlib.contextmanager
+    def lock(self):
+        """Holds the exclusive lock of the results, the one GameNumberAllocator takes.
+
+        Runs appending to the same results at the same time write one flush
+        at a time, so no run sees another's rows half-written.
+        """
+        with open(self.path + '.next', 'a+') as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            yield
+
+    def open_output(self):
+        self.file = open(self.path, 'a', newline='')
+        self.writer = csv.DictWriter(self.file, fieldnames=FIELDNAMES)
+        # drop a row left half-written by a run that was killed mid-write; the
+        # rows of other runs writing to the file are whole while the lock is held
+        with self.lock():
+            size = os.fstat(self.file.fileno()).st_size
+            if size:
+                with open(self.path, 'rb') as f:
+                    f.seek(max(0, size - 4096))
+                    tail = f.read()
+                if not tail.endswith(b'\n'):
+                    size -= len(tail) - tail.rfind(b'\n') - 1
+                    self.file.truncate(size)
+            if not size:
+                # a new file gets a header, so csv.DictReader and replay_game() can read it
+                self.writer.writeheader()
+                self.file.flush()
+
+    def write_output(self, rows):
+        self.writer.writerows(rows)
+        self.file.flush()
+
+    def close_output(self):
+        self.file.close()
+
+    def sync_output(self):
+        os.fsync(self.file.fileno())
+
+    def position(self):
+        """Returns how far the results are written, for rows_after()"""
+        return os.fstat(self.file.fileno()).st_size
+
+    @staticmethod
+    def rows_after(path, position):
+        """Returns the row dicts written after a position() of the results"""
+        with open(path, 'r', newline='') as f:
+            f.seek(position)
+            return [row for row in csv.DictReader(f, fieldnames=FIELDNAMES)
+                    if row['SEED'] is not None and row['GAME'] != 'GAME']
+
+    def write(self, row):
+        """Buffers a games.csv row dict, flushing if the buffer is due"""
+        self.rows.append(row)
+        self.flush_if_due()
+
+    def writerows(self, rows):
+        """Buffers several games.csv row dicts, flushing if the buffer is due"""
+        self.rows.extend(rows)
+        self.flush_if_due()
+
+    def flush_if_due(self):
+        if (len(self.rows) >= self.flush_every
+                or time.monotonic() - self.last_flush >= self.flush_seconds):
+            self.flush()
+
+    def flush(self):
+        """Writes all buffered rows to the results"""
+        if self.rows:
+            # a write cut short is not repeated on close, as rows may be on disk already
+            rows, self.rows = self.rows, []
+            with self.lock():
+                self.write_output(rows)
+            if self.on_flush is not None:
+                self.on_flush(rows)
+        self.last_flush = time.monotonic()
+
+    def close(self):
+        """Flushes the remaining rows and closes the results"""
+        if not self.closed:
+            self.flush()
+            self.close_output()
+            self.closed = True
+
+
+def format_duration(seconds):
+    """Returns seconds as h:mm:ss"""
+    minutes, seconds = divmod(int(seconds), 60)
+    hours, minutes = divmod(minutes, 60)
+    return '{}:{:02d}:{:02d}'.format(hours, minutes, seconds)
+
+
+class ProgressLine:
+    """A status line of a long run: games done, games/sec, ETA and the Creature win rate.
+
+    On a terminal the line is redrawn in place at most every interval
+    seconds; otherwise, e.g. in the log of a scheduled job, a new line is
+    printed every log_interval seconds. Only counts are kept, so it costs
+    the same however many games are played.
+    """
+
+    def __init__(self, total, stream=None, interval=0.5, log_interval=60.0):
+        self.total = total
+        self.stream = stream if stream is not None else sys.stderr
+        self.live = self.stream.isatty()
+        self.interval = interval if self.live else log_interval
+        self.done = 0
+        self.skipped = 0
+        self.creature_wins = 0
+        self.start = self.last_shown = time.monotonic()
+
+    def resume(self, done):
+        """Counts games played before the run was resumed, leaving them out of the rates"""
+        self.done += done
+        self.skipped += done
+
+    def add(self, rows):
+        """Counts games.csv row dicts played, redrawing the line if it is due"""
+        self.done += len(rows)
+        self.creature_wins += sum(row['WINNER'] == 'Creature' for row in rows)
+        now = time.monotonic()
+        if now - self.last_shown >= self.interval:
+            self.show(now)
+
+    def line(self, now):
+        played = self.done - self.skipped
+        elapsed = now - self.start
+        rate = played / elapsed if elapsed > 0 else 0.0
+        eta = format_duration(max(self.total - self.done, 0) / rate) if rate else '?'
+        return '{}/{} games  {:.1f} games/s  elapsed {}  ETA {}  Creature win rate {:.4f}'.format(
+            self.done, self.total, rate, format_duration(elapsed), eta,
+            self.creature_wins / played if played else 0.0)
+
+    def show(self, now=None):
+        now = time.monotonic() if now is None else now
+        if self.live:
+            self.stream.write('\r' + self.line(now) + '\x1b[K')
+        else:
+            self.stream.write(self.line(now) + '\n')
+        self.stream.flush()
+        self.last_shown = now
+
+    def close(self):
+        """Shows the final counts"""
+        self.show()
+        if self.live:
+            self.stream.write('\n')
+            self.stream.flush()
+
+
+def replay_game(game_number, path='games.csv', search_budget=None):
+    """Re-runs a saved game from its recorded seed with verbose logs.
+
+    The replay is not saved again; its games.csv row dict is returned.
+    The row does not record the SearchBudget of a searching Creature, so a
+    better_creature 2 game is only replayed with the budget it was played
+    with given as search_budget.
+    """
+    with open(path, 'r', newline='') as f:
+        for row in csv.DictReader(f):
+            if int(row['GAME']) == game_number:
+                break
+        else:
+            raise ValueError('Game {} is not in {}'.format(game_number, path))
+    if not row.get('SEED'):
+        # lockstep.py leaves SEED empty too, as its games are not played one by one
+        raise ValueError('Game {} has no recorded seed: it was played before seeds were '
+                         'recorded, or by the lockstep engine, whose games cannot be replayed'
+                         .format(game_number))
+    if int(row['BETTER_CREATURE']) == 2:
+        if search_budget is None:
+            raise ValueError('Game {} was played by a searching Creature, give the search '
+                             'budget it was played with to replay it'.format(game_number))
+        if search_budget.seconds is not None:
+            raise ValueError('Searches bound by time cannot be replayed')
+    game = Game(int(row['PLAYERS']), int(row['BETTER_HUNTED']),
+                int(row['BETTER_CREATURE']), game_number=game_number,
+                seed=int(row['SEED']), artemia=row['ARTEMIA_BOARD'],
+                search_budget=search_budget)
+    return game.play(verbose=True)
+
+
 def move(item, origin, dest):
     """Use for moving games items between zones"""
     origin.remove(item)
     dest.append(item)
 
 
+class Deck:
+    """A pile of cards to draw from and its discard pile.
+
+    The pile is shuffled once and drawn from its end, so a draw is O(1);
+    when it runs out, the discard pile is shuffled back into it.
+    """
+
+    def __init__(self, cards, rng):
+        self.cards = list(cards)
+        self.discards = []
+        self.rng = rng
+        rng.shuffle(self.cards)
+
+    def reset(self, cards):
+        """Refills the pile with cards and shuffles it, emptying the discard pile, in place"""
+        self.cards[:] = cards
+        self.discards.clear()
+        self.rng.shuffle(self.cards)
+
+    def __len__(self):
+        return len(self.cards)
+
+    def __iter__(self):
+        return iter(self.cards)
+
+    def copy(self, rng):
+        """Returns a copy of the piles that shuffles with rng, for Game.copy_zones()"""
+        deck = Deck.__new__(Deck)
+        deck.cards = self.cards[:]
+        deck.discards = self.discards[:]
+        deck.rng = rng
+        return deck
+
+    def empty(self):
+        """Returns True if there is nothing to draw, even after a reshuffle"""
+        return not self.cards and not self.discards
+
+    def draw(self):
+        """Returns the top card, or None if the deck and its discard pile are empty"""
+        if not self.cards:
+            self.reshuffle()
+            if not self.cards:
+                return None
+        return self.cards.pop()
+
+    def discard(self, card):
+        self.discards.append(card)
+
+    def take(self, card):
+        """Takes a chosen card out of the pile, e.g. a place from the reserve"""
+        self.cards.remove(card)
+
+    def reshuffle(self):
+        """Shuffles the discard pile back into the deck"""
+        self.cards.extend(self.discards)
+        self.discards.clear()
+        self.rng.shuffle(self.cards)
+
+
 class Game:
     """A session of Not Alone."""
 
@@ -80,71 +520,103 @@ class Game:
         6: 3
     }
 
-    def __init__(self, players, better_hunted, better_creature, verbose=False):
-        # check last row of the games.csv to find last game number
-        last_row = str(subprocess.check_output(["tail", "-1", "games.csv"]))
-        try:
-            last_game_number = int(last_row.split(',')[0].replace('b\'', ''))
-            self.game_number = last_game_number + 1
-        except ValueError:
-            self.game_number = 1
+    def __init__(self, players, better_hunted, better_creature, verbose=False,
+                 game_number=0, seed=None, trace=False, profiler=None,
+                 artemia=None, search_budget=None):
+        # every random decision in the game is drawn from this RNG,
+        # so a game can be replayed from its recorded seed; reset() seeds it
+        self.rng = random.Random()
+
+        # the players, decks, tokens and lists of a game, which reset() deals
+        # the game out on, so a batch can play game after game on one Game
+        self.player_names = []
+        self.creature = None
+        self.hunted = []
+        self.trace = None
+        self.reserve = Deck((), self.rng)
+        self.reserve_counts = collections.Counter()
+        self.survival_deck = Deck((), self.rng)
+        self.hunt_deck = Deck((), self.rng)
+        self.counter = collections.Counter()
+
+        # create the board
+        self.board = [place_cards[name] for name in BOARD_PLACES]
 
-        # add possible player names from external file
-        with open('player_names.csv', 'r', newline='') as f:
-            reader = csv.reader(f)
-            self.player_names = [row[0] for row in reader]
+        # create the tokens
+        self.c_token = Token('Creature')
+        self.a_token = Token('Artemia')
+        self.t_token = Token('Target')
+        self.t_token2 = Token('Target2')
+
+        self.reset(players, better_hunted, better_creature, game_number, seed,
+                   trace, profiler, artemia, search_budget)
+
+    def reset(self, players, better_hunted, better_creature, game_number=0,
+              seed=None, trace=False, profiler=None, artemia=None, search_budget=None):
+        """Sets up a new game on this one, as Game() would with the same arguments.
+
+        The players, minds, decks, tokens, counters and lists of the last
+        game are cleared and dealt out again in place, rather than made
+        anew; players are only made for seats the last game did not have
+        or whose mind changed. The setup draws the same random numbers in
+        the same order as a new Game, so a reset game plays out the same.
+        """
+        # runners that save games reserve their numbers up front, see GameNumberAllocator;
+        # a game played on its own is game 0, so making one never touches the filesystem
+        self.game_number = game_number
+
+        if seed is None:
+            seed = random.getrandbits(64)
+        self.seed = seed
+        # the same Random, so the minds' references to it stay valid
+        self.rng.seed(seed)
+
+        # players get names from the preloaded list
+        self.player_names[:] = player_names
 
         # create a creature with a random player name
-        chosen_name = random.choice(self.player_names)
-        if better_creature:
-            self.creature = Creature(chosen_name, self, mind=1)
+        chosen_name = self.rng.choice(self.player_names)
+        if better_creature == 2:
+            mind = 2
+        elif better_creature:
+            mind = 1
+        else:
+            mind = 0
+        if self.creature is None:
+            self.creature = Creature(chosen_name, self, mind)
         else:
-            self.creature = Creature(chosen_name, self, mind=0)
+            self.creature.reset(chosen_name, mind)
         self.player_names.remove(chosen_name)
 
         # create each hunted player, to separate setup from init
-        self.hunted = []
+        del self.hunted[int(players) - 1:]
         for i in range(int(players) - 1):
-            chosen_name = random.choice(self.player_names)
-            if better_hunted:
-                self.hunted.append(Hunted(chosen_name, self, mind=1))
+            chosen_name = self.rng.choice(self.player_names)
+            mind = 1 if better_hunted else 0
+            if i < len(self.hunted):
+                self.hunted[i].reset(chosen_name, mind)
             else:
-                self.hunted.append(Hunted(chosen_name, self, mind=0))
-            self.hunted[i].phand.append(place_cards['The Lair'])
-            self.hunted[i].phand.append(place_cards['The Jungle'])
-            self.hunted[i].phand.append(place_cards['The River'])
-            self.hunted[i].phand.append(place_cards['The Beach'])
-            self.hunted[i].phand.append(place_cards['The Rover'])
+                self.hunted.append(Hunted(chosen_name, self, mind))
             self.player_names.remove(chosen_name)
 
         # create reserve deck of place cards based on number of hunted
-        self.reserve = []
-        for i in range(Game.PLACE_CARD_COPIES[len(self.hunted)]):
-            self.reserve.append(place_cards['The Swamp'])
-            self.reserve.append(place_cards['The Shelter'])
-            self.reserve.append(place_cards['The Wreck'])
-            self.reserve.append(place_cards['The Source'])
-            self.reserve.append(place_cards['The Artefact'])
+        self.reserve.reset(place_cards[name] for name in
+                           RESERVE_PLACES * Game.PLACE_CARD_COPIES[len(self.hunted)])
+        # copies of each place left in the reserve, for the Hunted minds
+        self.reserve_counts.clear()
+        self.reserve_counts.update(card.name for card in self.reserve)
 
-        # create the board
-        self.board = []
-        self.board.append(place_cards['The Lair'])
-        self.board.append(place_cards['The Jungle'])
-        self.board.append(place_cards['The River'])
-        self.board.append(place_cards['The Beach'])
-        self.board.append(place_cards['The Rover'])
-        self.board.append(place_cards['The Swamp'])
-        self.board.append(place_cards['The Shelter'])
-        self.board.append(place_cards['The Wreck'])
-        self.board.append(place_cards['The Source'])
-        self.board.append(place_cards['The Artefact'])
-
-        # randomize board for side A/B artemia icons
-        self.artemia = random.choice(['A', 'B'])
-
-        self.survival_deck = [survival_cards[key] for key in survival_cards]
-        self.survival_discard = []
-        self.hunt_deck = [hunt_cards[key] for key in hunt_cards]
+        # randomize board for side A/B artemia icons, unless a side is asked for;
+        # the draw is made either way so the rest of the game's random stream is the same
+        self.artemia = self.rng.choice(['A', 'B'])
+        if artemia is not None:
+            self.artemia = artemia
+
+        self.survival_deck.reset(survival_cards.values())
+        self.hunt_deck.reset(hunt_cards.values())
+
+        # chances of the Hunted having played each place, see place_probabilities()
+        self.place_table = None
 
         # beach and wreck variables
         self.beach_marker_on = False
@@ -155,26 +627,44 @@ class Game:
         self.hunt_card_artemia = False
         self.hunt_card_target = False
         self.hunt_card_target2 = False
-        self.hunt_card_played = []
+        self.hunt_flags = 0  # bits of the modifiers of hunt cards played this turn
         self.anticipation_target = None
 
         self.creature.draw_hunt_card(3)
 
-        # create the tokens
-        self.c_token = Token('Creature')
-        self.a_token = Token('Artemia')
-        self.t_token = Token('Target')
-        self.t_token2 = Token('Target2')
+        # the tokens start off the board
+        self.c_token.place = None
+        self.a_token.place = None
+        self.t_token.place = None
+        self.t_token2.place = None
 
         self.creature_spaces_to_win = Game.GOAL_CREATURE_HUNTED[int(players)][0]
         self.hunted_spaces_to_win = Game.GOAL_CREATURE_HUNTED[int(players)][1]
 
         # metrics for saving
-        self.counter = collections.Counter()
+        self.counter.clear()
         self.counter['turn'] = 0
         self.better_hunted = better_hunted
         self.better_creature = better_creature
 
+        # binary event trace, only saved if the game turns out to be anomalous
+        if not trace:
+            self.trace = None
+        elif self.trace is None:
+            self.trace = eventtrace.EventTrace()
+        else:
+            self.trace.count = 0  # the last game's buffer is written over
+        self.anomaly = 0
+
+        # opt-in timings of the game's phases and card effects, see profiling.Profiler
+        self.profiler = profiler
+
+        # how long a searching Creature (better_creature 2) thinks, see SearchBudget
+        self.search_budget = search_budget or SearchBudget()
+
+        # index of the next step of the turn in TURN_STEPS
+        self.step = 0
+
     def game_over(self):
         """Returns True if game is over"""
         if (self.creature_spaces_to_win < 1) or (self.hunted_spaces_to_win < 1):
@@ -182,287 +672,451 @@ class Game:
         else:
             return False
 
+    def clone(self):
+        """Returns a copy of the game to play on, e.g. to look ahead.
+
+        Only the mutable state is copied: hands, discards, reserve, decks,
+        will, counters, token places and turn flags. Cards and the board are
+        shared. The copy has its own RNG in the same state as the game's,
+        and no trace or profiler.
+        """
+        game = Game.__new__(Game)
+        game.__dict__.update(self.__dict__)
+        game.rng = random.Random()
+        game.rng.setstate(self.rng.getstate())
+        game.trace = None
+        game.profiler = None
+        game.creature = self.creature.clone(game)
+        game.hunted = [hunted.clone(game) for hunted in self.hunted]
+        game.c_token = Token('Creature')
+        game.a_token = Token('Artemia')
+        game.t_token = Token('Target')
+        game.t_token2 = Token('Target2')
+        game.copy_zones(self)
+        return game
+
+    def snapshot(self):
+        """Returns the state of the game, to restore() it later"""
+        return self.clone()
+
+    def restore(self, snapshot):
+        """Puts the game back in the state of a snapshot() of it, in place.
+
+        The game keeps its players, minds, tokens, RNG, trace and profiler
+        objects, so references to them stay valid, and the snapshot can be
+        restored again.
+        """
+        keep = {name: getattr(self, name) for name in
+                ('rng', 'trace', 'profiler', 'creature', 'hunted',
+                 'c_token', 'a_token', 't_token', 't_token2')}
+        self.__dict__.update(snapshot.__dict__)
+        self.__dict__.update(keep)
+        self.rng.setstate(snapshot.rng.getstate())
+        self.creature.restore(snapshot.creature)
+        for hunted, saved in zip(self.hunted, snapshot.hunted):
+            hunted.restore(saved)
+        self.copy_zones(snapshot)
+
+    def copy_zones(self, other):
+        """Copies the game zones, token places and anticipation target of another copy of the game"""
+        self.place_table = None
+        self.reserve = other.reserve.copy(self.rng)
+        self.reserve_counts = other.reserve_counts.copy()
+        self.survival_deck = other.survival_deck.copy(self.rng)
+        self.hunt_deck = other.hunt_deck.copy(self.rng)
+        self.counter = other.counter.copy()
+        for token, other_token in ((self.c_token, other.c_token), (self.a_token, other.a_token),
+                                   (self.t_token, other.t_token), (self.t_token2, other.t_token2)):
+            # tokens off the board wait on the Creature
+            token.place = self.creature if other_token.place is other.creature else other_token.place
+        if other.anticipation_target is not None:
+            self.anticipation_target = self.hunted[other.anticipation_target.seat - 1]
+
+    def place_probabilities(self):
+        """Returns {place name: chances a Hunted played it this turn}, from public info.
+
+        Every Hunted shares one chance out over the place cards in their
+        hand and played area, see Hunted.held. The table is rebuilt only
+        after cards came in or out of them.
+        """
+        table = self.place_table
+        if table is None:
+            table = self.place_table = collections.Counter()
+            for hunted in self.hunted:
+                size = len(hunted.phand) + len(hunted.played)
+                for name, count in hunted.held.items():
+                    table[name] += count / size
+        return table
+
     def play(self, verbose=False):
-        """Plays a game, logging errors to screen and saving stats to games.csv.
+        """Plays a game, logging errors to screen, and returns its games.csv row dict.
 
-        If verbose, saves full logs to games.log, for debugging or otherwise
+        If verbose, saves full logs to games.log, for debugging or otherwise.
+        Rows are saved by the caller, through a ResultsWriter.
         """
+        profiler = self.profiler
         if verbose:
             logger.info('GAME {} START'.format(self.game_number))
             logger.info('The game is being played on Artemia Board {}'
                         .format(self.artemia))
 
-        while self.counter['turn'] < 20:  # temporary failsafe to prevent infinite loops, an ordinary game has theoretical a maximum of 20 turns in normal cases
-            # start of turn clean-up steps
-            self.counter['turn'] += 1
-            self.beach_proced_in_turn = False
-            self.wreck_proced_in_turn = False
-            self.hunt_card_artemia = False
-            self.hunt_card_target = False
-            self.hunt_card_target2 = False
-            self.hunt_card_played = []
-            self.creature.hunt_cards_to_play = []
-            self.anticipation_target = None
-            self.c_token.place = self.creature
-            self.a_token.place = self.creature
-            self.t_token.place = self.creature
-
-            # PHASE 1
-            if verbose:
-                logger.info('\nTurn {}'.format(self.counter['turn']))
-                logger.info('The Creature is {} space{} from winning. '
-                            'The Hunted are {} space{} from winning.'
-                            .format(self.creature_spaces_to_win,
-                                    's' if self.creature_spaces_to_win != 1 else '',
-                                    self.hunted_spaces_to_win,
-                                    's' if self.hunted_spaces_to_win != 1 else ''))
-                logger.info('Phase 1')
-
-            # creature decides what hunt card to play this round.
-            # creature can normally only play 1 hunt card, unless tracking was played
-            if self.creature.tracking_turn:
-                self.creature.mind.choose_cards_to_play_this_turn(2)
-                self.creature.tracking_turn = False
-            else:
-                self.creature.mind.choose_cards_to_play_this_turn()
-
-            # check for any phase 1 creature hunt card to be played
-            for hunt_card in self.creature.hunt_cards_to_play:
-                if int(hunt_card.phase) == 1:
-                    self.creature.play_hunt_card(hunt_card, verbose=verbose)
-
-            # hunted decide if they give up, then resist, then they play a card
-            for hunted in self.hunted:
-                if hunted.mind.decide_if_give_up():
-                    hunted.give_up(verbose=verbose)
-                if hunted.mind.decide_if_resist():
-                    hunted.resist(hunted.mind.decide_if_resist(), verbose=True)
-                hunted.play_card(verbose=verbose)
-                if self.game_over():
-                    break
-
-                # hunted play an extra card if they played river or artefact in the previous turn
-                hunted.artefact_turn = False
-                if hunted.river_turn:
-                    hunted.play_card(verbose=verbose)
-                    if verbose:
-                        logger.info('{} played two cards because of The River.'
-                                    .format(hunted.name))
-                elif hunted.artefact_turn:
-                    hunted.play_card(verbose=verbose)
-                    if verbose:
-                        logger.info('{} played two cards because of The Artefact.'.format(hunted.name))
-
-            if self.game_over():
+        # a game copied mid-turn, see clone(), first plays the rest of that turn
+        while self.step or self.counter['turn'] < 20:  # temporary failsafe to prevent infinite loops, an ordinary game has theoretical a maximum of 20 turns in normal cases
+            if self.play_turn(verbose):
                 break
 
-            # PHASE 2
+        # game end subroutine
+        if profiler is not None:
+            profiler.phase('end')
+        if verbose:
+            logger.info('The game is over')
+        if self.creature_spaces_to_win < 1 and self.hunted_spaces_to_win < 1:
+            self.anomaly = eventtrace.BOTH_WON
+            logger.warning('Game {}: Somehow, both teams won at the same time'.format(self.game_number))
+
+        winner = ''
+        if self.creature_spaces_to_win < 1:
+            winner = 'Creature'
+            if verbose:
+                logger.info('The Creature won')
+        elif self.hunted_spaces_to_win < 1:
+            winner = 'Hunted'
             if verbose:
-                logger.info('Phase 2')
+                logger.info('The Hunted won')
+        else:
+            self.anomaly = eventtrace.FAILSAFE
+            logger.warning('Game {}: stopped by the failsafe after {} turns with no winner'
+                           .format(self.game_number, self.counter['turn']))
 
-            # check for any phase 2 creature hunt card to be played
-            for hunt_card in self.creature.hunt_cards_to_play:
-                if int(hunt_card.phase) == 2:
-                    self.creature.play_hunt_card(hunt_card, verbose=verbose)
+        if self.trace is not None:
+            self.trace.emit(self.counter['turn'], 4, eventtrace.CREATURE, eventtrace.GAME_END)
+            if self.anomaly:
+                self.trace.save(self, self.anomaly)
 
-            self.creature.place_token(self.c_token, verbose=verbose)
+        self.winner = winner
+        row = self.result_row()
+        if profiler is not None:
+            profiler.phase(None)
+        return row
 
-            # Creature places the artemia token if the Hunted are a certain number of spaces from victory, or if the Creature played a Hunt card with an artemia icon
-            if (self.hunted_spaces_to_win in Game.ARTEMIA_SPACES[self.artemia]) or self.hunt_card_artemia:
-                self.creature.place_token(self.a_token, verbose=verbose)
+    def play_turn(self, verbose=False):
+        """Plays the rest of the turn from its step, see TURN_STEPS.
 
-            # Creature places the target token if they played a Hunt card with an target icon
-            if self.hunt_card_target:
-                self.creature.place_token(self.t_token, verbose=verbose)
+        Returns True if the game is over.
+        """
+        steps = Game.TURN_STEPS
+        while self.step < len(steps):
+            step = steps[self.step]
+            self.step += 1
+            if step(self, verbose):
+                self.step = 0
+                return True
+        self.step = 0
+        return False
+
+    def start_turn(self, verbose=False):
+        """Starts a turn: clears the turn flags and takes the tokens off the board"""
+        profiler = self.profiler
+        trace = self.trace
+        # start of turn clean-up steps
+        if profiler is not None:
+            profiler.phase('1')
+        self.counter['turn'] += 1
+        self.beach_proced_in_turn = False
+        self.wreck_proced_in_turn = False
+        self.hunt_card_artemia = False
+        self.hunt_card_target = False
+        self.hunt_card_target2 = False
+        self.hunt_flags = 0
+        self.creature.hunt_cards_to_play = []
+        self.anticipation_target = None
+        self.c_token.place = self.creature
+        self.a_token.place = self.creature
+        self.t_token.place = self.creature
+        if trace is not None:
+            trace.emit(self.counter['turn'], 1, eventtrace.CREATURE, eventtrace.TURN_START)
 
-            for hunted in self.hunted:
-                if hunted.river_turn:
-                    hunted.river_turn = False
-                    if len(hunted.played) == 2:
-                        hunted.return_card_to_hand(hunted.mind.choose_card_to_return(), verbose=verbose)
-                        # TO DO: mind should return a card if it has a creature, artemia or target token on it and the other card does not
-                if len(hunted.played) > 2:
-                    logger.error('Game {}: {} somehow has {} cards in the played area'.format(self.game_number, hunted.name, len(hunted.played)))
+        # PHASE 1
+        if verbose:
+            logger.info('\nTurn {}'.format(self.counter['turn']))
+            logger.info('The Creature is {} space{} from winning. '
+                        'The Hunted are {} space{} from winning.'
+                        .format(self.creature_spaces_to_win,
+                                's' if self.creature_spaces_to_win != 1 else '',
+                                self.hunted_spaces_to_win,
+                                's' if self.hunted_spaces_to_win != 1 else ''))
+            logger.info('Phase 1')
+
+    def choose_hunt_cards(self, verbose=False):
+        """The Creature chooses the hunt cards of the turn"""
+        # creature decides what hunt card to play this round.
+        # creature can normally only play 1 hunt card, unless tracking was played
+        if self.creature.tracking_turn:
+            self.creature.mind.choose_cards_to_play_this_turn(2)
+            self.creature.tracking_turn = False
+        else:
+            self.creature.mind.choose_cards_to_play_this_turn()
+
+    def phase_1(self, verbose=False):
+        """Phase 1: the Hunted give up, resist and play place cards"""
+        trace = self.trace
+        # check for any phase 1 creature hunt card to be played
+        for hunt_card in self.creature.hunt_cards_to_play:
+            if int(hunt_card.phase) == 1:
+                self.creature.play_hunt_card(hunt_card, verbose=verbose)
+
+        # hunted decide if they give up, then resist, then they play a card
+        for hunted in self.hunted:
+            if hunted.mind.decide_if_give_up():
+                hunted.give_up(verbose=verbose)
+                if trace is not None:
+                    trace.emit(self.counter['turn'], 1, hunted.seat, eventtrace.GIVE_UP)
+            if hunted.mind.decide_if_resist():
+                hunted.resist(hunted.mind.decide_if_resist(), verbose=verbose)
+                if trace is not None:
+                    trace.emit(self.counter['turn'], 1, hunted.seat, eventtrace.RESIST)
+            hunted.play_card(verbose=verbose)
+            if trace is not None and hunted.played:
+                trace.emit(self.counter['turn'], 1, hunted.seat,
+                           eventtrace.PLAY_PLACE, hunted.played[-1].id)
+            if self.game_over():
+                break
 
-            # PHASE 3
-            caught_at_least_one = False
+            # hunted play an extra card if they played river or artefact in the previous turn
+            hunted.artefact_turn = False
+            if hunted.river_turn:
+                hunted.play_card(verbose=verbose)
+                if trace is not None and hunted.played:
+                    trace.emit(self.counter['turn'], 1, hunted.seat,
+                               eventtrace.PLAY_PLACE, hunted.played[-1].id)
+                if verbose:
+                    logger.info('{} played two cards because of The River.'
+                                .format(hunted.name))
+            elif hunted.artefact_turn:
+                hunted.play_card(verbose=verbose)
+                if verbose:
+                    logger.info('{} played two cards because of The Artefact.'.format(hunted.name))
 
-            if verbose:
-                logger.info('Phase 3')
+        return self.game_over()
 
-            # check for any phase 3 creature hunt card to be played
-            for hunt_card in self.creature.hunt_cards_to_play:
-                if int(hunt_card.phase) == 3:
-                    self.creature.play_hunt_card(hunt_card, verbose=verbose)
+    def phase_2_hunt_cards(self, verbose=False):
+        """Phase 2: the Creature plays its phase 2 hunt cards"""
+        profiler = self.profiler
+        if profiler is not None:
+            profiler.phase('2')
+        if verbose:
+            logger.info('Phase 2')
+
+        # check for any phase 2 creature hunt card to be played
+        for hunt_card in self.creature.hunt_cards_to_play:
+            if int(hunt_card.phase) == 2:
+                self.creature.play_hunt_card(hunt_card, verbose=verbose)
+
+    def place_creature_token(self, verbose=False):
+        """The Creature places the Creature token"""
+        trace = self.trace
+        self.creature.place_token(self.c_token, verbose=verbose)
+        if trace is not None:
+            trace.emit(self.counter['turn'], 2, eventtrace.CREATURE,
+                       eventtrace.PLACE_CREATURE_TOKEN, getattr(self.c_token.place, 'id', 0))
+
+    def place_artemia_token(self, verbose=False):
+        """The Creature places the Artemia token if it is due"""
+        trace = self.trace
+        # Creature places the artemia token if the Hunted are a certain number of spaces from victory, or if the Creature played a Hunt card with an artemia icon
+        if (self.hunted_spaces_to_win in Game.ARTEMIA_SPACES[self.artemia]) or self.hunt_card_artemia:
+            self.creature.place_token(self.a_token, verbose=verbose)
+            if trace is not None:
+                trace.emit(self.counter['turn'], 2, eventtrace.CREATURE,
+                           eventtrace.PLACE_ARTEMIA_TOKEN, getattr(self.a_token.place, 'id', 0))
+
+    def place_target_token(self, verbose=False):
+        """The Creature places the Target token if a hunt card has the target icon"""
+        trace = self.trace
+        # Creature places the target token if they played a Hunt card with an target icon
+        if self.hunt_card_target:
+            self.creature.place_token(self.t_token, verbose=verbose)
+            if trace is not None:
+                trace.emit(self.counter['turn'], 2, eventtrace.CREATURE,
+                           eventtrace.PLACE_TARGET_TOKEN, getattr(self.t_token.place, 'id', 0))
+
+    def return_river_cards(self, verbose=False):
+        """End of phase 2: the Hunted who used The River take back one of their two cards"""
+        for hunted in self.hunted:
+            if hunted.river_turn:
+                hunted.river_turn = False
+                if len(hunted.played) == 2:
+                    hunted.return_card_to_hand(hunted.mind.choose_card_to_return(), verbose=verbose)
+                    # TO DO: mind should return a card if it has a creature, artemia or target token on it and the other card does not
+            if len(hunted.played) > 2:
+                self.anomaly = eventtrace.PLAYED_AREA
+                logger.error('Game {}: {} somehow has {} cards in the played area'.format(self.game_number, hunted.name, len(hunted.played)))
+
+    def phase_3(self, verbose=False):
+        """Phase 3: tokens catch the Hunted and the other places proc"""
+        profiler = self.profiler
+        trace = self.trace
+        if profiler is not None:
+            profiler.phase('3')
+        caught_at_least_one = False
 
-            # for every place card played by every hunted player, check that it's not blocked by a token, and then proc the place card.
-            for hunted in self.hunted:
-                for played in hunted.played:
-                    if played.name == self.c_token.place.name:
-                        self.counter['creature catch'] += 1
-                        if played.name == 'The Lair':
-                            if 'Fierceness' in self.hunt_card_played:
-                                self.counter['lair catch'] += 1
-                                hunted.will -= 3
-                                if verbose:
-                                    logger.info('{} was caught by the Creature at The Lair with Fierceness active and lost 3 will'
-                                                .format(hunted.name))
-                            else:
-                                self.counter['lair catch'] += 1
-                                hunted.will -= 2
-                                if verbose:
-                                    logger.info('{} was caught by the Creature at'
-                                                ' The Lair and lost 2 will'
-                                                .format(hunted.name))
+        if verbose:
+            logger.info('Phase 3')
+
+        # check for any phase 3 creature hunt card to be played
+        for hunt_card in self.creature.hunt_cards_to_play:
+            if int(hunt_card.phase) == 3:
+                self.creature.play_hunt_card(hunt_card, verbose=verbose)
+
+        # for every place card played by every hunted player, check that it's not blocked by a token, and then proc the place card.
+        for hunted in self.hunted:
+            for played in hunted.played:
+                if played.name == self.c_token.place.name:
+                    self.counter['creature catch'] += 1
+                    if trace is not None:
+                        trace.emit(self.counter['turn'], 3, hunted.seat,
+                                   eventtrace.CREATURE_CATCH, played.id)
+                    if played.name == 'The Lair':
+                        if self.hunt_flags & FIERCENESS:
+                            self.counter['lair catch'] += 1
+                            hunted.will -= 3
+                            if verbose:
+                                logger.info('{} was caught by the Creature at The Lair with Fierceness active and lost 3 will'
+                                            .format(hunted.name))
                         else:
-                            if 'Fierceness' in self.hunt_card_played:
-                                hunted.will -= 2
-                                if verbose:
-                                    logger.info('{} was caught by the Creature with Fierceness active and lost 3 will'
-                                                .format(hunted.name))
-                            else:
-                                hunted.will -= 1
-                                logger.info('{} was caught by the Creature at {} '
-                                            'and lost 1 will'
-                                            .format(hunted.name, played.name))
-                        if caught_at_least_one == False:
-                            self.counter['advances from catch'] += 1
-                            self.creature_spaces_to_win -= 1
-                            caught_at_least_one = True
-                    elif played.name == self.a_token.place.name:
-                        self.counter['artemia catch'] += 1
-                        if not hunted.phand:
+                            self.counter['lair catch'] += 1
+                            hunted.will -= 2
                             if verbose:
-                                logger.info('{} visited {} but it had the '
-                                            'Artemia token on it and they had no cards in hand.'
-                                            .format(hunted.name, played.name))
+                                logger.info('{} was caught by the Creature at'
+                                            ' The Lair and lost 2 will'
+                                            .format(hunted.name))
+                    else:
+                        if self.hunt_flags & FIERCENESS:
+                            hunted.will -= 2
+                            if verbose:
+                                logger.info('{} was caught by the Creature with Fierceness active and lost 3 will'
+                                            .format(hunted.name))
                         else:
-                            hunted.discard_pcard(hunted.mind.choose_card_to_discard())
+                            hunted.will -= 1
                             if verbose:
-                                logger.info('{} visited {} but it had the '
-                                            'Artemia token on it, so they discarded a card'
+                                logger.info('{} was caught by the Creature at {} '
+                                            'and lost 1 will'
                                             .format(hunted.name, played.name))
-                        if 'Mutation' in self.hunt_card_played:
-                            hunted.will -= 1
-                    elif played.name == self.t_token.place.name:
-                        if 'Scream' in self.hunt_card_played:
-                            if hunted.mind.choose_lose_will_scream():
-                                hunted.will -= 1
-                            else:
-                                try:
-                                    hunted.discard_pcard(hunted.mind.choose_card_to_discard)
-                                except:
-                                    pass
-                                try:
-                                    hunted.discard_pcard(hunted.mind.choose_card_to_discard)
-                                except:
-                                    pass
-                            hunted.proc(played.name, verbose=verbose)
-                        if 'Toxin' in self.hunt_card_played:
-                            pass
-                        if 'Virus' in self.hunt_card_played:
-                            pass
-
-                        pass  # to insert code here for target token effects
+                    if caught_at_least_one == False:
+                        self.counter['advances from catch'] += 1
+                        self.creature_spaces_to_win -= 1
+                        caught_at_least_one = True
+                elif played.name == self.a_token.place.name:
+                    self.counter['artemia catch'] += 1
+                    if trace is not None:
+                        trace.emit(self.counter['turn'], 3, hunted.seat,
+                                   eventtrace.ARTEMIA_CATCH, played.id)
+                    if not hunted.phand:
+                        if verbose:
+                            logger.info('{} visited {} but it had the '
+                                        'Artemia token on it and they had no cards in hand.'
+                                        .format(hunted.name, played.name))
                     else:
-                        hunted.proc(played.name, verbose=verbose)
-                        # to add option of taking back one place from discard
-                    if self.game_over():
-                        break
+                        hunted.discard_pcard(hunted.mind.choose_card_to_discard())
+                        if verbose:
+                            logger.info('{} visited {} but it had the '
+                                        'Artemia token on it, so they discarded a card'
+                                        .format(hunted.name, played.name))
+                    if self.hunt_flags & MUTATION:
+                        hunted.will -= 1
+                elif played.name == self.t_token.place.name:
+                    if trace is not None:
+                        trace.emit(self.counter['turn'], 3, hunted.seat,
+                                   eventtrace.TARGET_HIT, played.id)
+                    if self.hunt_flags & SCREAM:
+                        if hunted.mind.choose_lose_will_scream():
+                            hunted.will -= 1
+                        else:
+                            try:
+                                hunted.discard_pcard(hunted.mind.choose_card_to_discard)
+                            except:
+                                pass
+                            try:
+                                hunted.discard_pcard(hunted.mind.choose_card_to_discard)
+                            except:
+                                pass
+                        hunted.proc(played, verbose=verbose)
+                    # to insert code here for the Toxin and Virus target token effects
+                else:
+                    hunted.proc(played, verbose=verbose)
+                    # to add option of taking back one place from discard
                 if self.game_over():
                     break
             if self.game_over():
                 break
+        return self.game_over()
+
+    def phase_4(self, verbose=False):
+        """Phase 4: the rescue advances, played cards are discarded and the Creature draws back up"""
+        profiler = self.profiler
+        trace = self.trace
+        if profiler is not None:
+            profiler.phase('4')
+        if verbose:
+            logger.info('Phase 4')
 
-            # PHASE 4
-            if verbose:
-                logger.info('Phase 4')
-
-            # check for any phase 4 creature hunt card to be played
-            for hunt_card in self.creature.hunt_cards_to_play:
-                if int(hunt_card.phase) == 4:
-                    self.creature.play_hunt_card(hunt_card, verbose=verbose)
-
-            if 'Stasis' not in self.hunt_card_played:
-                if verbose:
-                    logger.info('The Hunted are now one step closer to escape')
-                self.hunted_spaces_to_win -= 1
-                if self.game_over():
-                    break
-
-            # move played cards into discard piles
-            for hunted in self.hunted:
-                for card in hunted.played:
-                    move(card, hunted.played, hunted.discard)
-
-            # creature draws hunt cards back up to 3
-            try:
-                self.creature.draw_hunt_card(3 - len(self.creature.hhand))
-            except:
-                logger.error('Game {}: tried to draw hunt cards but failed. {} cards in hunt deck'.format(self.game_number, len(self.hunt_deck)))
+        # check for any phase 4 creature hunt card to be played
+        for hunt_card in self.creature.hunt_cards_to_play:
+            if int(hunt_card.phase) == 4:
+                self.creature.play_hunt_card(hunt_card, verbose=verbose)
 
-        # game end subroutine
-        logger.info('The game is over')
-        if self.creature_spaces_to_win < 1 and self.hunted_spaces_to_win < 1:
-            logger.warning('Game {}: Somehow, both teams won at the same time'.format(self.game_number))
+        if not self.hunt_flags & STASIS:
+            if verbose:
+                logger.info('The Hunted are now one step closer to escape')
+            self.hunted_spaces_to_win -= 1
+            if trace is not None:
+                trace.emit(self.counter['turn'], 4, eventtrace.CREATURE, eventtrace.RESCUE_ADVANCE)
+            if self.game_over():
+                return True
 
-        if self.creature_spaces_to_win < 1:
-            winner = 'Creature'
-            logger.info('The Creature won')
-        elif self.hunted_spaces_to_win < 1:
-            winner = 'Hunted'
-            logger.info('The Hunted won')
-
-        with open('games.csv', 'a', newline='') as csvfile:
-            fieldnames = ['GAME',
-                          'ARTEMIA_BOARD',
-                          'PLAYERS',
-                          'WINNER',
-                          'TURNS',
-                          'HUNTED',
-                          'CREATURE',
-                          'LAIR',
-                          'JUNGLE',
-                          'RIVER',
-                          'BEACH',
-                          'ROVER',
-                          'SWAMP',
-                          'SHELTER',
-                          'WRECK',
-                          'SOURCE',
-                          'ARTEFACT',
-                          'CREATURE_CATCH',
-                          'ARTEMIA_CATCH',
-                          'ADVANCES_FROM_CATCH',
-                          'LAIR_CATCH',
-                          'BETTER_HUNTED',
-                          'BETTER_CREATURE'
-                          ]
-            writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-            writer.writerow({'GAME': self.game_number,
-                             'ARTEMIA_BOARD': self.artemia,
-                             'PLAYERS': len(self.hunted) + 1,
-                             'WINNER': winner,
-                             'TURNS': self.counter['turn'],
-                             'HUNTED': self.hunted_spaces_to_win,
-                             'CREATURE': self.creature_spaces_to_win,
-                             'LAIR': self.counter['The Lair'],
-                             'JUNGLE': self.counter['The Jungle'],
-                             'RIVER': self.counter['The River'],
-                             'BEACH': self.counter['The Beach'],
-                             'ROVER': self.counter['The Rover'],
-                             'SWAMP': self.counter['The Swamp'],
-                             'SHELTER': self.counter['The Shelter'],
-                             'WRECK': self.counter['The Wreck'],
-                             'SOURCE': self.counter['The Source'],
-                             'ARTEFACT': self.counter['The Artefact'],
-                             'CREATURE_CATCH': self.counter['creature catch'],
-                             'ARTEMIA_CATCH': self.counter['artemia catch'],
-                             'ADVANCES_FROM_CATCH': self.counter['advances from catch'],
-                             'LAIR_CATCH': self.counter['lair catch'],
-                             'BETTER_HUNTED': self.better_hunted,
-                             'BETTER_CREATURE': self.better_creature
-                             })
+        # move played cards into discard piles
+        for hunted in self.hunted:
+            for card in hunted.played:
+                hunted.discard_played(card)
+
+        # creature draws hunt cards back up to 3
+        self.creature.draw_hunt_card(3 - len(self.creature.hhand))
+        return False
+
+    # the steps of a turn in order; a step returns True if the game is over.
+    # Game.step is the next one to play, so a game copied while a player is
+    # deciding carries on after that decision
+    TURN_STEPS = (start_turn, choose_hunt_cards, phase_1, phase_2_hunt_cards,
+                  place_creature_token, place_artemia_token, place_target_token,
+                  return_river_cards, phase_3, phase_4)
+
+    def result_row(self):
+        """Returns the stats of a finished game as a games.csv row dict"""
+        return {'GAME': self.game_number,
+                'ARTEMIA_BOARD': self.artemia,
+                'PLAYERS': len(self.hunted) + 1,
+                'WINNER': self.winner,
+                'TURNS': self.counter['turn'],
+                'HUNTED': self.hunted_spaces_to_win,
+                'CREATURE': self.creature_spaces_to_win,
+                'LAIR': self.counter['The Lair'],
+                'JUNGLE': self.counter['The Jungle'],
+                'RIVER': self.counter['The River'],
+                'BEACH': self.counter['The Beach'],
+                'ROVER': self.counter['The Rover'],
+                'SWAMP': self.counter['The Swamp'],
+                'SHELTER': self.counter['The Shelter'],
+                'WRECK': self.counter['The Wreck'],
+                'SOURCE': self.counter['The Source'],
+                'ARTEFACT': self.counter['The Artefact'],
+                'CREATURE_CATCH': self.counter['creature catch'],
+                'ARTEMIA_CATCH': self.counter['artemia catch'],
+                'ADVANCES_FROM_CATCH': self.counter['advances from catch'],
+                'LAIR_CATCH': self.counter['lair catch'],
+                'BETTER_HUNTED': self.better_hunted,
+                'BETTER_CREATURE': self.better_creature,
+                'SEED': self.seed
+                }
 
 
 class Token:
@@ -480,23 +1134,69 @@ class Hunted:
     """A Hunted player."""
 
     def __init__(self, name, game, mind):
-        self.name = name
-        self.will = 3
         self.shand = []
         self.phand = []
         self.discard = []
         self.played = []
+        # place names in phand and played, which the Creature knows, by count
+        self.held = collections.Counter()
+        # names of the places in phand, played and discard; places never leave them
+        self.owned = set()
         self.game = game
+        # seats number the Hunted from 1, the Creature is seat 0
+        self.seat = len(game.hunted) + 1
+        self.mind = None
+        self.reset(name, mind)
+
+    def reset(self, name, mind):
+        """Empties the player's zones in place and deals the starting places, see Game.reset()"""
+        self.name = name
+        self.will = 3
+        self.shand.clear()
+        self.phand.clear()
+        self.discard.clear()
+        self.played.clear()
+        self.phand.extend(place_cards[place] for place in STARTING_PLACES)
+        self.held.clear()
+        self.held.update(STARTING_PLACES)
+        self.owned.clear()
+        self.owned.update(STARTING_PLACES)
         self.river_turn = False
         self.artefact_turn = False
-        if mind:
-            self.mind = BetterHuntedMind(self)
+        mind_class = BetterHuntedMind if mind else RandomHuntedMind
+        if type(self.mind) is mind_class:
+            self.mind.reset()
         else:
-            self.mind = RandomHuntedMind(self)
+            self.mind = mind_class(self)
 
     def __repr__(self):
         return '{}({})'.format(self.name, self.mind)
 
+    def clone(self, game):
+        """Returns a copy of the player for a Game.clone()"""
+        hunted = Hunted.__new__(Hunted)
+        hunted.__dict__.update(self.__dict__)
+        hunted.game = game
+        hunted.copy_zones(self)
+        hunted.mind = self.mind.clone(hunted)
+        return hunted
+
+    def restore(self, snapshot):
+        """Puts the player back in the state of a snapshot of it, see Game.restore()"""
+        game, mind = self.game, self.mind
+        self.__dict__.update(snapshot.__dict__)
+        self.game, self.mind = game, mind
+        self.copy_zones(snapshot)
+        mind.restore(snapshot.mind)
+
+    def copy_zones(self, other):
+        self.shand = other.shand[:]
+        self.phand = other.phand[:]
+        self.discard = other.discard[:]
+        self.played = other.played[:]
+        self.held = other.held.copy()
+        self.owned = other.owned.copy()
+
     def resist(self, will_lost, verbose=False):
         """In phase 1, lose x will to take back 2x cards"""
         self.will -= will_lost
@@ -511,6 +1211,7 @@ class Hunted:
         self.will = 3
         for card in self.discard:
             move(card, self.discard, self.phand)
+            self.hold(card)
         self.game.creature_spaces_to_win -= 1
         if verbose:
             logger.info('{} gave up, taking back all cards and will and '
@@ -519,9 +1220,10 @@ class Hunted:
 
     def play_card(self, verbose=False):
         """In phase 2, play a place card face down"""
-        if not self.phand and verbose:
-            logger.warning('Game {}: {} tried to play a card but had no cards in hand'
-                           .format(self.game.game_number, self.name))
+        if not self.phand:
+            if verbose:
+                logger.warning('Game {}: {} tried to play a card but had no cards in hand'
+                               .format(self.game.game_number, self.name))
         else:
             card = self.mind.choose_card_to_play()
             move(card, self.phand, self.played)
@@ -531,39 +1233,69 @@ class Hunted:
 
     def take_back(self, card, verbose=False):
         """Take back a place card from discard pile to hand"""
-        if not card and verbose:
-            logger.info('{} had no cards to take back'.format(self.name))
+        if not card:
+            if verbose:
+                logger.info('{} had no cards to take back'.format(self.name))
         else:
             move(card, self.discard, self.phand)
+            self.hold(card)
             if verbose:
                 logger.info('{} takes back {}'.format(self.name, card.name))
 
     def take_from_reserve(self, card, verbose=False):
         """Take a place card from reserve to hand using the Rover"""
-        move(card, self.game.reserve, self.phand)
+        self.game.reserve.take(card)
+        self.phand.append(card)
+        self.game.reserve_counts[card.name] -= 1
+        self.owned.add(card.name)
+        self.hold(card)
         if verbose:
             logger.info('{} takes {} from the reserve'.format(self.name,
                                                               card.name))
 
+    def owns(self, place_name):
+        """Returns True if the place is in the Hunted's hand, played area or discard pile"""
+        return place_name in self.owned
+
     def discard_pcard(self, card):
         """Discard a place card"""
         move(card, self.phand, self.discard)
+        self.release(card)
+
+    def discard_played(self, card):
+        """In phase 4, discard a played place card"""
+        move(card, self.played, self.discard)
+        self.release(card)
+
+    def hold(self, card):
+        """Counts a place card coming into hand, see held"""
+        self.held[card.name] += 1
+        self.game.place_table = None
+
+    def release(self, card):
+        """Counts a place card leaving hand or played area for the discard pile, see held"""
+        held = self.held
+        held[card.name] -= 1
+        if not held[card.name]:
+            del held[card.name]
+        self.game.place_table = None
 
     def draw_survival(self):
-        """Draw a survival card, using the Shelter or the Source"""
-        try:
-            card = random.choice(self.game.survival_deck)
-            move(card, self.game.survival_deck, self.shand)
-        except:
+        """Draw a survival card, using the Source"""
+        card = self.game.survival_deck.draw()
+        if card is None:
             logger.warning('Tried to draw a survival card when none were left')
+        else:
+            self.shand.append(card)
 
-    def discard_scard(self, card):
+    def discard_scard(self, card, verbose=False):
         """Discard a survival card from Toxin"""
         try:
-            card = random.choice(self.shand)
-            move(card, self.shand, self.survival_discard)
+            card = self.game.rng.choice(self.shand)
+            move(card, self.shand, self.game.survival_deck.discards)
         except:
-            logger.info('{} tried to discard a survival card due to Toxin but had none'.format(self.name))
+            if verbose:
+                logger.info('{} tried to discard a survival card due to Toxin but had none'.format(self.name))
 
     def return_card_to_hand(self, card, verbose=False):
         """Returns place card from played zone to hand"""
@@ -576,166 +1308,75 @@ class Hunted:
         """Reveals place card to the Creature."""
         # currently unused, may be used later for some CreatureMind
         if verbose:
-            logger.info('{} revealed {} from their hand').format(self.name, card.name)
-
-    def proc(self, cardname, verbose=False):
-        """Takes a place card name as string and triggers the effect of the place card"""
-        def lair():
-            if self.mind.lair_choose_takeback():
-                for card in self.discard:
-                    self.take_back(card, verbose=verbose)
-            else:
-                self.proc(self.game.c_token.place.name, verbose=verbose)
-
-        def jungle():
-            lair = True
-            for card in self.played:
-                if card.name == 'The Jungle':
-                    lair = False
-                    move(card, self.played, self.phand)
-            if lair == True:
-                for card in self.played:
-                    if card.name == 'The Lair':
-                        move(card, self.played, self.phand)
-            self.take_back(self.mind.choose_take_back(), verbose=verbose)
-
-        def river():
-            self.river_turn = True
-
-        def beach():
-            if 'Interference' in self.game.hunt_card_played:
-                if verbose:
-                    logger.info('{} visited the Beach but it was ineffective as the Creature played Interference'.format(self.name))
-                return None
-            if not self.game.beach_proced_in_turn:
-                self.game.beach_proced_in_turn = True
-                if self.game.beach_marker_on:
-                    self.game.hunted_spaces_to_win -= 1
-                    if verbose:
-                        logger.info('{} removed the Marker counter from the '
-                                    'Beach, moving the Rescue counter forward 1 space'
-                                    .format(self.name))
-                else:
-                    if verbose:
-                        logger.info('{} put the Marker counter on the Beach'
-                                    .format(self.name))
-                self.game.beach_marker_on = not self.game.beach_marker_on
-            elif verbose:
-                logger.info('{} visited the Beach but it was'
-                            ' already activated this turn'.format(self.name))
-
-        def rover():
-            card = self.mind.choose_card_from_reserve()
-            if not card and verbose:
-                logger.info('{} tried to explore with the Rover but no '
-                            'places were left to explore.'
-                            .format(self.name))
-            else:
-                self.take_from_reserve(card, verbose=verbose)
-                if verbose:
-                    logger.info('{} discovered {} using The Rover.'
-                                .format(self.name, card.name))
-
-        def swamp():
-            lair = True
-            for card in self.played:
-                if card.name == 'The Swamp':
-                    lair = False
-                    move(card, self.played, self.phand)
-            if lair == True:
-                for card in self.played:
-                    if card.name == 'The Lair':
-                        move(card, self.played, self.phand)
-            self.take_back(self.mind.choose_take_back(), verbose=verbose)
-            self.take_back(self.mind.choose_take_back(), verbose=verbose)
-
-        def shelter():
-            if len(self.game.survival_deck) < 2:
-                for card in self.game.survival_discard:
-                    move(card, self.game.survival_discard, self.game.survival_deck)
-                shuffle(self.game.survival_deck)
-                try:
-                    cards = random.sample(self.game.survival_deck, 2)
-                    card_to_draw, card_to_discard = self.mind.choose_survival_card_at_shelter(cards)
-                    move(card_to_draw, self.game.survival_deck, self.shand)
-                    move(card_to_discard, self.game.survival_deck, self.game.survival_discard)
-                    if verbose:
-                        logger.info('{} visited the Shelter, choosing {} over {}'
-                                    .format(self.name, card_to_draw.name,
-                                            card_to_discard.name))
-                except:
-                    logger.warning('{} visited the Shelter but there were not enough cards in the survival deck even after shuffling in the discard'.format(self.name))
-
-        def wreck():
-            if 'Interference' in self.game.hunt_card_played:
-                if verbose:
-                    logger.info('{} visited the Wreck but it was ineffective as the Creature played Interference'.format(self.name))
-                return None
-            if not self.game.wreck_proced_in_turn:
-                self.game.wreck_proced_in_turn = True
-                self.game.hunted_spaces_to_win -= 1
-                if verbose:
-                    logger.info('{} visited the Wreck, moving the Rescue '
-                                'counter forward 1 space'
-                                .format(self.name))
-            else:
-                if verbose:
-                    logger.info('{} visited the Wreck but it had already '
-                                'been activated this turn'.format(self.name))
-
-        def source():
-            if self.mind.source_choose_will():
-                benefactor = self.mind.player_to_gain_will()
-                benefactor.will += 1
-                if verbose:
-                    logger.info('{} visited the Source and chose {} to gain 1 will'.format(self.name, benefactor.name))
-            else:
-                if not self.game.survival_deck:
-                    for card in self.game.survival_discard:
-                        move(card, self.game.survival_discard, self.game.survival_deck)
-                    shuffle(self.game.survival_deck)
-                self.draw_survival()
-                if verbose:
-                    logger.info('{} visited the Source and chose to draw a Survival card'.format(self.name))
-
-        def artefact():
-            self.artefact_turn = True
-
-        switcher = {
-            'The Lair': lair,
-            'The Jungle': jungle,
-            'The River': river,
-            'The Beach': beach,
-            'The Rover': rover,
-            'The Swamp': swamp,
-            'The Shelter': shelter,
-            'The Wreck': wreck,
-            'The Source': source,
-            'The Artefact': artefact,
-        }
-        # Get the function from switcher dictionary
-        self.game.counter[cardname] += 1
-        func = switcher.get(cardname)
-        func()
+            logger.info('{} revealed {} from their hand'.format(self.name, card.name))
+
+    def proc(self, card, verbose=False):
+        """Triggers the effect of a place card, see PLACE_EFFECTS"""
+        game = self.game
+        game.counter[card.name] += 1
+        if game.trace is not None:
+            game.trace.emit(game.counter['turn'], 3, self.seat, eventtrace.PROC, card.id)
+        if game.profiler is None:
+            card_effects[card.id](self, verbose)
+        else:
+            mark = game.profiler.start()
+            card_effects[card.id](self, verbose)
+            game.profiler.stop('proc', card.name, mark)
 
 
 class Creature:
     """The Creature player."""
 
     def __init__(self, name, game, mind):
-        self.name = name
         self.hhand = []
-        self.hdiscard = []
         self.game = game
-        self.tracking_turn = False
         self.hunt_cards_to_play = []
-        if mind:
-            self.mind = BetterCreatureMind(self)
+        self.mind = None
+        self.reset(name, mind)
+
+    def reset(self, name, mind):
+        """Empties the player's hand in place for a new game, see Game.reset()"""
+        self.name = name
+        self.hhand.clear()
+        self.tracking_turn = False
+        self.hunt_cards_to_play.clear()
+        if mind == 2:
+            mind_class = SearchCreatureMind
+        elif mind:
+            mind_class = BetterCreatureMind
         else:
-            self.mind = RandomCreatureMind(self)
+            mind_class = RandomCreatureMind
+        if type(self.mind) is mind_class:
+            self.mind.reset()
+        else:
+            self.mind = mind_class(self)
+
+    def clone(self, game):
+        """Returns a copy of the player for a Game.clone()"""
+        creature = Creature.__new__(Creature)
+        creature.__dict__.update(self.__dict__)
+        creature.game = game
+        creature.copy_zones(self)
+        creature.mind = self.mind.clone(creature)
+        return creature
+
+    def restore(self, snapshot):
+        """Puts the player back in the state of a snapshot of it, see Game.restore()"""
+        game, mind = self.game, self.mind
+        self.__dict__.update(snapshot.__dict__)
+        self.game, self.mind = game, mind
+        self.copy_zones(snapshot)
+        mind.restore(snapshot.mind)
+
+    def copy_zones(self, other):
+        self.hhand = other.hhand[:]
+        self.hunt_cards_to_play = other.hunt_cards_to_play[:]
 
     def place_token(self, token, verbose=False):
         """Put a creature or artemia token on a place card"""
+        profiler = self.game.profiler
+        if profiler is not None:
+            mark = profiler.start()
         chosen_place_name = self.mind.choose_place_name_to_put_token()
         for place_card in self.game.board:
             if place_card.name == chosen_place_name:
@@ -745,169 +1386,344 @@ class Creature:
                                                                     token.name,
                                                                     place_card.name))
                 break
+        if profiler is not None:
+            profiler.stop('place_token', token.name, mark)
 
     def draw_hunt_card(self, number_of_cards=1):
         """Takes an optional integer and draws a hunt card or x hunt cards"""
         for i in range(number_of_cards):
-            card = random.choice(self.game.hunt_deck)
-            move(card, self.game.hunt_deck, self.hhand)
+            card = self.game.hunt_deck.draw()
+            if card is None:
+                logger.error('Game {}: tried to draw hunt cards but failed. {} cards in hand'
+                             .format(self.game.game_number, len(self.hhand)))
+                return
+            self.hhand.append(card)
 
     def play_hunt_card(self, card, verbose=False):
-        def forbidden_zone():
-            # All Hunted discard 1 Place card simultaneously.
-            for hunted in self.game.hunted:
-                try:
-                    hunted.discard_pcard(hunted.mind.choose_card_to_discard())
-                except:
-                    pass
-
-        def phobia():
-            # Force one Hunted to show you all but 2 Place cards from his hand.
-            self.game.hunt_card_artemia = True
-            target = self.mind.choose_player_for_phobia()
-            for i in range(len(target.phand) - 2):
-                target.reveal_pcard(target.mind.choose_card_to_reveal())
-                # to add a way for creature to decide to hunt aim for this player, and exclude the revealed cards
-
-        def ascendancy():
-            # Force one Hunted to discard all but 2 Place cards from his hand.
-            target = self.mind.choose_player_for_ascendancy()
-            for i in range(len(target.phand) - 2):
-                target.discard_pcard(target.mind.choose_card_to_discard())
-
-        def scream():
-            # Each Hunted on the targeted place must discard 2 Place cards or lose 1 Will.
-            self.game.hunt_card_target = True
-
-        def force_field():
-            # Before the Hunted play, target 2 adjacent places. Neither may played this turn.
-            # there is only one target token. i should create new invisible spots in between places and create a new method for targeting two adjacent places
-            if verbose:
-                pass
+        """Plays a hunt card, see HUNT_EFFECTS, and keeps any modifier active for the turn"""
+        profiler = self.game.profiler
+        if profiler is None:
+            card_effects[card.id](self, verbose)
+        else:
+            mark = profiler.start()
+            card_effects[card.id](self, verbose)
+            profiler.stop('hunt card', card.name, mark)
+        if self.game.trace is not None:
+            self.game.trace.emit(self.game.counter['turn'], int(card.phase),
+                                 eventtrace.CREATURE, eventtrace.PLAY_HUNT, card.id)
+        self.game.hunt_flags |= card_flags[card.id]
+        move(card, self.hhand, self.game.hunt_deck.discards)  # this may be placed separately
+        if verbose:
+            logger.info('The Creature played the {} hunt card'.format(card.name))
 
-        def toxin():
-            # Each Hunted on the targeted place discards 1 Survival card. The power of the place is ineffective.
-            self.game.hunt_card_target = True
 
-        def mutation():
-            # In addition to its effects, the Artemia token inflicts the loss of 1 Will.
-            self.game.hunt_card_artemia = True
+# place card effects, called with the Hunted using the place
 
-        def virus():
-            # Target 2 adjacent places. Apply the effects of the Artemia token on both places.
-            self.game.hunt_card_artemia = True
+def lair(hunted, verbose=False):
+    if hunted.mind.lair_choose_takeback():
+        for card in hunted.discard:
+            hunted.take_back(card, verbose=verbose)
+    else:
+        hunted.proc(hunted.game.c_token.place, verbose=verbose)
 
-        def persecution():
-            # Each Hunted may only take back 1 Place card when using the power of a Place card.
-            pass
 
-        def anticipation():
-            # Choose one Hunted. If you catch him with the Creature token, move the Assimilation counter forward 1 extra space.
-            self.game.anticipation_target = self.mind.choose_player_for_anticipation()
+def jungle(hunted, verbose=False):
+    lair = True
+    for card in hunted.played:
+        if card.name == 'The Jungle':
+            lair = False
+            move(card, hunted.played, hunted.phand)
+    if lair == True:
+        for card in hunted.played:
+            if card.name == 'The Lair':
+                move(card, hunted.played, hunted.phand)
+    hunted.take_back(hunted.mind.choose_take_back(), verbose=verbose)
 
-        def interference():
-            # The powers of the Beach and the Wreck are ineffective.
-            pass
 
-        def flashback():
-            # Copy the last Hunt card you discarded.
-            pass  # to code this
+def river(hunted, verbose=False):
+    hunted.river_turn = True
 
-        def detour():
-            # After the Hunted reveal their Place cards, move one Hunted to an adjacent place.
-            pass  # to code this, move to adjacent place
 
-        def stasis():
-            # Prevent the Rescue counter moving forward during this phase.
-            pass
+def beach(hunted, verbose=False):
+    game = hunted.game
+    if game.hunt_flags & INTERFERENCE:
+        if verbose:
+            logger.info('{} visited the Beach but it was ineffective as the Creature played Interference'.format(hunted.name))
+        return None
+    if not game.beach_proced_in_turn:
+        game.beach_proced_in_turn = True
+        if game.beach_marker_on:
+            game.hunted_spaces_to_win -= 1
+            if verbose:
+                logger.info('{} removed the Marker counter from the '
+                            'Beach, moving the Rescue counter forward 1 space'
+                            .format(hunted.name))
+        else:
+            if verbose:
+                logger.info('{} put the Marker counter on the Beach'
+                            .format(hunted.name))
+        game.beach_marker_on = not game.beach_marker_on
+    elif verbose:
+        logger.info('{} visited the Beach but it was'
+                    ' already activated this turn'.format(hunted.name))
 
-        def despair():
-            # No Survival cards may be played or drawn for the remainder of the turn.
-            self.game.hunt_card_artemia = True
 
-        def tracking():
-            # Next turn, you may play up to 2 Hunt cards.
-            self.tracking_turn = True
+def rover(hunted, verbose=False):
+    card = hunted.mind.choose_card_from_reserve()
+    if not card:
+        if verbose:
+            logger.info('{} tried to explore with the Rover but no '
+                        'places were left to explore.'
+                        .format(hunted.name))
+    else:
+        hunted.take_from_reserve(card, verbose=verbose)
+        if verbose:
+            logger.info('{} discovered {} using The Rover.'
+                        .format(hunted.name, card.name))
+
+
+def swamp(hunted, verbose=False):
+    lair = True
+    for card in hunted.played:
+        if card.name == 'The Swamp':
+            lair = False
+            move(card, hunted.played, hunted.phand)
+    if lair == True:
+        for card in hunted.played:
+            if card.name == 'The Lair':
+                move(card, hunted.played, hunted.phand)
+    hunted.take_back(hunted.mind.choose_take_back(), verbose=verbose)
+    hunted.take_back(hunted.mind.choose_take_back(), verbose=verbose)
+
+
+def shelter(hunted, verbose=False):
+    deck = hunted.game.survival_deck
+    cards = [deck.draw(), deck.draw()]
+    if cards[1] is None:
+        if cards[0] is not None:
+            hunted.shand.append(cards[0])
+        logger.warning('{} visited the Shelter but there were not enough cards in the survival deck even after shuffling in the discard'.format(hunted.name))
+        return
+    card_to_draw, card_to_discard = hunted.mind.choose_survival_card_at_shelter(cards)
+    hunted.shand.append(card_to_draw)
+    deck.discard(card_to_discard)
+    if verbose:
+        logger.info('{} visited the Shelter, choosing {} over {}'
+                    .format(hunted.name, card_to_draw.name,
+                            card_to_discard.name))
+
+
+def wreck(hunted, verbose=False):
+    game = hunted.game
+    if game.hunt_flags & INTERFERENCE:
+        if verbose:
+            logger.info('{} visited the Wreck but it was ineffective as the Creature played Interference'.format(hunted.name))
+        return None
+    if not game.wreck_proced_in_turn:
+        game.wreck_proced_in_turn = True
+        game.hunted_spaces_to_win -= 1
+        if verbose:
+            logger.info('{} visited the Wreck, moving the Rescue '
+                        'counter forward 1 space'
+                        .format(hunted.name))
+    else:
+        if verbose:
+            logger.info('{} visited the Wreck but it had already '
+                        'been activated this turn'.format(hunted.name))
 
-        def fierceness():
-            # Hunted caught by the Creature token lose 1 extra Will.
-            pass
 
-        def mirage():
-            # Target 2 adjacent places. Both are ineffective.
-            pass  # same as force field
+def source(hunted, verbose=False):
+    if hunted.mind.source_choose_will():
+        benefactor = hunted.mind.player_to_gain_will()
+        benefactor.will += 1
+        if verbose:
+            logger.info('{} visited the Source and chose {} to gain 1 will'.format(hunted.name, benefactor.name))
+    else:
+        hunted.draw_survival()
+        if verbose:
+            logger.info('{} visited the Source and chose to draw a Survival card'.format(hunted.name))
+
 
-        def cataclysm():
-            # The place's power of your choice is ineffective.
-            pass
+def artefact(hunted, verbose=False):
+    hunted.artefact_turn = True
 
-        def clone():
-            # Consider the Target token as a second Creature token.
-            self.game.hunt_card_target = True
-
-        switcher = {
-            'Forbidden Zone': forbidden_zone,
-            'Phobia': phobia,
-            'Ascendancy': ascendancy,
-            'Scream': scream,
-            'Force Field': force_field,
-            'Toxin': toxin,
-            'Mutation': mutation,
-            'Virus': virus,
-            'Persecution': persecution,
-            'Anticipation': anticipation,
-            'Interference': interference,
-            'Flashback': flashback,
-            'Detour': detour,
-            'Stasis': stasis,
-            'Despair': despair,
-            'Tracking': tracking,
-            'Fierceness': fierceness,
-            'Mirage': mirage,
-            'Cataclysm': cataclysm,
-            'Clone': clone
-        }
-        # Get the function from switcher dictionary
-        func = switcher.get(card.name)
-        func()
-        self.game.hunt_card_played.append(card.name)
-        move(card, self.hhand, self.hdiscard)  # this may be placed separately
-        if verbose:
-            logger.info('The Creature played the {} hunt card'.format(card.name))
 
+# hunt card effects, called with the Creature playing the card
 
-class PlaceCard:
+def forbidden_zone(creature, verbose=False):
+    # All Hunted discard 1 Place card simultaneously.
+    for hunted in creature.game.hunted:
+        try:
+            hunted.discard_pcard(hunted.mind.choose_card_to_discard())
+        except:
+            pass
+
+
+def phobia(creature, verbose=False):
+    # Force one Hunted to show you all but 2 Place cards from his hand.
+    creature.game.hunt_card_artemia = True
+    target = creature.mind.choose_player_for_phobia()
+    for i in range(len(target.phand) - 2):
+        target.reveal_pcard(target.mind.choose_card_to_reveal())
+        # to add a way for creature to decide to hunt aim for this player, and exclude the revealed cards
+
+
+def ascendancy(creature, verbose=False):
+    # Force one Hunted to discard all but 2 Place cards from his hand.
+    target = creature.mind.choose_player_for_ascendancy()
+    for i in range(len(target.phand) - 2):
+        target.discard_pcard(target.mind.choose_card_to_discard())
+
+
+def target_icon(creature, verbose=False):
+    # Scream, Toxin and Clone act on the place the Target token is put on.
+    creature.game.hunt_card_target = True
+
+
+def artemia_icon(creature, verbose=False):
+    # Mutation, Virus and Despair bring the Artemia token into play.
+    creature.game.hunt_card_artemia = True
+
+
+def anticipation(creature, verbose=False):
+    # Choose one Hunted. If you catch him with the Creature token, move the Assimilation counter forward 1 extra space.
+    creature.game.anticipation_target = creature.mind.choose_player_for_anticipation()
+
+
+def tracking(creature, verbose=False):
+    # Next turn, you may play up to 2 Hunt cards.
+    creature.tracking_turn = True
+
+
+def no_effect(creature, verbose=False):
+    # the card only acts through its modifier flag, or is not coded yet
+    pass
+
+
+# effect of each card by card name, compiled into card_effects by load_cards()
+PLACE_EFFECTS = {
+    'The Lair': lair,
+    'The Jungle': jungle,
+    'The River': river,
+    'The Beach': beach,
+    'The Rover': rover,
+    'The Swamp': swamp,
+    'The Shelter': shelter,
+    'The Wreck': wreck,
+    'The Source': source,
+    'The Artefact': artefact
+}
+
+HUNT_EFFECTS = {
+    'Forbidden Zone': forbidden_zone,
+    'Phobia': phobia,
+    'Ascendancy': ascendancy,
+    'Scream': target_icon,
+    'Force Field': no_effect,  # to code this: target 2 adjacent places, neither may be played
+    'Toxin': target_icon,  # to code this: discard 1 survival card, the place is ineffective
+    'Mutation': artemia_icon,
+    'Virus': artemia_icon,  # to code this: the artemia token acts on 2 adjacent places
+    'Persecution': no_effect,  # to code this: only 1 place card may be taken back per place power
+    'Anticipation': anticipation,
+    'Interference': no_effect,
+    'Flashback': no_effect,  # to code this: copy the last hunt card discarded
+    'Detour': no_effect,  # to code this: move one Hunted to an adjacent place
+    'Stasis': no_effect,
+    'Despair': artemia_icon,  # to code this: no survival cards may be played or drawn
+    'Tracking': tracking,
+    'Fierceness': no_effect,
+    'Mirage': no_effect,  # to code this: target 2 adjacent places, both are ineffective
+    'Cataclysm': no_effect,  # to code this: a place of the Creature's choice is ineffective
+    'Clone': target_icon  # to code this: the target token is a second creature token
+}
+
+# hunt cards that modify the rest of the turn, as bits of Game.hunt_flags
+FIERCENESS = 1
+MUTATION = 2
+SCREAM = 4
+TOXIN = 8
+VIRUS = 16
+STASIS = 32
+INTERFERENCE = 64
+
+HUNT_FLAGS = {
+    'Fierceness': FIERCENESS,
+    'Mutation': MUTATION,
+    'Scream': SCREAM,
+    'Toxin': TOXIN,
+    'Virus': VIRUS,
+    'Stasis': STASIS,
+    'Interference': INTERFERENCE
+}
+
+
+class Card:
+    """A card definition from the catalogue, shared by every game.
+
+    Cards are immutable, so games copy and pickle them by reference.
+    """
+
+    __slots__ = ('id', 'name', 'text')
+
+    def __init__(self, card_id, name, text):
+        object.__setattr__(self, 'id', card_id)
+        object.__setattr__(self, 'name', name)
+        object.__setattr__(self, 'text', text)
+
+    def __setattr__(self, name, value):
+        raise AttributeError('{} is a card definition and cannot be changed'.format(self.name))
+
+    def __delattr__(self, name):
+        raise AttributeError('{} is a card definition and cannot be changed'.format(self.name))
+
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
+
+    def __reduce__(self):
+        return card_by_id, (self.id,)
+
+
+class PlaceCard(Card):
     """A Place card, either on the board or in a Hunted's phand."""
 
-    def __init__(self, name, text, number, adjacent):
-        self.name = name
-        self.text = text
-        self.number = number
-        self.adjacent = []
-        for adj_place in adjacent.split(','):
-            self.adjacent.append(adj_place)
+    __slots__ = ('number', 'adjacent')
+
+    def __init__(self, card_id, name, text, number, adjacent):
+        super().__init__(card_id, name, text)
+        object.__setattr__(self, 'number', number)
+        object.__setattr__(self, 'adjacent', tuple(adjacent.split(',')))
 
     def __repr__(self):
         return self.name
 
 
-class SurvivalCard:
+class SurvivalCard(Card):
     """A Survival card."""
 
-    def __init__(self, name, text, phase):
-        self.name = name
-        self.text = text
-        self.phase = phase
+    __slots__ = ('phase',)
 
+    def __init__(self, card_id, name, text, phase):
+        super().__init__(card_id, name, text)
+        object.__setattr__(self, 'phase', phase)
 
-class HuntCard:
+
+class HuntCard(Card):
     """A Hunt card."""
 
-    def __init__(self, name, text, phase, artemia):
-        self.name = name
-        self.text = text
-        self.phase = phase
-        self.artemia = artemia
+    __slots__ = ('phase', 'artemia')
+
+    def __init__(self, card_id, name, text, phase, artemia):
+        super().__init__(card_id, name, text)
+        object.__setattr__(self, 'phase', phase)
+        object.__setattr__(self, 'artemia', artemia)
+
+
+# the catalogue is preloaded, so games never touch the filesystem for it
+load_cards()
+load_player_names()
 
 
 class RandomHuntedMind:
@@ -915,14 +1731,33 @@ class RandomHuntedMind:
 
     def __init__(self, player):
         self.player = player
+        self.rng = player.game.rng
+
+    def clone(self, player):
+        """Returns a copy of the mind for a copy of its player, see Game.clone()"""
+        mind = type(self).__new__(type(self))
+        mind.__dict__.update(self.__dict__)
+        mind.player = player
+        mind.rng = player.game.rng
+        return mind
+
+    def restore(self, snapshot):
+        """Puts the mind back in the state of a snapshot of it, see Game.restore()"""
+        player, rng = self.player, self.rng
+        self.__dict__.update(snapshot.__dict__)
+        self.player, self.rng = player, rng
+
+    def reset(self):
+        """Readies the mind for a new game of its player, see Game.reset()"""
+        self.rng = self.player.game.rng
 
     def choose_card_to_play(self):
         """Returns a random card from the Hunted's hand"""
-        return random.choice(self.player.phand)
+        return self.rng.choice(self.player.phand)
 
     def choose_take_back(self):
         """Returns a random card from Hunted's discard or None if discard is empty"""
-        return random.choice(self.player.discard) if self.player.discard else None
+        return self.rng.choice(self.player.discard) if self.player.discard else None
 
     def decide_if_give_up(self):
         """Returns True if conditions are met and Hunted will give up else False"""
@@ -944,7 +1779,7 @@ class RandomHuntedMind:
 
     def card_to_take_back(self):
         """Returns a random card from Hunted's discard"""
-        return random.choice(self.player.discard)
+        return self.rng.choice(self.player.discard)
 
     def lair_choose_takeback(self):
         """Returns True if Hunted chooses to take back place cards when proccing the Lair"""
@@ -952,42 +1787,41 @@ class RandomHuntedMind:
 
     def choose_card_from_reserve(self):
         """Returns a random place card from the reserve that can be taken"""
-        reserve = self.player.game.reserve
-        current_cards = {card.name for card in self.player.phand + self.player.played + self.player.discard}
-        candidates = [card for card in reserve if card.name not in current_cards]
+        owned = self.player.owned
+        candidates = [card for card in self.player.game.reserve if card.name not in owned]
         if not candidates:
             return None
-        return random.choice(candidates)
+        return self.rng.choice(candidates)
 
     def choose_survival_card_at_shelter(self, cards):
         """Takes an iterable of two cards and returns a tuple of them in random order"""
-        if random.randint(0, 1) > 0:
+        if self.rng.randint(0, 1) > 0:
             return cards[0], cards[1]
         else:
             return cards[1], cards[0]
 
     def choose_card_to_return(self):
         """Returns a random card in Hunted's played zone"""
-        return random.choice(self.player.played)
+        return self.rng.choice(self.player.played)
 
     def source_choose_will(self):
         """Decide whether or not to take will when proccing the Source"""
-        if not self.player.game.survival_deck and not self.player.game.survival_discard:
+        if self.player.game.survival_deck.empty():
             return True
         else:
-            return random.choice([True, False])
+            return self.rng.choice([True, False])
 
     def player_to_gain_will(self):
         """Decide which player to gain will when proccing the Source"""
-        return random.choice(self.player.game.hunted)
+        return self.rng.choice(self.player.game.hunted)
 
     def choose_card_to_discard(self):
         """Returns a random place card from Hunted's hand"""
-        return random.choice(self.player.phand)
+        return self.rng.choice(self.player.phand)
 
     def choose_card_to_reveal(self):  # for phobia
         """Returns a random place card from Hunted's hand"""
-        return random.choice(self.player.phand)
+        return self.rng.choice(self.player.phand)
 
     def choose_lose_will_scream(self):
         if len(self.player.phand) > 1:
@@ -1001,9 +1835,28 @@ class RandomCreatureMind:
 
     def __init__(self, player):
         self.player = player
+        self.rng = player.game.rng
 
-    def choose_place_name_to_put_token(self):
-        """Returns a random place to place a token on.
+    def clone(self, player):
+        """Returns a copy of the mind for a copy of its player, see Game.clone()"""
+        mind = type(self).__new__(type(self))
+        mind.__dict__.update(self.__dict__)
+        mind.player = player
+        mind.rng = player.game.rng
+        return mind
+
+    def restore(self, snapshot):
+        """Puts the mind back in the state of a snapshot of it, see Game.restore()"""
+        player, rng = self.player, self.rng
+        self.__dict__.update(snapshot.__dict__)
+        self.player, self.rng = player, rng
+
+    def reset(self):
+        """Readies the mind for a new game of its player, see Game.reset()"""
+        self.rng = self.player.game.rng
+
+    def place_options(self):
+        """Returns the names of the places the Hunted may have played.
 
         Creature decides the candidates based on what cards are in
         the Hunteds' hands+played, which is public info"""
@@ -1015,13 +1868,17 @@ class RandomCreatureMind:
             for card in hunted.phand:
                 if card.name not in place_option:
                     place_option.append(card.name)
-        return random.choice(place_option)
+        return place_option
+
+    def choose_place_name_to_put_token(self):
+        """Returns a random place to place a token on, see place_options()"""
+        return self.rng.choice(self.place_options())
 
     def choose_cards_to_play_this_turn(self, number=1):
         """Adds one or two(if Tracking is active) hunt card names to the
         Creature's hunt_cards_to_play attribute"""
         try:
-            self.player.hunt_cards_to_play = random.sample(self.player.hhand, number)
+            self.player.hunt_cards_to_play = self.rng.sample(self.player.hhand, number)
         except ValueError:
             self.player.hunt_cards_to_play = []
             logger.error('Game {}: {} tried to sample {} hunt cards from his hand but only had {} card'.format(self.player.game.game_number, self.player.name, number, len(self.player.hhand)))
@@ -1032,9 +1889,9 @@ class RandomCreatureMind:
                       self.player.game.hunted
                       if len(hunted.phand) > 2]
         try:
-            return random.choice(candidates)
+            return self.rng.choice(candidates)
         except:
-            return random.choice(self.player.game.hunted)
+            return self.rng.choice(self.player.game.hunted)
 
     def choose_player_for_ascendancy(self):
         """Returns a random candidate for using the Ascendancy hunt card"""
@@ -1042,9 +1899,9 @@ class RandomCreatureMind:
                       self.player.game.hunted
                       if len(hunted.phand) > 2]
         try:
-            return random.choice(candidates)
+            return self.rng.choice(candidates)
         except:
-            return random.choice(self.player.game.hunted)
+            return self.rng.choice(self.player.game.hunted)
 
     def choose_player_for_anticipation(self):
         """Returns a random candidate for using the Anticipation hunt card"""
@@ -1053,7 +1910,7 @@ class RandomCreatureMind:
         candidates = [hunted for hunted in
                       self.player.game.hunted
                       if len(hunted.phand) == fewest_place_cards]
-        return random.choice(candidates)
+        return self.rng.choice(candidates)
 
     def choose_force_field_place(self):
         """Returns two random adjacent places which are candidates"""
@@ -1062,11 +1919,11 @@ class RandomCreatureMind:
             for card in hunted.phand:
                 if card.name not in place_option:
                     place_option.append(card.name)
-        first_place = random.choice(place_option)
+        first_place = self.rng.choice(place_option)
         try:
-            adj_place = random.choice([adjacent for adjacent in first_place.adjacent if adjacent in place_option])
+            adj_place = self.rng.choice([adjacent for adjacent in first_place.adjacent if adjacent in place_option])
         except:
-            adj_place = random.choice(first_place.adjacent)
+            adj_place = self.rng.choice(first_place.adjacent)
         return first_place, adj_place
 
 
@@ -1077,21 +1934,10 @@ class BetterHuntedMind(RandomHuntedMind):
 
     def choose_card_from_reserve(self):
         """Always takes the Wreck before other places"""
-        have_wreck = False
-        reserve_has_wreck = False
-        reserve = self.player.game.reserve
-        if 'The Wreck' in [card.name for card in self.player.phand + self.player.played + self.player.discard]:
-            have_wreck = True
-        if 'The Wreck' in [card.name for card in reserve]:
-            reserve_has_wreck = True
-        if not have_wreck and reserve_has_wreck:
-            return random.choice([card for card in reserve if card.name == 'The Wreck'])
-        else:
-            current_cards = {card.name for card in self.player.phand + self.player.played + self.player.discard}
-            candidates = [card for card in reserve if card.name not in current_cards]
-            if not candidates:
-                return None
-            return random.choice(candidates)
+        wrecks = self.player.game.reserve_counts['The Wreck']
+        if wrecks and not self.player.owns('The Wreck'):
+            return place_cards['The Wreck']
+        return super().choose_card_from_reserve()
 
 
 class BetterCreatureMind(RandomCreatureMind):
@@ -1103,64 +1949,306 @@ class BetterCreatureMind(RandomCreatureMind):
         """Returns a probability-weighted place to place a token on.
 
         Creature decides the candidates based on what cards are in
-        the Hunteds' hands+played, which is public info"""
-        prob = collections.Counter()
-        for hunted in self.player.game.hunted:
-            possible_places = hunted.phand + hunted.played
-            for card in possible_places:
-                prob[card.name] += (1 / len(possible_places))
-        total_prob_denominator = 0
+        the Hunteds' hands+played, which is public info, see
+        Game.place_probabilities()"""
+        prob = self.player.game.place_probabilities()
+        return self.rng.choices(list(prob), weights=prob.values())[0]
 
-        for cardname in prob:
-            total_prob_denominator += prob[card]
 
-        return random.choices(list(prob.keys()), weights=prob.values())[0]
+class SearchCreatureMind(BetterCreatureMind):
+    """A Creature that chooses its hunt cards and token places by search.
 
+    Each of these decisions runs information-set Monte Carlo tree search
+    within the game's SearchBudget, see search_decision(). Its other
+    decisions are the BetterCreatureMind's.
+    """
 
-if __name__ == "__main__":
-    # instantiate hunt, survival, place cards from csv files
-    hunt_cards = {}
-    survival_cards = {}
-    place_cards = {}
-    with open('cards.csv', 'r', encoding='utf-8-sig', newline='') as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            if row['TYPE'] == 'Hunt':
-                hunt_cards[row['CARDNAME']] = HuntCard(row['CARDNAME'],
-                                                       row['TEXT'],
-                                                       row['PHASE'],
-                                                       row['ARTEMIA'])
-            elif row['TYPE'] == 'Survival':
-                survival_cards[row['CARDNAME']] = SurvivalCard(row['CARDNAME'],
-                                                               row['TEXT'],
-                                                               row['PHASE'])
+    def choose_cards_to_play_this_turn(self, number=1):
+        """Sets the hunt cards with the best search results as the ones to play"""
+        if len(self.player.hhand) <= number:
+            return super().choose_cards_to_play_this_turn(number)
+        choice = self.search()
+        if choice is None:
+            return super().choose_cards_to_play_this_turn(number)
+        self.player.hunt_cards_to_play = [hunt_cards[name] for name in choice]
+
+    def choose_place_name_to_put_token(self):
+        """Returns the place with the best search results for the token being placed"""
+        place_options = self.place_options()
+        if len(place_options) == 1:
+            return place_options[0]
+        choice = self.search()
+        if choice is None:
+            return super().choose_place_name_to_put_token()
+        return choice
+
+    def search(self):
+        """Returns the most visited choice of a search of the decision being made.
+
+        Returns None if the budget ran out before the first rollout.
+        """
+        game = self.player.game
+        budget = game.search_budget
+        # one draw per decision whatever the budget, so the game's own random stream is kept
+        seed = self.rng.getrandbits(64)
+        if budget.processes > 1:
+            stats = search_in_parallel(game.clone(), seed, budget)
+        else:
+            stats = search_decision(game, seed, budget.rollouts, budget.seconds)
+        if not stats:
+            return None
+        return max(stats, key=lambda choice: stats[choice][0])
+
+
+class SearchNode:
+    """A Creature decision in the tree of a search, with the results of its rollouts"""
+
+    def __init__(self):
+        self.children = {}  # choice: SearchNode
+        self.visits = 0
+        self.wins = 0
+        # rollouts in which the decision could be made, as Hunted cards differ between them
+        self.available = 0
+
+
+class RolloutCreatureMind(BetterCreatureMind):
+    """The Creature of a search rollout.
+
+    Its hunt card and token decisions follow the search tree by UCB1 and
+    grow it by one decision per rollout; past that, it plays as the
+    BetterCreatureMind.
+    """
+
+    # UCB1 exploration constant, for win rates between 0 and 1
+    EXPLORATION = 0.7
+
+    def __init__(self, player, root):
+        super().__init__(player)
+        self.node = root
+        self.path = [root]
+        self.expanded = False
+
+    def choose(self, choices):
+        """Returns the choice of the tree among choices, or None once out of the tree"""
+        node = self.node
+        if node is None:
+            return None
+        unexpanded = []
+        for choice in choices:
+            child = node.children.get(choice)
+            if child is None:
+                unexpanded.append(choice)
             else:
-                place_cards[row['CARDNAME']] = PlaceCard(row['CARDNAME'],
-                                                         row['TEXT'],
-                                                         row['NUMBER'],
-                                                         row['ADJACENT'])
-
-    no_of_players = 0
-    no_of_games = 0
-    hunted_mind = 5
-    creature_mind = 5
-    verbose = 5
-    while int(no_of_players) < 2 or int(no_of_players) > 7:
-        no_of_players = input('How many players? (2-7): ')
-    while int(no_of_games) < 1 or int(no_of_games) > 2000:
-        no_of_games = input('How many games to simulate? (1-2000): ')
-    while int(hunted_mind) not in (0, 1):
-        hunted_mind = input('How should the Hunted behave? (0) Random Mind (1) Better Mind: ')
-    while int(creature_mind) not in (0, 1):
-        creature_mind = input('How should the Creature behave? (0) Random Mind (1) Better Mind: ')
-    while int(verbose) not in (0, 1):
-        verbose = input('Should a verbose log be produced? (0) No (1) Yes: ')
-
-
-
-    for i in range(int(no_of_games)):
-        game = Game(no_of_players, hunted_mind, creature_mind)
-        if verbose:
-            game.play(verbose=True)
+                child.available += 1
+        if unexpanded:
+            if self.expanded:
+                self.node = None
+                return None
+            choice = self.rng.choice(unexpanded)
+            child = node.children[choice] = SearchNode()
+            child.available = 1
+            self.expanded = True
         else:
-            game.play(verbose=False)
+            choice = max(choices, key=lambda choice: self.ucb(node.children[choice]))
+            child = node.children[choice]
+        self.node = child
+        self.path.append(child)
+        return choice
+
+    def ucb(self, node):
+        return (node.wins / node.visits
+                + self.EXPLORATION * math.sqrt(math.log(node.available) / node.visits))
+
+    def choose_cards_to_play_this_turn(self, number=1):
+        hhand = self.player.hhand
+        if len(hhand) <= number:
+            return super().choose_cards_to_play_this_turn(number)
+        choice = self.choose([tuple(sorted(card.name for card in cards))
+                              for cards in itertools.combinations(hhand, number)])
+        if choice is None:
+            return super().choose_cards_to_play_this_turn(number)
+        self.player.hunt_cards_to_play = [hunt_cards[name] for name in choice]
+
+    def choose_place_name_to_put_token(self):
+        choice = self.choose(self.place_options())
+        if choice is None:
+            return super().choose_place_name_to_put_token()
+        return choice
+
+
+def deal_hidden_cards(game):
+    """Deals the cards the Creature cannot see at random, keeping what it can.
+
+    The Creature knows which place cards each Hunted holds in hand and
+    played together, and how many are played, but not which; and how many
+    survival cards each Hunted holds, but not which.
+    """
+    rng = game.rng
+    for hunted in game.hunted:
+        if hunted.played:
+            cards = hunted.phand + hunted.played
+            rng.shuffle(cards)
+            hunted.played = cards[:len(hunted.played)]
+            hunted.phand = cards[len(hunted.played):]
+    survival = game.survival_deck.cards + [card for hunted in game.hunted for card in hunted.shand]
+    rng.shuffle(survival)
+    for hunted in game.hunted:
+        hunted.shand = [survival.pop() for card in hunted.shand]
+    game.survival_deck.cards = survival
+    # nor the order of the hunt deck
+    rng.shuffle(game.hunt_deck.cards)
+
+
+def search_decision(game, seed, rollouts, seconds=None):
+    """Searches the Creature decision game is waiting on.
+
+    Every rollout copies the game, deals its hidden cards at random (a
+    determinization, see deal_hidden_cards()) and plays it to the end with
+    the existing turn logic from the step that asked for the decision. The
+    Creature's decisions share one tree across the rollouts, see
+    RolloutCreatureMind. Plays rollouts rollouts, or as many as fit in
+    seconds if given. Returns {choice: [visits, Creature wins]} of the
+    decision.
+    """
+    rng = random.Random(seed)
+    root = SearchNode()
+    deadline = time.perf_counter() + seconds if seconds is not None else None
+    # rollouts run into the same anomalies as games, which are only worth logging once
+    disabled, logger.disabled = logger.disabled, True
+    try:
+        played = 0
+        while (played < rollouts if deadline is None else time.perf_counter() < deadline):
+            rollout = game.clone()
+            rollout.rng.seed(rng.getrandbits(64))
+            deal_hidden_cards(rollout)
+            mind = rollout.creature.mind = RolloutCreatureMind(rollout.creature, root)
+            # play the decision's step again, with the rollout's Creature deciding
+            rollout.step -= 1
+            won = rollout.play()['WINNER'] == 'Creature'
+            for node in mind.path:
+                node.visits += 1
+                node.wins += won
+            played += 1
+    finally:
+        logger.disabled = disabled
+    return {choice: [node.visits, node.wins] for choice, node in root.children.items()}
+
+
+# worker pools of parallel searches, by number of processes; closed at exit
+search_pools = {}
+
+
+def close_search_pools():
+    """Closes the worker pools of parallel searches and waits for their processes to exit"""
+    while search_pools:
+        processes, pool = search_pools.popitem()
+        pool.close()
+        pool.join()
+
+
+def search_in_parallel(game, seed, budget):
+    """Splits a search_decision() between budget.processes worker processes.
+
+    Each worker grows its own tree from its own seed and their results for
+    the decision are added up (root parallelization). Needs a process that
+    may start processes, so not a batch worker.
+    """
+    pool = search_pools.get(budget.processes)
+    if pool is None:
+        if not search_pools:
+            atexit.register(close_search_pools)
+        pool = search_pools[budget.processes] = multiprocessing.Pool(budget.processes)
+    seeder = random.Random(seed)
+    rollouts = [budget.rollouts // budget.processes + (i < budget.rollouts % budget.processes)
+                for i in range(budget.processes)]
+    stats = {}
+    for worker_stats in pool.starmap(search_decision,
+                                     [(game, seeder.getrandbits(64), worker_rollouts, budget.seconds)
+                                      for worker_rollouts in rollouts]):
+        for choice, (visits, wins) in worker_stats.items():
+            total = stats.setdefault(choice, [0, 0])
+            total[0] += visits
+            total[1] += wins
+    return stats
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description='Simulate games of Not Alone into a games.csv file. Asks for any of players '
+                    'and games not given; batch.py plays the same games on every core and can '
+                    'also write a columnar store (--backend).')
+    parser.add_argument('players', type=int, nargs='?', choices=range(2, 8))
+    parser.add_argument('games', type=int, nargs='?')
+    parser.add_argument('--better-hunted', type=int, choices=(0, 1))
+    parser.add_argument('--better-creature', type=int, choices=(0, 1, 2),
+                        help='0 random, 1 better, 2 search (slow, see --search-rollouts)')
+    parser.add_argument('--seed', type=int,
+                        help='seed for the game seeds, to reproduce a whole run')
+    parser.add_argument('--output', default='games.csv',
+                        help='games.csv file to append to (default: games.csv)')
+    parser.add_argument('--verbose', action='store_true',
+                        help='log every game')
+    parser.add_argument('--quiet', action='store_true',
+                        help='do not show the progress line')
+    parser.add_argument('--replay', type=int, metavar='GAME',
+                        help='replay a game from games.csv with verbose logs')
+    parser.add_argument('--search-rollouts', type=int,
+                        help='rollouts per decision of a searching Creature, or of the one of a '
+                             'replayed game, as it was played with (default 200)')
+    parser.add_argument('--search-processes', type=int,
+                        help='processes of each search (default 1, as batch.py plays them)')
+    args = parser.parse_args()
+
+    search_budget = None
+    if args.search_rollouts is not None or args.search_processes is not None:
+        search_budget = SearchBudget(args.search_rollouts or SearchBudget().rollouts, None,
+                                     args.search_processes or 1)
+
+    if args.replay is not None:
+        replay_game(args.replay, args.output, search_budget)
+        raise SystemExit
+
+    if args.players is None or args.games is None:
+        if not sys.stdin.isatty():
+            parser.error('players and games are required when not run from a terminal')
+        no_of_players = args.players or 0
+        no_of_games = args.games or 0
+        hunted_mind = 5 if args.better_hunted is None else args.better_hunted
+        creature_mind = 5 if args.better_creature is None else args.better_creature
+        verbose = 5
+        while int(no_of_players) < 2 or int(no_of_players) > 7:
+            no_of_players = input('How many players? (2-7): ')
+        while int(no_of_games) < 1:
+            no_of_games = input('How many games to simulate?: ')
+        while int(hunted_mind) not in (0, 1):
+            hunted_mind = input('How should the Hunted behave? (0) Random Mind (1) Better Mind: ')
+        while int(creature_mind) not in (0, 1, 2):
+            creature_mind = input('How should the Creature behave? '
+                                  '(0) Random Mind (1) Better Mind (2) Search Mind (slow): ')
+        while int(verbose) not in (0, 1):
+            verbose = input('Should a verbose log be produced? (0) No (1) Yes: ')
+        args.players, args.games = int(no_of_players), int(no_of_games)
+        args.better_hunted, args.better_creature = int(hunted_mind), int(creature_mind)
+        args.verbose = bool(int(verbose))
+
+    # seeds are drawn the way batch.py draws them, so the two play the same games
+    seeder = random.Random(args.seed)
+    progress = None if args.quiet or args.verbose else ProgressLine(args.games)
+    first_game_number = GameNumberAllocator(args.output).allocate(args.games)
+    config = (args.players, args.better_hunted or 0, args.better_creature or 0)
+    game = None
+    with ResultsWriter(args.output) as results:
+        for game_number in range(first_game_number, first_game_number + args.games):
+            # every game is set up on the first one, see Game.reset()
+            if game is None:
+                game = Game(*config, game_number=game_number, seed=seeder.getrandbits(64),
+                            search_budget=search_budget)
+            else:
+                game.reset(*config, game_number=game_number, seed=seeder.getrandbits(64),
+                           search_budget=search_budget)
+            row = game.play(verbose=args.verbose)
+            results.write(row)
+            if progress is not None:
+                progress.add((row,))
+    if progress is not None:
+        progress.close()
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+
+"""Running statistics over games.csv rows, updated one game at a time.
+
+RunningStats keeps the win counts, turn count mean and variance (Welford's
+method) and proc totals of every place, so a batch can tell how precise its
+answers already are without keeping or re-reading its rows.
+"""
+
+import collections
+import math
+
+# place proc columns of games.csv
+PLACE_COLUMNS = ('LAIR', 'JUNGLE', 'RIVER', 'BEACH', 'ROVER', 'SWAMP',
+                 'SHELTER', 'WRECK', 'SOURCE', 'ARTEFACT')
+
+# catch count columns of games.csv
+CATCH_COLUMNS = ('CREATURE_CATCH', 'ARTEMIA_CATCH', 'ADVANCES_FROM_CATCH', 'LAIR_CATCH')
+
+# normal quantile of a 95% confidence interval
+Z_95 = 1.959964
+
+
+def wilson_half_width(wins, games, z=Z_95):
+    """Returns the half-width of the Wilson confidence interval of a win rate.
+
+    Unlike the normal approximation it is not 0 while no game or every
+    game has been won, so a run cannot stop on its first few games.
+    """
+    n = games
+    if not n:
+        return float('inf')
+    p = wins / n
+    return z * math.sqrt(p * (1 - p) / n + z * z / (4 * n * n)) / (1 + z * z / n)
+
+
+class RunningStats:
+    """Online aggregates of the rows of one configuration"""
+
+    def __init__(self):
+        self.games = 0
+        self.wins = collections.Counter()
+        self.turns_mean = 0.0
+        self.turns_m2 = 0.0
+        self.procs = dict.fromkeys(PLACE_COLUMNS, 0)
+
+    def to_dict(self):
+        """Returns the stats as a JSON-able dict, see from_dict()"""
+        return {'games': self.games,
+                'wins': dict(self.wins),
+                'turns_mean': self.turns_mean,
+                'turns_m2': self.turns_m2,
+                'procs': dict(self.procs)}
+
+    @classmethod
+    def from_dict(cls, data):
+        """Returns the stats saved by to_dict()"""
+        stats = cls()
+        stats.games = data['games']
+        stats.wins.update(data['wins'])
+        stats.turns_mean = data['turns_mean']
+        stats.turns_m2 = data['turns_m2']
+        stats.procs.update(data['procs'])
+        return stats
+
+    def add(self, row):
+        """Adds one games.csv row dict (int or str values)"""
+        self.games += 1
+        self.wins[row['WINNER']] += 1
+        turns = int(row['TURNS'])
+        delta = turns - self.turns_mean
+        self.turns_mean += delta / self.games
+        self.turns_m2 += delta * (turns - self.turns_mean)
+        for column in PLACE_COLUMNS:
+            self.procs[column] += int(row[column])
+
+    def win_rate(self, winner='Creature'):
+        """Returns the fraction of games won by winner"""
+        if not self.games:
+            return 0.0
+        return self.wins[winner] / self.games
+
+    def win_rate_half_width(self, winner='Creature', z=Z_95):
+        """Returns the half-width of the Wilson confidence interval of the win rate"""
+        return wilson_half_width(self.wins[winner], self.games, z)
+
+    def turns_std(self):
+        """Returns the sample standard deviation of the turn count"""
+        if self.games < 2:
+            return 0.0
+        return math.sqrt(self.turns_m2 / (self.games - 1))
+
+    def turns_half_width(self, z=Z_95):
+        """Returns the half-width of the confidence interval of the mean turn count"""
+        if self.games < 2:
+            return float('inf')
+        return z * self.turns_std() / math.sqrt(self.games)
+
+    def proc_means(self):
+        """Returns {place column: mean procs per game}"""
+        return {column: total / max(self.games, 1)
+                for column, total in self.procs.items()}
+
+    def summary(self):
+        """Returns the lines of a human-readable summary"""
+        lines = ['{} games'.format(self.games),
+                 'Creature win rate {:.4f} +/- {:.4f} (95% CI)'.format(
+                     self.win_rate('Creature'), self.win_rate_half_width('Creature')),
+                 'Hunted win rate {:.4f} +/- {:.4f} (95% CI)'.format(
+                     self.win_rate('Hunted'), self.win_rate_half_width('Hunted')),
+                 'Turns {:.3f} +/- {:.3f} (95% CI), standard deviation {:.3f}'.format(
+                     self.turns_mean, self.turns_half_width(), self.turns_std()),
+                 'Mean procs per game:']
+        for column, mean in self.proc_means().items():
+            lines.append('  {:<9} {:.3f}'.format(column, mean))
+        return lines
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+
+"""Opt-in profiling of where the time goes inside games of Not Alone.
+
+Games given a Profiler (Game(..., profiler=profiler)) add up wall time, call
+counts and, optionally, the net memory allocated (negative when a section
+frees more than it allocates) per game phase, per place card effect, per hunt
+card and per token placement, over all the games that share it. Games
+without a profiler skip every hook. Phase times include the card effects and
+token placements run inside them.
+"""
+
+import time
+import tracemalloc
+
+
+class Profiler:
+    """Aggregated timings of game sections, keyed by (kind, name)"""
+
+    def __init__(self, allocations=False):
+        self.allocations = allocations
+        # (kind, name): [calls, seconds, net bytes allocated]
+        self.stats = {}
+        self.phase_name = None
+        self.phase_start = None
+        if allocations and not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    def start(self):
+        """Returns a mark to pass to stop() at the end of a section"""
+        if self.allocations:
+            return time.perf_counter(), tracemalloc.get_traced_memory()[0]
+        return time.perf_counter(), 0
+
+    def stop(self, kind, name, mark):
+        """Adds the section started at mark to the stats"""
+        now, memory = self.start()
+        stat = self.stats.get((kind, name))
+        if stat is None:
+            stat = self.stats[kind, name] = [0, 0.0, 0]
+        stat[0] += 1
+        stat[1] += now - mark[0]
+        stat[2] += memory - mark[1]
+
+    def phase(self, name):
+        """Ends the current game phase, if any, and starts the named one"""
+        if self.phase_name is not None:
+            self.stop('phase', self.phase_name, self.phase_start)
+        self.phase_name = name
+        if name is not None:
+            self.phase_start = self.start()
+
+    def merge(self, stats):
+        """Adds the stats of another profiler, e.g. one in a worker process"""
+        for key, (calls, seconds, allocated) in stats.items():
+            stat = self.stats.get(key)
+            if stat is None:
+                stat = self.stats[key] = [0, 0.0, 0]
+            stat[0] += calls
+            stat[1] += seconds
+            stat[2] += allocated
+
+    def report(self):
+        """Returns the lines of a report of every section, slowest first"""
+        game_seconds = sum(seconds for (kind, name), (calls, seconds, allocated)
+                           in self.stats.items() if kind == 'phase') or 1.0
+        header = '{:<30} {:>9} {:>10} {:>9} {:>7}'.format(
+            'SECTION', 'CALLS', 'TOTAL MS', 'MEAN US', '% GAME')
+        if self.allocations:
+            header += ' {:>9}'.format('NET KIB')
+        lines = [header]
+        for (kind, name), (calls, seconds, allocated) in sorted(
+                self.stats.items(), key=lambda item: item[1][1], reverse=True):
+            line = '{:<30} {:>9} {:>10.1f} {:>9.1f} {:>6.1f}%'.format(
+                '{} {}'.format(kind, name), calls, seconds * 1e3,
+                seconds / calls * 1e6, seconds / game_seconds * 100)
+            if self.allocations:
+                line += ' {:>9.1f}'.format(allocated / 1024)
+            lines.append(line)
+        return lines
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+
+"""Aggregate counters of Not Alone games in shared memory, for process pools.
+
+SharedCounters keeps a fixed block of int64 counters for each configuration
+of a run in multiprocessing.shared_memory: games, Creature and Hunted wins,
+a histogram of TURNS and the proc and catch totals of every place. Pool
+workers add their games to it directly, so a run that does not need
+games' rows never pickles them back to the parent, which reads the
+counters in place.
+"""
+
+import collections
+import multiprocessing
+from multiprocessing import shared_memory
+
+import onlinestats
+
+try:
+    import numpy as np
+except ImportError:  # only needed for array()
+    np = None
+
+# games longer than this are counted in the last bin of the turns histogram;
+# play() stops games at 20 turns
+TURN_BINS = 24
+
+# offsets of the counters of one configuration
+GAMES = 0
+CREATURE_WINS = 1
+HUNTED_WINS = 2  # games stopped by the failsafe are won by neither
+TURNS = 3
+PLACES = TURNS + TURN_BINS
+CATCHES = PLACES + len(onlinestats.PLACE_COLUMNS)
+FIELDS = CATCHES + len(onlinestats.CATCH_COLUMNS)
+
+# the counters of a pool worker, see attach()
+worker_counters = None
+
+
+class SharedCounters:
+    """FIELDS int64 counters for each of configs configurations, in shared memory.
+
+    The parent creates them; pool workers attach by name with attach() as
+    the pool initializer, sharing the parent's lock.
+    """
+
+    def __init__(self, configs, name=None, lock=None):
+        self.configs = configs
+        self.owner = name is None
+        self.memory = shared_memory.SharedMemory(name=name, create=self.owner,
+                                                 size=configs * FIELDS * 8)
+        # a flat int64 view of the block, no copy; new blocks start zeroed
+        self.counts = self.memory.buf.cast('q')
+        self.lock = lock if lock is not None else multiprocessing.Lock()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def initializer(self):
+        """Returns the initializer and initargs of a pool whose workers add to these counters"""
+        return attach, (self.memory.name, self.configs, self.lock)
+
+    def add(self, index, rows):
+        """Adds games.csv row dicts to the counters of configuration index"""
+        # summed up first, so the lock is taken once per chunk of games
+        totals = [0] * FIELDS
+        for row in rows:
+            totals[GAMES] += 1
+            if row['WINNER'] == 'Creature':
+                totals[CREATURE_WINS] += 1
+            elif row['WINNER'] == 'Hunted':
+                totals[HUNTED_WINS] += 1
+            totals[TURNS + min(row['TURNS'], TURN_BINS - 1)] += 1
+            for i, column in enumerate(onlinestats.PLACE_COLUMNS, PLACES):
+                totals[i] += row[column]
+            for i, column in enumerate(onlinestats.CATCH_COLUMNS, CATCHES):
+                totals[i] += row[column]
+        start = index * FIELDS
+        with self.lock:
+            for i, total in enumerate(totals, start):
+                if total:
+                    self.counts[i] += total
+
+    def view(self, index):
+        """Returns the counters of configuration index, a memoryview into the shared block"""
+        return self.counts[index * FIELDS:(index + 1) * FIELDS]
+
+    def array(self):
+        """Returns the counters as a NumPy (configs, FIELDS) array on the shared block"""
+        if np is None:
+            raise ImportError('array() requires numpy')
+        return np.ndarray((self.configs, FIELDS), dtype=np.int64, buffer=self.memory.buf)
+
+    def snapshot(self, index):
+        """Returns a consistent copy of the counters of configuration index, as a list"""
+        with self.lock:
+            return self.view(index).tolist()
+
+    def totals(self, index):
+        """Returns {games.csv column: total} of the place procs and catches of configuration index"""
+        columns = onlinestats.PLACE_COLUMNS + onlinestats.CATCH_COLUMNS
+        return dict(zip(columns, self.snapshot(index)[PLACES:]))
+
+    def stats(self, index):
+        """Returns an onlinestats.RunningStats of the games of configuration index"""
+        counts = self.snapshot(index)
+        stats = onlinestats.RunningStats()
+        stats.games = counts[GAMES]
+        # as RunningStats counts them, games without a winner under ''
+        wins = {'Creature': counts[CREATURE_WINS], 'Hunted': counts[HUNTED_WINS],
+                '': counts[GAMES] - counts[CREATURE_WINS] - counts[HUNTED_WINS]}
+        stats.wins = collections.Counter({winner: games for winner, games in wins.items() if games})
+        histogram = counts[TURNS:PLACES]
+        if stats.games:
+            stats.turns_mean = sum(turns * games for turns, games in enumerate(histogram)) / stats.games
+            stats.turns_m2 = sum(games * (turns - stats.turns_mean) ** 2
+                                 for turns, games in enumerate(histogram))
+        for i, column in enumerate(onlinestats.PLACE_COLUMNS, PLACES):
+            stats.procs[column] = counts[i]
+        return stats
+
+    def close(self):
+        """Detaches from the counters, freeing them if they were created here"""
+        self.counts.release()
+        self.memory.close()
+        if self.owner:
+            self.memory.unlink()
+
+
+def attach(name, configs, lock):
+    """Pool initializer, attaches a worker to its parent's SharedCounters as worker_counters"""
+    global worker_counters
+    worker_counters = SharedCounters(configs, name, lock)
@@ -0,0 +1,311 @@
+#!/usr/bin/env python3
+
+"""Sweeps simulations of Not Alone over a grid of configurations.
+
+Every cell of the grid (players, Hunted mind, Creature mind, Artemia board)
+plays a fixed number of games, or games until its Creature win rate is
+precise enough, on one shared process pool. Chunks of games are handed out
+one at a time to the cell with the most estimated work left, so long
+7-player cells start early and no core idles while others finish. All
+games are appended to one results file in game number order and the cells
+are summed up in one table.
+
+Progress is checkpointed next to the results, so an interrupted sweep can be
+resumed with --resume.
+
+With --no-rows, no rows are saved: the workers count their games in
+shared memory (see sharedstats) instead of sending every row back, which
+is faster for short games.
+"""
+
+import argparse
+import collections
+import contextlib
+import csv
+import itertools
+import multiprocessing
+import os
+import queue
+import random
+
+import batch
+import checkpoint
+import onlinestats
+import sharedstats
+
+# columns of the consolidated results table
+TABLE_FIELDNAMES = ['PLAYERS', 'BETTER_HUNTED', 'BETTER_CREATURE', 'ARTEMIA_BOARD',
+                    'GAMES', 'CREATURE_WIN_RATE', 'CREATURE_WIN_RATE_CI',
+                    'TURNS', 'TURNS_CI']
+
+
+class SweepCell:
+    """The games and running stats of one configuration of a sweep"""
+
+    def __init__(self, players, better_hunted, better_creature, artemia, seed):
+        self.config = (players, better_hunted, better_creature, artemia)
+        # each cell draws its game seeds from its own RNG, so a cell plays
+        # the same games whatever else is in the sweep
+        self.seeder = random.Random('{} {} {} {} {}'.format(seed, *self.config))
+        self.submitted = 0
+        self.stats = onlinestats.RunningStats()
+
+    def done(self, no_of_games, precision):
+        if self.submitted >= no_of_games:
+            return True
+        return precision is not None and self.stats.win_rate_half_width() <= precision
+
+    def remaining_work(self, no_of_games):
+        """Returns the estimated cost of the games left, in player-turns"""
+        turns = self.stats.turns_mean if self.stats.games else 12.0
+        return (no_of_games - self.submitted) * turns * self.config[0]
+
+    def table_row(self):
+        players, better_hunted, better_creature, artemia = self.config
+        return {'PLAYERS': players,
+                'BETTER_HUNTED': better_hunted,
+                'BETTER_CREATURE': better_creature,
+                'ARTEMIA_BOARD': artemia,
+                'GAMES': self.stats.games,
+                'CREATURE_WIN_RATE': round(self.stats.win_rate(), 4),
+                'CREATURE_WIN_RATE_CI': round(self.stats.win_rate_half_width(), 4),
+                'TURNS': round(self.stats.turns_mean, 3),
+                'TURNS_CI': round(self.stats.turns_half_width(), 3)}
+
+
+def make_grid(players=range(2, 8), better_hunted=(0, 1), better_creature=(0, 1),
+              boards=('A', 'B')):
+    """Returns every configuration of the grid as (players, hunted, creature, board)"""
+    return list(itertools.product(players, better_hunted, better_creature, boards))
+
+
+def run_sweep(grid, no_of_games, precision=None, processes=None, chunksize=50,
+              seed=None, path='games.csv', flush_every=1000, flush_seconds=5.0,
+              backend='csv', checkpoint_path=None, resume=False, save_rows=True):
+    """Plays the cells of the grid over a process pool, appending to path.
+
+    Each cell plays no_of_games games, or with precision, stops once the 95%
+    confidence interval of its Creature win rate is at most precision either
+    side (at most no_of_games). Chunks still running when a cell reaches its
+    precision are kept, so cells may play a little more than needed.
+
+    If checkpoint_path, progress is saved there whenever games are allocated
+    or written (see checkpoint) and removed once the sweep is done. With
+    resume, a sweep with the same arguments carries on from its checkpoint.
+    Unless save_rows, the games are only counted in sharedstats.SharedCounters,
+    so nothing is written to path and there is no checkpoint to resume from.
+    Returns the SweepCells in grid order.
+    """
+    if resume and not save_rows:
+        raise ValueError('a sweep that saves no rows cannot be resumed')
+    processes = processes or os.cpu_count()
+    if resume:
+        saved = checkpoint.load(checkpoint_path)
+        seed = saved['config']['seed']
+    elif seed is None:
+        seed = random.getrandbits(64)
+    config = {'grid': [list(config) for config in grid], 'no_of_games': no_of_games,
+              'precision': precision, 'chunksize': chunksize, 'seed': seed,
+              'path': path, 'backend': backend}
+    cells = [SweepCell(*config, seed) for config in grid]
+    # chunks allocated but not yet written, in game number order, as
+    # [first game number not written, cell index, games not written]
+    pending = collections.deque()
+    if resume:
+        if saved['kind'] != 'sweep' or saved['config'] != config:
+            raise ValueError('{} is the checkpoint of a different run'.format(checkpoint_path))
+        pending.extend(saved['pending'])
+        for cell, stats in zip(cells, saved['stats']):
+            cell.stats = onlinestats.RunningStats.from_dict(stats)
+    allocator, writer = batch.BACKENDS[backend]
+    counters = None
+    if save_rows:
+        allocate = allocator(path).allocate
+    else:
+        counters = sharedstats.SharedCounters(len(cells))
+        checkpoint_path = None
+        # the games are not saved, so their numbers need only be unique to the sweep
+        game_numbers = itertools.count(1, chunksize)
+
+        def allocate(count):
+            return next(game_numbers)
+    finished = queue.Queue()
+    # first game numbers of the chunks in flight, in the order they were allocated
+    order = collections.deque()
+    # finished chunks wait here until every earlier chunk is written
+    waiting = {}
+
+    def record_written(rows):
+        """Adds the rows on disk to their cells' stats and saves a checkpoint"""
+        for row in rows:
+            chunk = pending[0]
+            cells[chunk[1]].stats.add(row)
+            chunk[0] += 1
+            chunk[2] -= 1
+            if not chunk[2]:
+                pending.popleft()
+        save_checkpoint()
+
+    def save_checkpoint():
+        if checkpoint_path is not None:
+            # the rows a checkpoint counts must reach the disk before it does
+            results.sync_output()
+            checkpoint.save(checkpoint_path, {
+                'kind': 'sweep',
+                'config': config,
+                'pending': list(pending),
+                'stats': [cell.stats.to_dict() for cell in cells],
+                'position': results.position()})
+
+    def hand_out(cell, first_game_number, chunk):
+        """Hands the next chunk games of cell to the pool"""
+        cell.submitted += chunk
+        order.append(first_game_number)
+        seeds = [cell.seeder.getrandbits(64) for i in range(chunk)]
+        players, better_hunted, better_creature, artemia = cell.config
+        counter_index = cells.index(cell) if counters is not None else None
+        task = (first_game_number, seeds, players, better_hunted, better_creature,
+                False, False, 0, artemia, None, counter_index)
+        pool.apply_async(batch.play_games, (task,),
+                         callback=lambda result: finished.put((cell, first_game_number, result)),
+                         error_callback=lambda error: finished.put((None, None, error)))
+
+    def submit():
+        """Hands the next chunk of the cell with the most work left to the pool"""
+        cells_left = [cell for cell in cells if not cell.done(no_of_games, precision)]
+        if not cells_left:
+            return False
+        cell = max(cells_left, key=lambda cell: cell.remaining_work(no_of_games))
+        chunk = min(chunksize, no_of_games - cell.submitted)
+        first_game_number = allocate(chunk)
+        if counters is None:
+            pending.append([first_game_number, cells.index(cell), chunk])
+            # saved before any of its games can be written, so a resume knows them
+            save_checkpoint()
+        hand_out(cell, first_game_number, chunk)
+        return True
+
+    with contextlib.ExitStack() as stack:
+        if counters is None:
+            pool = stack.enter_context(multiprocessing.Pool(processes))
+            results = stack.enter_context(writer(path, flush_every, flush_seconds, record_written))
+        else:
+            # the counters are freed only once the pool is done with them
+            stack.enter_context(counters)
+            initializer, initargs = counters.initializer()
+            pool = stack.enter_context(multiprocessing.Pool(processes, initializer, initargs))
+        if resume:
+            # games written after the last checkpoint, before the sweep stopped
+            record_written(checkpoint.written_since(
+                writer, path, saved['position'],
+                [(first_game_number, chunk) for first_game_number, cell_index, chunk in pending]))
+            for cell in cells:
+                # skip the seeds of the games written, the pending chunks draw the next ones
+                for i in range(cell.stats.games):
+                    cell.seeder.getrandbits(64)
+                cell.submitted = cell.stats.games
+            # play the rest of the chunks allocated before the sweep stopped first
+            for first_game_number, cell_index, chunk in list(pending):
+                hand_out(cells[cell_index], first_game_number, chunk)
+        # keep every worker busy with a second chunk queued behind the first
+        while len(order) < 2 * processes and submit():
+            pass
+        while order:
+            cell, first_game_number, result = finished.get()
+            if cell is None:
+                raise result
+            rows, profile_stats = result
+            if counters is None:
+                waiting[first_game_number] = rows
+                while order and order[0] in waiting:
+                    results.writerows(waiting.pop(order.popleft()))
+                if precision is not None:
+                    # the stats only count rows on disk, so the precision check needs them written
+                    results.flush()
+            else:
+                # the worker has counted the chunk's games already
+                order.remove(first_game_number)
+                cell.stats = counters.stats(cells.index(cell))
+            submit()
+    if checkpoint_path is not None:
+        checkpoint.remove(checkpoint_path)
+    return cells
+
+
+def results_table(cells):
+    """Returns the lines of the consolidated results table"""
+    lines = ['PLAYERS  MINDS  BOARD   GAMES  CREATURE WIN RATE     TURNS']
+    for cell in cells:
+        row = cell.table_row()
+        lines.append('{:>7}  {:>2}/{:<2}  {:>5}  {:>6}  {:>8.4f} +/- {:.4f}  {:>6.2f} +/- {:.2f}'
+                     .format(row['PLAYERS'], row['BETTER_HUNTED'], row['BETTER_CREATURE'],
+                             row['ARTEMIA_BOARD'], row['GAMES'], row['CREATURE_WIN_RATE'],
+                             row['CREATURE_WIN_RATE_CI'], row['TURNS'], row['TURNS_CI']))
+    return lines
+
+
+def save_table(cells, path):
+    """Saves the consolidated results table as csv"""
+    with open(path, 'w', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=TABLE_FIELDNAMES)
+        writer.writeheader()
+        writer.writerows(cell.table_row() for cell in cells)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Sweep simulations of Not Alone over a grid of configurations.')
+    parser.add_argument('--players', type=int, nargs='+', choices=range(2, 8),
+                        default=list(range(2, 8)))
+    parser.add_argument('--better-hunted', type=int, nargs='+', choices=(0, 1), default=[0, 1])
+    parser.add_argument('--better-creature', type=int, nargs='+', choices=(0, 1, 2), default=[0, 1],
+                        help='Creature minds: 0 random, 1 better, 2 search (slow)')
+    parser.add_argument('--boards', nargs='+', choices=('A', 'B'), default=['A', 'B'])
+    parser.add_argument('--games', type=int, default=1000,
+                        help='games per cell, or the most per cell with --precision')
+    parser.add_argument('--precision', type=float,
+                        help='stop a cell once the 95%% CI of its Creature win rate is this close')
+    parser.add_argument('--processes', type=int, default=os.cpu_count(),
+                        help='number of worker processes (default: all cores)')
+    parser.add_argument('--chunksize', type=int, default=50,
+                        help='games handed to a worker at a time')
+    parser.add_argument('--seed', type=int,
+                        help='seed for the game seeds, to reproduce a sweep')
+    parser.add_argument('--backend', choices=batch.BACKENDS, default='csv',
+                        help='results format (default: csv)')
+    parser.add_argument('--output',
+                        help='results to append to (default: games.csv or games.cols)')
+    parser.add_argument('--table', help='also save the results table to this csv file')
+    parser.add_argument('--no-rows', action='store_true',
+                        help='only count the games in shared memory, saving no rows (faster, cannot be resumed)')
+    parser.add_argument('--resume', action='store_true',
+                        help='carry on with the interrupted sweep checkpointed next to --output')
+    parser.add_argument('--no-checkpoint', action='store_true',
+                        help='do not save progress to resume from if the sweep is interrupted')
+    args = parser.parse_args()
+    if args.output is None:
+        args.output = 'games.cols' if args.backend == 'columnar' else 'games.csv'
+    checkpoint_path = None if args.no_checkpoint else checkpoint.checkpoint_path(args.output)
+    if args.no_rows and args.resume:
+        parser.error('a sweep run with --no-rows cannot be resumed')
+
+    grid = make_grid(args.players, args.better_hunted, args.better_creature, args.boards)
+    if args.resume:
+        # the sweep carries on with the arguments it was started with
+        try:
+            config = checkpoint.load(checkpoint.checkpoint_path(args.output))['config']
+        except FileNotFoundError:
+            parser.error('there is no interrupted sweep to resume for {}'.format(args.output))
+        checkpoint_path = checkpoint.checkpoint_path(args.output)
+        grid = [tuple(config) for config in config['grid']]
+        args.games = config['no_of_games']
+        args.precision = config['precision']
+        args.chunksize = config['chunksize']
+        args.backend = config['backend']
+    cells = run_sweep(grid, args.games, precision=args.precision,
+                      processes=args.processes, chunksize=args.chunksize,
+                      seed=args.seed, path=args.output, backend=args.backend,
+                      checkpoint_path=checkpoint_path, resume=args.resume,
+                      save_rows=not args.no_rows)
+    print('\n'.join(results_table(cells)))
+    if args.table:
+        save_table(cells, args.table)